@@ -0,0 +1,65 @@
+"""Throughput of load_many with 1, 2, 4 and 8 workers on both backends.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_batch [path/to/show.lsf] [copies]
+
+The show is copied ``copies`` times (default 32) into a temporary directory
+and the whole batch is loaded once per configuration, after one untimed
+warm-up batch whose results are checked against the source. A sequential
+``LsfFile.from_file`` loop is the baseline. The speedup is bounded by the
+number of CPUs, printed in the header.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from colorsource.formats import LsfFile
+from colorsource.formats.batch import load_many
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+WORKERS = (1, 2, 4, 8)
+
+
+def timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    expected = LsfFile.from_file(source)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(copies):
+            path = Path(tmp) / f"show{i}.lsf"
+            shutil.copyfile(source, path)
+            paths.append(path)
+
+        def batch(workers: int, backend: str) -> list:
+            return list(load_many(paths, workers, backend))
+
+        print(f"{source.name} x {copies}, {os.cpu_count()} CPUs")
+        sequential = timed(lambda: [LsfFile.from_file(p) for p in paths])
+        print(f"  {'sequential':<16} {sequential * 1e3:8.1f} ms")
+        for backend in ("process", "thread"):
+            for workers in WORKERS:
+                for path, result in batch(workers, backend):
+                    assert result == expected, (path, result)
+                elapsed = timed(lambda: batch(workers, backend))
+                print(
+                    f"  {backend:<7} x {workers:<6} {elapsed * 1e3:8.1f} ms "
+                    f"{sequential / elapsed:6.2f}x "
+                    f"{copies / elapsed:7.1f} files/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Load latency of LoadCache hits against a fresh LsfFile.from_file.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_cache [path/to/show.lsf]
+
+Every cached load is compared to the fresh parse. A truncated and a garbled
+disk entry are checked to be replaced by a fresh parse.
+"""
+
+import shutil
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from colorsource.formats import LoadCache, LsfFile
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+
+
+def check_corrupt(path: Path, directory: Path, expected: LsfFile) -> None:
+    """A damaged disk entry is dropped and the show parsed again."""
+    LoadCache(directory=directory).load(path)
+    (entry,) = directory.glob("*.pickle")
+    data = entry.read_bytes()
+    for damaged in (data[: len(data) // 2], b"not a pickle" + data):
+        entry.write_bytes(damaged)
+        cache = LoadCache(directory=directory)
+        assert cache.load(path) == expected
+        assert cache.stats.corrupt == 1 and cache.stats.misses == 1
+        assert entry.read_bytes() == data
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    expected = LsfFile.from_file(source)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / source.name
+        shutil.copyfile(source, path)
+        memory = LoadCache()
+        memory.load(path)
+        check_corrupt(path, Path(tmp) / "check", expected)
+        LoadCache(directory=Path(tmp) / "cache").load(path)
+
+        cases = {
+            "from_file": lambda: LsfFile.from_file(path),
+            "memory hit": lambda: memory.load(path),
+            # A new cache per load: every load is served from disk.
+            "disk hit": lambda: LoadCache(directory=Path(tmp) / "cache").load(path),
+        }
+        print(f"{source.name}: best of 5, entry {memory.nbytes / 1024:.1f} KiB")
+        for name, load in cases.items():
+            assert load() == expected
+            best = min(timeit.repeat(load, number=5, repeat=5)) / 5
+            print(f"  {name:<12} {best * 1e3:8.2f} ms")
+        print(f"  {memory.stats}")
+
+
+if __name__ == "__main__":
+    main()
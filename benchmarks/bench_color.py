@@ -0,0 +1,54 @@
+"""Emitter color mixing of whole palettes with ColorMixer.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_color [path/to/show.lsf]
+
+Converts every color palette of the show, and one palette over the
+synthetic 64-universe patch of ``bench_dmx``, from RGB to emitter levels and
+back. Install NumPy to time the batched path; without it every channel is
+converted on its own.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+from benchmarks.bench_dmx import synthetic
+from colorsource.formats import LsfFile
+from colorsource.formats.showfile import Color, Palette
+from colorsource.patch import color
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+
+
+def convert(mixer: color.ColorMixer, palettes: list) -> None:
+    for palette in palettes:
+        levels = mixer.palette_levels(palette)
+        mixer.rgb(levels)
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    play = LsfFile.from_file(source).showfile.play
+    rig = synthetic(play.patch, 64)[0]
+    colors = [Color(64, d.channel, [], 200, 255) for d in rig.devices]
+    cases = [
+        (f"{source.name} palettes", play.patch, play.color_palettes),
+        ("64 universes", rig, [Palette("#ffc840", [], 1, "", colors)]),
+    ]
+
+    path = "numpy" if color.np is not None else "pure Python"
+    print(f"{path}: RGB -> emitters -> RGB, best of 5")
+    for name, patch, palettes in cases:
+        mixer = color.ColorMixer(patch)
+        channels = sum(len(p.colors or ()) for p in palettes)
+        best = min(timeit.repeat(lambda: convert(mixer, palettes), number=1, repeat=5))
+        print(
+            f"  {name:<20} {channels:6} colors {best * 1e3:8.2f} ms "
+            f"{best / channels * 1e6:6.2f} us/color"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Memory and lookup cost of Level lists versus LevelColumns.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_columnar [path/to/showfile.json]
+
+Besides the show as recorded, a synthetic variant gives every cue a level for
+every patched channel, as a fully programmed rig would have. The column
+lookup only wins on that dense variant; on the sparse cues of the example
+the per-call index costs more than scanning the short level lists.
+
+First checks that ``LevelColumns.lookup`` gives the same result with and
+without NumPy, for duplicate, missing, negative and out-of-range channels.
+"""
+
+import copy
+import json
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from colorsource.formats import columnar
+from colorsource.formats.columnar import LevelColumns
+from colorsource.formats.showfile import Level
+
+DEFAULT_SHOWFILE = Path(__file__).parent.parent / "examples" / "showfile.json"
+
+
+def traced(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def report(title, level_dicts) -> None:
+    count = sum(len(levels) for levels in level_dicts)
+    objects, object_size = traced(
+        lambda: [[Level.from_dict(lv) for lv in levels] for levels in level_dicts]
+    )
+    columns, column_size = traced(
+        lambda: [LevelColumns.from_dicts(levels) for levels in level_dicts]
+    )
+    assert [c.to_levels() for c in columns] == objects
+
+    print(f"{title}: {len(level_dicts)} cues and memories, {count} levels")
+    for name, size in (("List[Level]", object_size), ("LevelColumns", column_size)):
+        print(f"  {name:<14} {size / 1024:8.1f} KiB  {size / count:6.1f} B/level")
+
+    channels = sorted({lv.channel for levels in objects for lv in levels})
+
+    def scan():
+        return [
+            [
+                next((lv.level for lv in levels if lv.channel == ch), -1)
+                for ch in channels
+            ]
+            for levels in objects
+        ]
+
+    def gather():
+        return [c.lookup(channels) for c in columns]
+
+    for name, fn in (("list scan", scan), ("column lookup", gather)):
+        best = min(timeit.repeat(fn, number=5, repeat=3)) / 5
+        print(f"  {name:<14} {best * 1e3:8.2f} ms  ({len(channels)} channels per cue)")
+
+
+def check_lookup() -> None:
+    levels = [Level(0, ch, [], 0, level, 0) for ch, level in ((5, 1), (1, 2), (5, 3))]
+    columns = LevelColumns.from_levels(levels)
+    cases = {(-1, 1, 2, 5, -4): [-1, 2, -1, 3, -1], (9, 5): [-1, 3]}
+    numpy, columnar.np = columnar.np, None
+    try:
+        for wanted, expected in cases.items():
+            assert columns.lookup(wanted) == expected
+    finally:
+        columnar.np = numpy
+    if numpy is not None:
+        for wanted, expected in cases.items():
+            assert columns.lookup(wanted).tolist() == expected
+
+
+def main() -> None:
+    check_lookup()
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SHOWFILE
+    play = json.loads(path.read_text(encoding="utf-8"))["play"]
+    contents = [s["content"] for s in play["cueList"]["steps"]]
+    contents += [m["content"] for m in play["memories"]]
+    level_dicts = [c["levels"] for c in contents]
+    report(path.name, level_dicts)
+
+    channels = sorted({d["channel"] for d in play["patch"]["devices"]})
+    template = {"b": 255, "channel": 0, "colors": [], "g": 255, "level": 255, "r": 255}
+    full = [
+        [
+            dict(copy.deepcopy(template), channel=ch, level=(i * ch) % 256)
+            for ch in channels
+        ]
+        for i in range(len(contents))
+    ]
+    report(f"{path.name} (every channel in every cue)", full)
+
+
+if __name__ == "__main__":
+    main()
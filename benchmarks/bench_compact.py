@@ -0,0 +1,77 @@
+"""Bytes per object of the regular model versus the slotted variants.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_compact [path/to/showfile.json]
+"""
+
+import dataclasses
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+from colorsource.formats import showfile_from_dict
+from colorsource.formats.compact import FROZEN, SLOTS
+
+DEFAULT_SHOWFILE = Path(__file__).parent.parent / "examples" / "showfile.json"
+CLASSES = ("Level", "Color", "LtpParameter", "Topo", "Device")
+COPIES = 10_000
+
+
+def per_object(cls, fields) -> float:
+    """Traced bytes per instance, not counting the (shared) field values."""
+    tracemalloc.start()
+    objects = [cls(*fields) for _ in range(COPIES)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return (size - 8 * COPIES) / COPIES  # minus the list slot for each object
+
+
+def traced(load) -> int:
+    tracemalloc.start()
+    result = load()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SHOWFILE
+    data = json.loads(path.read_text(encoding="utf-8"))
+    show = showfile_from_dict(data)
+    play = show.play
+    samples = {
+        "Level": play.cue_list.steps[1].content.levels[0],
+        "Color": play.color_palettes[0].colors[0],
+        "LtpParameter": next(
+            p for s in play.cue_list.steps for p in s.content.ltp_parameters
+        ),
+        "Topo": play.patch.topo[0],
+        "Device": play.patch.devices[0],
+    }
+
+    print(f"{path.name}: bytes per object")
+    print(f"  {'class':<14} {'dataclass':>10} {'SLOTS':>10} {'FROZEN':>10}")
+    for name in CLASSES:
+        sample = samples[name]
+        fields = [getattr(sample, f.name) for f in dataclasses.fields(sample)]
+        sizes = [
+            per_object(cls, fields)
+            for cls in (type(sample), getattr(SLOTS, name), getattr(FROZEN, name))
+        ]
+        print(f"  {name:<14}" + "".join(f" {size:10.1f}" for size in sizes))
+
+    print(f"{path.name}: whole show")
+    for name, load in (
+        ("dataclass", lambda: showfile_from_dict(data)),
+        ("SLOTS", lambda: SLOTS.from_dict(data)),
+        ("FROZEN", lambda: FROZEN.from_dict(data)),
+    ):
+        print(f"  {name:<14} {traced(load) / 1024:10.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
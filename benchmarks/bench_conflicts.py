@@ -0,0 +1,93 @@
+"""Patch conflict analysis on synthetic patches against pairwise checks.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_conflicts
+
+Every synthetic patch packs devices with footprints of 1 to 24 slots into as
+many universes as needed, then moves 1% of them to random addresses, which
+creates overlaps, ranges past slot 512 and shared channels. The pairwise
+O(n^2) overlap check runs up to 5,000 devices and must agree with the sweep.
+"""
+
+import random
+import time
+
+from colorsource.formats.showfile import Device
+from colorsource.patch.conflicts import DIMMER_DCID, find_conflicts
+
+SIZES = (100, 1000, 5000, 20000, 100000)
+PAIRWISE_LIMIT = 5000
+
+
+def synthetic(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    devices = []
+    space, address = 1, 1
+    for i in range(count):
+        footprint = rng.randint(1, 24)
+        if address + footprint - 1 > 512:
+            space, address = space + 1, 1
+        device = Device(
+            channel=i,
+            device_id=i + 1,
+            dmx=address,
+            echo_address_range=False,
+            echo_zone_only=False,
+            footprint=footprint,
+            invert_pan=False,
+            invert_tilt=False,
+            manufacturer="",
+            mode="",
+            model="",
+            personality_dcid=DIMMER_DCID,
+            space=space,
+            swap_pan_tilt=False,
+            tag1=-1,
+            tag2=-1,
+            text="",
+            zone=0,
+        )
+        address += footprint
+        devices.append(device)
+    for device in rng.sample(devices, count // 100):
+        device.dmx = rng.randint(1, 512)
+        device.channel = rng.randrange(count)
+    return devices
+
+
+def pairwise(devices: list) -> set:
+    pairs = set()
+    for i, a in enumerate(devices):
+        for b in devices[i + 1 :]:
+            if (
+                a.space == b.space
+                and a.dmx <= b.dmx + b.footprint - 1
+                and b.dmx <= a.dmx + a.footprint - 1
+            ):
+                pairs.add(frozenset((a.device_id, b.device_id)))
+    return pairs
+
+
+def main() -> None:
+    print("devices    overlaps  sweep ms    pairwise ms")
+    for size in SIZES:
+        devices = synthetic(size)
+        start = time.perf_counter()
+        report = find_conflicts(devices, [])
+        sweep = time.perf_counter() - start
+        line = f"{size:7} {len(report.overlaps):10} {sweep * 1e3:9.1f}"
+        if size <= PAIRWISE_LIMIT:
+            start = time.perf_counter()
+            expected = pairwise(devices)
+            line += f" {(time.perf_counter() - start) * 1e3:14.1f}"
+            found = {
+                frozenset((o.first.device_id, o.second.device_id))
+                for o in report.overlaps
+            }
+            assert found == expected
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Compare the generic ``showfile_from_dict`` with the compiled decoder.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_decode [path/to/showfile.json]
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+from colorsource.formats import showfile_from_dict
+from colorsource.formats.decoder import fast_showfile_from_dict
+
+DEFAULT_SHOWFILE = Path(__file__).parent.parent / "examples" / "showfile.json"
+
+
+def main() -> None:
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SHOWFILE
+    data = json.loads(path.read_text(encoding="utf-8"))
+
+    reference = showfile_from_dict(data)
+    assert fast_showfile_from_dict(data) == reference
+    assert fast_showfile_from_dict(data, strict=True) == reference
+
+    cases = {
+        "showfile_from_dict": lambda: showfile_from_dict(data),
+        "compiled (strict)": lambda: fast_showfile_from_dict(data, strict=True),
+        "compiled": lambda: fast_showfile_from_dict(data),
+    }
+    baseline = None
+    print(f"{path.name}: best of 5, 10 loops each")
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=10, repeat=5)) / 10
+        baseline = baseline or best
+        print(f"  {name:<20} {best * 1e3:8.2f} ms  {baseline / best:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
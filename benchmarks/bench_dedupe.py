@@ -0,0 +1,82 @@
+"""Memory and equality cost with and without a DedupePool.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_dedupe [path/to/showfile.json]
+
+Before timing, checks that a pool keeps tuples of ints and of floats apart,
+and that a malformed show loaded with a pool reports its own decode error
+rather than a missing ``showfile.json``.
+"""
+
+import json
+import sys
+import tempfile
+import timeit
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+from colorsource.formats import LsfFile, fast_showfile_from_dict
+from colorsource.formats.compact import FROZEN
+from colorsource.formats.dedupe import DedupePool
+
+DEFAULT_SHOWFILE = Path(__file__).parent.parent / "examples" / "showfile.json"
+
+
+def traced(load):
+    tracemalloc.start()
+    result = load()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def check(data: dict) -> None:
+    pool = DedupePool()
+    pool.tuple((0, 0, 0))
+    assert type(pool.tuple((0.0, 0.0, 0.0))[0]) is float
+
+    broken = json.loads(json.dumps(data))
+    del broken["play"]["cueList"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "broken.lsf"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("showfile.json", json.dumps(broken))
+            zf.writestr("settings.json", "{}")
+        try:
+            LsfFile.open(path, pool=DedupePool())
+        except KeyError as e:
+            assert e.args == ("cueList",), e
+        else:
+            raise AssertionError("a show without cueList loaded")
+
+
+def main() -> None:
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SHOWFILE
+    data = json.loads(path.read_text(encoding="utf-8"))
+    check(data)
+
+    loaders = {
+        "dataclass": lambda pool: fast_showfile_from_dict(data, pool=pool),
+        "FROZEN": lambda pool: FROZEN.from_dict(data, pool=pool),
+    }
+    print(f"{path.name}: resident size and equality of two loads")
+    for name, load in loaders.items():
+        for pool in (None, DedupePool()):
+            label = f"{name}{' + pool' if pool else ''}"
+            first, size = traced(lambda: load(pool))
+            second = load(pool)
+            assert first == second
+            best = min(timeit.repeat(lambda: first == second, number=20, repeat=5))
+            print(
+                f"  {label:<18} {size / 1024:8.1f} KiB"
+                f"  eq {best / 20 * 1e3:6.2f} ms"
+            )
+            if pool is not None:
+                for line in pool.report().splitlines():
+                    print(f"    {line}")
+
+
+if __name__ == "__main__":
+    main()
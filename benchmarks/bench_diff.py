@@ -0,0 +1,84 @@
+"""Structural diff against a line diff of the extracted JSON.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_diff [path/to/show.lsf]
+
+The show is loaded twice and the second copy edited: one step's up time, one
+device's address, one palette color, a removed and an added step. The line
+diff encodes both copies with ``indent=2`` as ``extract_json_files`` does
+and runs ``difflib.unified_diff``. The structural diff is timed with a fresh
+``ShowDiffer``, which hashes both trees, and again with the digests of the
+original kept, as when comparing one version against several edits.
+"""
+
+import copy
+import difflib
+import io
+import sys
+import time
+from pathlib import Path
+
+from colorsource.formats import LsfFile, ShowDiffer
+from colorsource.formats.encoder import write_json
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+
+
+def edit(lsf: LsfFile) -> None:
+    play = lsf.showfile.play
+    steps = play.cue_list.steps
+    steps[len(steps) // 2].up_time += 5
+    play.patch.devices[len(play.patch.devices) // 2].dmx += 6
+    palette = next(p for p in play.color_palettes if p.colors)
+    palette.colors[0].r = 255 - palette.colors[0].r
+    added = copy.deepcopy(steps[3])
+    added.cue = max(s.cue for s in steps) + 10
+    del steps[1]
+    steps.append(added)
+
+
+def lines(lsf: LsfFile) -> list:
+    buffer = io.BytesIO()
+    write_json(buffer, lsf.showfile, 2)
+    return buffer.getvalue().decode().splitlines()
+
+
+def timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    old = LsfFile.from_file(source)
+    new = LsfFile.from_file(source)
+    edit(new)
+
+    result = []
+    text = timed(
+        lambda: result.extend(difflib.unified_diff(lines(old), lines(new), n=0))
+    )
+    print(f"{source.name}:")
+    print(f"  line diff        {text * 1e3:9.1f} ms  {len(result):5} lines")
+
+    differ = ShowDiffer()
+    changes = []
+    first = timed(lambda: changes.extend(differ.diff(old.showfile, new.showfile)))
+    print(f"  structural diff  {first * 1e3:9.1f} ms  {len(changes):5} changes")
+    for change in changes:
+        print(f"    {change}"[:100])
+
+    differ.clear()
+    differ.digest(old.showfile)
+    other = LsfFile.from_file(source)
+    edit(other)
+    kept = timed(lambda: differ.diff(old.showfile, other.showfile))
+    print(f"  old digests kept {kept * 1e3:9.1f} ms")
+    again = timed(lambda: differ.diff(old.showfile, other.showfile))
+    print(f"  both kept        {again * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Frame rate of DmxRenderer on the example patch and on synthetic rigs.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_dmx [path/to/show.lsf]
+
+The synthetic rigs repeat the example's multi-parameter fixture across N
+universes (85 six-slot fixtures each) with a cue setting every channel. Each
+cue is rendered into a preallocated frame from ``Content``, from
+``ColumnarContent``, and from cue values computed once with
+``DmxRenderer.values``, as a fade engine would. Install NumPy to time the
+vectorized path; without it the pure-Python path is timed. Before timing, a
+cue that sets one channel many times is checked to render as its last row on
+both paths.
+"""
+
+import copy
+import sys
+import timeit
+from pathlib import Path
+
+from colorsource.dmx import DmxRenderer, render
+from colorsource.formats import ColumnarContent, LsfFile
+from colorsource.formats.showfile import Content, Level, LtpParameter, Patch
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+UNIVERSES = (1, 8, 64)
+
+
+def synthetic(patch: Patch, universes: int) -> tuple:
+    """A patch of ``universes`` full universes of the first personality."""
+    personality = patch.personalities[0]
+    template = next(d for d in patch.devices if d.personality_dcid == personality.dcid)
+    devices = []
+    for universe in range(1, universes + 1):
+        for i in range(512 // template.footprint):
+            device = copy.copy(template)
+            device.channel = len(devices)
+            device.device_id = len(devices) + 1
+            device.space = universe
+            device.dmx = 1 + i * template.footprint
+            devices.append(device)
+    rig = Patch(devices, patch.parameters, [personality], [], False)
+    colors = sum(p.type == render.COLOR for p in personality.parameters)
+    levels = [Level(255, d.channel, [128] * colors, 0, 200, 255) for d in devices]
+    ltp = [
+        LtpParameter(d.channel, False, -1, parameter.number, 10)
+        for d in devices
+        for parameter in patch.parameters
+    ]
+    return rig, Content([], 0, levels, ltp)
+
+
+def check_duplicates(patch: Patch, channel: int) -> None:
+    """Assert the last row of a repeated channel wins on both paths."""
+    rows = [Level(0, channel, [], 0, 255, 255)]
+    rows += [Level(0, channel, [255 - i, i, 0], 0, i, 0) for i in range(64)]
+    content = Content([], 0, rows, [])
+    expected = Content([], 0, rows[-1:], [])
+    numpy = render.np
+    try:
+        for module in {numpy, None}:
+            render.np = module
+            renderer = DmxRenderer(patch)
+            assert renderer.frames(content) == renderer.frames(expected), module
+    finally:
+        render.np = numpy
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    play = LsfFile.from_file(source).showfile.play
+    cue = max(play.cue_list.steps, key=lambda s: len(s.content.levels)).content
+    check_duplicates(play.patch, cue.levels[0].channel)
+    cases = [(source.name, play.patch, cue)]
+    for universes in UNIVERSES:
+        rig, content = synthetic(play.patch, universes)
+        cases.append((f"{universes} universes", rig, content))
+
+    path = "numpy" if render.np is not None else "pure Python"
+    print(f"{path}: frames per second, best of 5")
+    print(f"  {'':<16} {'slots':>7} {'Content':>10} {'Columnar':>10} {'values':>10}")
+    for name, patch, content in cases:
+        renderer = DmxRenderer(patch)
+        columnar = ColumnarContent.from_content(content)
+        frame = renderer.blank()
+        assert renderer.frames(content) == renderer.frames(columnar)
+        values = renderer.values(columnar)
+        runs = {
+            "render(Content)": lambda: renderer.render(content, frame),
+            "render(Columnar)": lambda: renderer.render(columnar, frame),
+            "apply(values)": lambda: renderer.apply(values, frame),
+        }
+        rates = []
+        number = max(1, 20000 // max(1, len(renderer)))
+        for run in runs.values():
+            best = min(timeit.repeat(run, number=number, repeat=5))
+            rates.append(f"{number / best:10.0f}")
+        print(f"  {name:<16} {len(renderer):7} {' '.join(rates)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Autosave latency: LsfFile.to_file against IncrementalSaver.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_incremental [path/to/show.lsf]
+
+Simulates a programming session of 50 edits, each followed by a save: every
+edit changes the level of one channel in one step and is reported with
+``IncrementalSaver.touch``. The JSON encode alone and the complete save are
+timed per edit, with deflate and stored archives, and the JSON encode
+once more with ``verify=True``, which also hashes every element to catch
+edits not reported to ``touch``. Every saved archive of the incremental saver is checked to equal
+the full encode, and an in-place edit without ``touch`` to be saved too.
+"""
+
+import random
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from colorsource.formats import IncrementalSaver, LsfFile
+from colorsource.formats.encoder import iter_json
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+EDITS = 50
+
+
+def edit(lsf: LsfFile, rng: random.Random, saver: IncrementalSaver) -> None:
+    steps = [s for s in lsf.showfile.play.cue_list.steps if s.content.levels]
+    level = rng.choice(rng.choice(steps).content.levels)
+    level.level = rng.randrange(256)
+    saver.touch(level)
+
+
+def check_untouched(source: Path) -> None:
+    """With ``verify``, an in-place edit that is not reported is saved."""
+    lsf = LsfFile.from_file(source)
+    saver = IncrementalSaver(lsf, verify=True)
+    saver.dumps()
+    lsf.showfile.play.cue_list.steps[3].up_time = 99
+    assert saver.dumps() == "".join(iter_json(lsf.showfile, 2))
+    assert saver.stale == 1
+
+
+def session(source: Path, save, **options) -> float:
+    """Mean seconds per save over EDITS edits."""
+    lsf = LsfFile.from_file(source)
+    saver = IncrementalSaver(lsf, **options)
+    saver.dumps()  # the session starts from a saved show
+    rng = random.Random(0)
+    total = 0.0
+    for _ in range(EDITS):
+        edit(lsf, rng, saver)
+        start = time.perf_counter()
+        save(lsf, saver)
+        total += time.perf_counter() - start
+    assert saver.dumps() == "".join(iter_json(lsf.showfile, 2))
+    return total / EDITS
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    check_untouched(source)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "autosave.lsf"
+        stored = dict(compression=zipfile.ZIP_STORED)
+        full_json = (
+            lambda lsf, saver: "".join(iter_json(lsf.showfile, 2)),
+            lambda lsf, saver: saver.dumps(),
+        )
+        cases = {
+            "JSON only": full_json,
+            "JSON, verify": full_json,
+            "save, deflate 6": (
+                lambda lsf, saver: lsf.to_file(path),
+                lambda lsf, saver: saver.save(path),
+            ),
+            "save, deflate 1": (
+                lambda lsf, saver: lsf.to_file(path, compresslevel=1),
+                lambda lsf, saver: saver.save(path, compresslevel=1),
+            ),
+            "save, stored": (
+                lambda lsf, saver: lsf.to_file(path, **stored),
+                lambda lsf, saver: saver.save(path, **stored),
+            ),
+        }
+        print(f"{source.name}: {EDITS} edits, mean per save")
+        for name, (full, incremental) in cases.items():
+            options = dict(verify=True) if name == "JSON, verify" else {}
+            a = session(source, full)
+            b = session(source, incremental, **options)
+            print(
+                f"  {name:<16} full {a * 1e3:7.2f} ms  "
+                f"incremental {b * 1e3:7.2f} ms  {a / b:5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Metadata-only scan of a directory of shows: full load vs lazy open.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_lazy [directory]
+
+Without a directory, a temporary one is filled with copies of the example show.
+Before timing, the first show is saved and extracted from a lazy open and
+checked against a full load, so a lazily opened show must round-trip.
+"""
+
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from colorsource.formats import LsfFile
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+COPIES = 50
+
+
+def scan(paths, lazy):
+    start = time.perf_counter()
+    for path in paths:
+        lsf = LsfFile.open(path, lazy=lazy)
+        (lsf.show_name, lsf.software_version, lsf.console_model)
+    return time.perf_counter() - start
+
+
+def check_roundtrip(path: Path) -> None:
+    """Save and extract a lazily opened show; both must match a full load."""
+    full = LsfFile.from_file(path)
+    with tempfile.TemporaryDirectory() as tmp:
+        saved = Path(tmp) / "saved.lsf"
+        LsfFile.open(path, lazy=True).to_file(saved)
+        assert LsfFile.from_file(saved) == full
+        LsfFile.open(path, lazy=True).extract_json_files(Path(tmp) / "json")
+        extracted = (Path(tmp) / "json" / "showfile.json").read_bytes()
+        full.extract_json_files(Path(tmp) / "full")
+        assert extracted == (Path(tmp) / "full" / "showfile.json").read_bytes()
+
+
+def run(directory: Path) -> None:
+    paths = sorted(directory.glob("*.lsf"))
+    check_roundtrip(paths[0])
+    full = min(scan(paths, lazy=False) for _ in range(3))
+    lazy = min(scan(paths, lazy=True) for _ in range(3))
+    print(f"{len(paths)} shows in {directory}")
+    print(f"  full load     {full * 1e3 / len(paths):8.2f} ms/show")
+    print(f"  lazy metadata {lazy * 1e3 / len(paths):8.2f} ms/show  {full / lazy:5.1f}x")
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        run(Path(sys.argv[1]))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(COPIES):
+            shutil.copy(EXAMPLE, Path(tmp) / f"show{i:03}.lsf")
+        run(Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
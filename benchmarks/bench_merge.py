@@ -0,0 +1,121 @@
+"""Fader moves through MergeEngine against re-merging every source.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_merge [path/to/show.lsf]
+
+Builds synthetic rigs of the example's fixture (85 per universe, see
+``bench_dmx``) with a cue setting every channel and 20 memories, each on
+its own slice of the rig with 4 masters up. One master is then moved
+through 64 levels, and every move is merged two ways: by re-merging the
+cue list and every master from scratch, as a previz that merges per frame
+does, and by :meth:`.MergeEngine.set_level`, which re-resolves only the
+keys of the moved memory. Both must produce the same values. Independents
+are checked first to output only on a universe the rig patches.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.bench_dmx import synthetic
+from colorsource.dmx import DmxRenderer
+from colorsource.formats import LsfFile
+from colorsource.formats.showfile import Content
+from colorsource.playback import MergeEngine, merge
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+UNIVERSES = (1, 12, 64)
+MEMORIES = 20
+MOVES = [round(i * 255 / 63) for i in range(64)]
+
+
+def full_merge(cue, layers, channels):
+    """Every key of the cue list and ``(values, level)`` layers, in order."""
+    np = merge.np
+    if np is not None:
+        values = np.array(cue, dtype=np.int64)
+        intensity = values[:channels]
+        for layer, level in layers:
+            if level <= 0:
+                continue
+            scaled = np.where(layer[:channels] >= 0, layer[:channels] * level, -255)
+            np.maximum(intensity, np.rint(scaled / 255).astype(np.int64), out=intensity)
+            other = layer[channels:]
+            values[channels:] = np.where(other >= 0, other, values[channels:])
+        return values.tolist()
+    values = list(cue)
+    for layer, level in layers:
+        if level <= 0:
+            continue
+        for key, value in enumerate(layer):
+            if value < 0:
+                continue
+            if key < channels:
+                values[key] = max(values[key], round(value * level / 255))
+            else:
+                values[key] = value
+    return values
+
+
+def check_independents(patch) -> None:
+    """An independent outputs only on its own universe, if patched."""
+    rig, _ = synthetic(patch, 1)
+    for device in rig.devices:
+        device.space = 2
+    renderer = DmxRenderer(rig)
+    engine = MergeEngine(renderer)
+    engine.add_independent("first", [1], 200, True)
+    assert bytes(engine.render()) == bytes(renderer.blank())
+    engine.add_independent("second", [1], 200, True, universe=2)
+    assert bytes(engine.render())[0] == 200
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    play = LsfFile.from_file(source).showfile.play
+    check_independents(play.patch)
+    path = "numpy" if merge.np is not None else "pure Python"
+    print(f"{path}: milliseconds per fader move, mean of {len(MOVES)}")
+    print(f"  {'':<14} {'devices':>8} {'keys':>8} {'full':>10} {'engine':>10}")
+    for universes in UNIVERSES:
+        rig, content = synthetic(play.patch, universes)
+        renderer = DmxRenderer(rig)
+        cue = renderer.values(content)
+        size = len(content.levels) // MEMORIES
+        memories = []
+        for i in range(MEMORIES):
+            channels = range(i * size, (i + 1) * size)
+            ltp = [p for p in content.ltp_parameters if p.channel in channels]
+            rows = content.levels[channels.start : channels.stop]
+            memories.append(renderer.values(Content([], 0, rows, ltp)))
+        levels = [255 if i < 4 else 0 for i in range(MEMORIES)]
+        moved = MEMORIES - 1
+
+        engine = MergeEngine(renderer)
+        engine.add("cue", cue)
+        for i, values in enumerate(memories):
+            engine.add(i, values, levels[i])
+
+        start = time.perf_counter()
+        for level in MOVES:
+            levels[moved] = level
+            expected = full_merge(cue, list(zip(memories, levels)), renderer.channels)
+        full = (time.perf_counter() - start) / len(MOVES)
+
+        resolved = engine.resolved
+        start = time.perf_counter()
+        for level in MOVES:
+            engine.set_level(moved, level)
+        incremental = (time.perf_counter() - start) / len(MOVES)
+        keys = (engine.resolved - resolved) / len(MOVES)
+        assert list(engine.values) == expected
+
+        print(
+            f"  {f'{universes} universes':<14} {len(rig.devices):8} {keys:8.0f} "
+            f"{full * 1e3:10.3f} {incremental * 1e3:10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
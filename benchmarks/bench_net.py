@@ -0,0 +1,75 @@
+"""Send cost of NetworkOutput for synthetic rigs of 1 to 64 universes.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_net
+
+Frames are sent as sACN and Art-Net to a socket bound on localhost, which is
+never read. Each rig is timed with every universe changing on every tick,
+with frames that never change (only keep-alives are sent), and with a naive
+sender that builds every packet anew with ``struct`` for each tick.
+"""
+
+import socket
+import struct
+import time
+
+from colorsource.dmx import UNIVERSE_SIZE, NetworkOutput
+from colorsource.dmx.net import artnet_packet, sacn_packet
+
+UNIVERSES = (1, 8, 64)
+TICKS = 200
+
+
+def naive(sock: socket.socket, address: tuple, frame: bytearray, tick: int) -> None:
+    """Build and send both packets of every universe from scratch."""
+    cid = bytes(16)
+    for row in range(len(frame) // UNIVERSE_SIZE):
+        data = bytes(frame[row * UNIVERSE_SIZE : (row + 1) * UNIVERSE_SIZE])
+        packet = sacn_packet(row + 1, cid)
+        packet[111] = tick % 256
+        packet[126:] = data
+        sock.sendto(bytes(packet), (address[0], address[1]))
+        header = b"Art-Net\x00" + struct.pack("<HBBBBHH", 0x5000, 0, 14, 1, 0, row, 0)
+        sock.sendto(header[:16] + struct.pack(">H", UNIVERSE_SIZE) + data, address)
+
+
+def main() -> None:
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    port = sink.getsockname()[1]
+    ports = {"sacn": port, "artnet": port}
+    assert len(artnet_packet(0)) == 18 + UNIVERSE_SIZE
+
+    print(f"mean ms per tick over {TICKS} ticks, sACN and Art-Net")
+    print(f"  {'universes':>9} {'changing':>10} {'unchanged':>10} {'naive':>10}")
+    for universes in UNIVERSES:
+        frames = [
+            bytearray([tick % 256]) * (universes * UNIVERSE_SIZE) for tick in range(2)
+        ]
+        output = NetworkOutput(range(1, universes + 1), host="127.0.0.1", ports=ports)
+        start = time.perf_counter()
+        for tick in range(TICKS):
+            output.send(frames[tick % 2])
+        changing = (time.perf_counter() - start) / TICKS
+        start = time.perf_counter()
+        for tick in range(TICKS):
+            output.send(frames[0])
+        unchanged = (time.perf_counter() - start) / TICKS
+        output.close(terminate=False)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        start = time.perf_counter()
+        for tick in range(TICKS):
+            naive(sock, ("127.0.0.1", port), frames[tick % 2], tick)
+        slow = (time.perf_counter() - start) / TICKS
+        sock.close()
+        print(
+            f"  {universes:9} {changing * 1e3:10.3f} {unchanged * 1e3:10.3f} "
+            f"{slow * 1e3:10.3f}"
+        )
+    sink.close()
+
+
+if __name__ == "__main__":
+    main()
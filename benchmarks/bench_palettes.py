@@ -0,0 +1,146 @@
+"""Palette reference resolution: list scans against PaletteResolver.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_palettes [path/to/show.lsf]
+
+The example show stores literal values only, so palette references are
+added first: every beam palette gets a value of every LTP parameter of
+every channel, and every cue's LTP parameters reference beam palette
+``1 + cue % N``, plus a color palette reference for each channel it sets a
+level on. All cues are then resolved:
+
+- ``scan``: each reference looks up its palette by scanning the palette
+  lists and its entry by scanning the palette, as without tables
+- ``cold``: a new :class:`.PaletteResolver`, building every table
+- ``warm``: the same resolver after one edited beam palette was
+  invalidated, so only its table and the cues using it are redone
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from colorsource.formats import LsfFile, PaletteResolver
+from colorsource.formats.palettes import KINDS
+from colorsource.formats.showfile import Content, LtpParameter, Play
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+
+
+def add_references(play: Play) -> None:
+    channels = sorted({d.channel for d in play.patch.devices})
+    numbers = [p.number for p in play.patch.parameters]
+    for palette in play.beam_palettes:
+        palette.ltp_parameters = [
+            {
+                "channel": channel,
+                "is16Bit": False,
+                "palette": -1,
+                "parameter": number,
+                "value": palette.palette * 10 % 256,
+            }
+            for channel in channels
+            for number in numbers
+        ]
+    beams = len(play.beam_palettes)
+    colors = len(play.color_palettes)
+    for step in play.cue_list.steps:
+        content = step.content
+        beam = 1 + step.cue % beams
+        color = 1 + step.cue % colors
+        references = [
+            LtpParameter(p.channel, p.is16_bit, beam, p.parameter, p.value)
+            for p in content.ltp_parameters
+        ]
+        references += [
+            LtpParameter(level.channel, False, color, -1, 0) for level in content.levels
+        ]
+        step.content = Content(
+            content.assigned_ranges, content.include_flags, content.levels, references
+        )
+
+
+def scan(play: Play, content: Content) -> tuple:
+    """Resolve ``content`` the way the tables do, scanning lists instead."""
+    parameters = []
+    colors = {}
+    for p in content.ltp_parameters:
+        if p.palette < 0:
+            parameters.append(p)
+            continue
+        found = None
+        for kind in KINDS:
+            for palette in getattr(play, f"{kind}_palettes"):
+                if palette.palette != p.palette:
+                    continue
+                for entry in palette.ltp_parameters:
+                    if (entry["channel"], entry["parameter"]) == (
+                        p.channel,
+                        p.parameter,
+                    ):
+                        found = entry
+                        break
+                break
+            if found is not None:
+                break
+        if found is not None:
+            parameters.append(
+                LtpParameter(
+                    p.channel, found["is16Bit"], p.palette, p.parameter, found["value"]
+                )
+            )
+            continue
+        parameters.append(p)
+        for palette in play.color_palettes:
+            if palette.palette == p.palette:
+                for c in palette.colors or ():
+                    if c.channel == p.channel:
+                        colors[p.channel] = c
+                        break
+                break
+    return parameters, colors
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    play = LsfFile.from_file(source).showfile.play
+    add_references(play)
+    contents = [step.content for step in play.cue_list.steps]
+    references = sum(
+        p.palette >= 0 for content in contents for p in content.ltp_parameters
+    )
+    print(f"{source.name}: {len(contents)} cues, {references} palette references")
+
+    start = time.perf_counter()
+    expected = [scan(play, content) for content in contents]
+    print(f"  scan  {(time.perf_counter() - start) * 1e3:8.2f} ms")
+
+    resolver = PaletteResolver(play)
+    start = time.perf_counter()
+    resolved = [resolver.resolve(content) for content in contents]
+    print(
+        f"  cold  {(time.perf_counter() - start) * 1e3:8.2f} ms"
+        f"  ({resolver.builds} tables)"
+    )
+    for (parameters, colors), resolution in zip(expected, resolved):
+        assert resolution.ltp_parameters == parameters
+        assert resolution.colors == colors
+
+    edited = play.beam_palettes[0]
+    edited.ltp_parameters[0]["value"] = 255
+    builds = resolver.builds
+    start = time.perf_counter()
+    resolver.invalidate(edited)
+    for content in contents:
+        resolver.resolve(content)
+    print(
+        f"  warm  {(time.perf_counter() - start) * 1e3:8.2f} ms"
+        f"  ({resolver.builds - builds} rebuilt after one edit)"
+    )
+    for content in contents:
+        assert resolver.resolve(content).ltp_parameters == scan(play, content)[0]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Patch lookups with PatchIndex against linear scans of the patch lists.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_patch_index [path/to/show.lsf]
+
+Runs on the example patch and on a synthetic 64-universe patch of the
+example's multi-parameter fixture (see ``bench_dmx``). Each row times one
+lookup of every kind (channel, DMX address, dcid, topology) on random keys,
+then a re-address of a random device.
+"""
+
+import random
+import sys
+import timeit
+from pathlib import Path
+
+from benchmarks.bench_dmx import synthetic
+from colorsource.formats import LsfFile
+from colorsource.formats.showfile import Patch
+from colorsource.patch import PatchIndex
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+LOOKUPS = 1000
+
+
+def scan(patch: Patch, channel: int, space: int, address: int, dcid: str) -> tuple:
+    devices = [d for d in patch.devices if d.channel == channel]
+    slot = next(
+        (
+            d
+            for d in patch.devices
+            if d.space == space and d.dmx <= address < d.dmx + d.footprint
+        ),
+        None,
+    )
+    personality = next((p for p in patch.personalities if p.dcid == dcid), None)
+    topo = next((t for t in patch.topo if t.device_id == channel), None)
+    return devices, slot, personality, topo
+
+
+def indexed(
+    index: PatchIndex, channel: int, space: int, address: int, dcid: str
+) -> tuple:
+    slot = index.slot_at(space, address)
+    return (
+        index.devices_on(channel),
+        slot.device if slot else None,
+        index.personality(dcid),
+        index.topo(channel),
+    )
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    example = LsfFile.from_file(source).showfile.play.patch
+    cases = [(source.name, example), ("64 universes", synthetic(example, 64)[0])]
+    rng = random.Random(0)
+    print(f"per lookup of each kind, {LOOKUPS} random keys")
+    for name, patch in cases:
+        index = PatchIndex(patch)
+        dcids = [p.dcid for p in patch.personalities]
+        spaces = index.universes()
+        keys = [
+            (
+                rng.randrange(len(patch.devices)),
+                rng.choice(spaces),
+                rng.randrange(1, 513),
+                rng.choice(dcids),
+            )
+            for _ in range(LOOKUPS)
+        ]
+        for key in keys:
+            assert scan(patch, *key) == indexed(index, *key)
+        build = min(timeit.repeat(lambda: PatchIndex(patch), number=1, repeat=3))
+        linear = timeit.timeit(lambda: [scan(patch, *k) for k in keys], number=1)
+        fast = timeit.timeit(lambda: [indexed(index, *k) for k in keys], number=1)
+        devices = [d.device_id for d in patch.devices]
+
+        def move() -> None:
+            device = index.device(rng.choice(devices))
+            index.readdress(device.device_id, device.dmx, device.space)
+
+        moved = timeit.timeit(move, number=LOOKUPS)
+        print(
+            f"  {name:<14} {len(patch.devices):6} devices  "
+            f"build {build * 1e3:7.2f} ms  scan {linear / LOOKUPS * 1e6:9.1f} us  "
+            f"index {fast / LOOKUPS * 1e6:6.2f} us  "
+            f"readdress {moved / LOOKUPS * 1e6:6.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Render time of a whole cue list through Playback.play.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_playback [path/to/show.lsf] [hold seconds]
+
+Every step of the cue list is played in order at 44 Hz, with ``hold`` seconds
+(default 0.5) between a completed fade and the next manual GO. The first run
+computes and caches every fade; the second replays them from the cache.
+
+First the cache is checked to tell apart states that differ only in values
+set by earlier cues: ``go(X), go(A), go(B)`` and then ``go(Y), go(A),
+go(B)``, where X and Y set different colors on channel 0 and A and B only
+its level, must end in Y's colors, as on a fresh ``Playback``.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from colorsource.dmx import DmxRenderer, render
+from colorsource.formats import LsfFile
+from colorsource.formats.showfile import Content, Level, Patch
+from colorsource.playback import Playback
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+
+
+def check_cache(patch: Patch) -> None:
+    renderer = DmxRenderer(patch)
+
+    def cue(level: int, colors: list) -> Content:
+        return Content([], 0, [Level(0, 0, colors, 0, level, 0)], [])
+
+    x, y = cue(255, [255, 0, 0]), cue(255, [0, 255, 0])
+    a, b = cue(128, []), cue(64, [])
+    colors = slice(renderer.channels, renderer.channels + 3)
+    playback = Playback(renderer)
+    for first in (x, y):
+        playback.reset()
+        for content in (first, a, b):
+            fade = playback.go(content, 1.0)
+    fresh = Playback(renderer)
+    for content in (y, a, b):
+        expected = fresh.go(content, 1.0)
+    assert list(fade.target[colors]) == [0, 65535, 0]
+    assert list(fade.values(10)) == list(expected.values(10))
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    hold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    play = LsfFile.from_file(source).showfile.play
+    check_cache(play.patch)
+    steps = play.cue_list.steps
+    playback = Playback(DmxRenderer(play.patch))
+
+    path = "numpy" if render.np is not None else "pure Python"
+    print(f"{source.name}: {len(steps)} steps at {playback.rate:g} Hz, {path}")
+    for run in ("first run", "cached"):
+        playback.reset()
+        start = time.perf_counter()
+        frames = sum(1 for _ in playback.play(steps, hold))
+        elapsed = time.perf_counter() - start
+        show = frames / playback.rate
+        print(
+            f"  {run:<10} {frames} frames, {show:.1f} s of show "
+            f"in {elapsed * 1e3:.0f} ms, {show / elapsed:.0f}x real time"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Frame clock of ShowRuntime: a whole show headless at 10x speed.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_runtime [path/to/show.lsf] [speed]
+
+Plays every step of the cue list through ``run_headless``, GO after GO, and
+reports how late the ticks woke up, how many were missed, and how many
+distinct frames the show produced.
+"""
+
+import asyncio
+import sys
+import time
+import zlib
+from pathlib import Path
+
+from colorsource.formats import LsfFile
+from colorsource.playback import run_headless
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+SPEED = 10.0
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    speed = float(sys.argv[2]) if len(sys.argv) > 2 else SPEED
+    play = LsfFile.from_file(source).showfile.play
+    frames = {}
+
+    def sink(tick: int, frame) -> None:
+        frames[tick] = zlib.crc32(memoryview(frame).cast("B"))
+
+    start = time.perf_counter()
+    runtime = asyncio.run(run_headless(play, speed=speed, sinks=[sink]))
+    wall = time.perf_counter() - start
+    stats = runtime.stats
+    show = runtime.tick / runtime.rate
+
+    print(f"{source.name}: {len(play.cue_list.steps)} steps at {speed:g}x")
+    print(f"  show time {show:8.1f} s   wall {wall:6.2f} s   {show / wall:5.1f}x")
+    print(f"  ticks {stats.ticks}, missed {stats.missed}")
+    print(
+        f"  lateness mean {stats.mean * 1e3:.3f} ms  p99 "
+        f"{stats.percentile(99) * 1e3:.3f} ms  max "
+        f"{max(stats.lateness, default=0) * 1e3:.3f} ms  "
+        f"jitter {stats.jitter * 1e3:.3f} ms"
+    )
+    print(f"  distinct frames {len(set(frames.values()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Save latency and archive size of the LsfFile.to_file modes.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_save [path/to/show.lsf]
+
+Every archive is loaded back with LsfFile.from_file and compared to the
+original.
+"""
+
+import json
+import sys
+import tempfile
+import timeit
+import zipfile
+from pathlib import Path
+
+from colorsource.formats import LsfFile, showfile_to_dict
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+
+MODES = {
+    "indent=2, deflate 6": dict(indent=2),
+    "compact, deflate 6": dict(indent=None),
+    "compact, deflate 1": dict(indent=None, compresslevel=1),
+    "compact, stored": dict(indent=None, compression=zipfile.ZIP_STORED),
+    "indent=2, stored": dict(indent=2, compression=zipfile.ZIP_STORED),
+}
+
+
+def legacy_save(lsf: LsfFile, path: Path) -> None:
+    """The previous to_file: full dumps, then writestr."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        text = json.dumps(showfile_to_dict(lsf.showfile), indent=2)
+        zf.writestr("showfile.json", text.encode("utf-8"))
+        text = json.dumps(lsf.settings.to_dict(), indent=2)
+        zf.writestr("settings.json", text.encode("utf-8"))
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    lsf = LsfFile.from_file(source)
+    cases = {"legacy dumps + writestr": lambda path: legacy_save(lsf, path)}
+    for name, options in MODES.items():
+        cases[name] = lambda path, options=options: lsf.to_file(path, **options)
+
+    print(f"{source.name}: best of 5")
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (name, save) in enumerate(cases.items()):
+            path = Path(tmp) / f"mode{i}.lsf"
+            best = min(timeit.repeat(lambda: save(path), number=3, repeat=5)) / 3
+            assert LsfFile.from_file(path) == lsf
+            size = path.stat().st_size
+            print(f"  {name:<24} {best * 1e3:8.2f} ms {size / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
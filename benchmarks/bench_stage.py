@@ -0,0 +1,61 @@
+"""Stage map images of every cue: layout, drawing and PNG encoding.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_stage [path/to/show.lsf]
+
+Times building the layout of each distinct view once, then drawing the
+tracked state of every step into one reused buffer, and encoding the
+results as PNG, per cue. The last line writes every cue to a temporary
+directory with ``render_cues``.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from colorsource.formats import LsfFile
+from colorsource.playback.tracking import TrackingResolver
+from colorsource.stage import StageMap, encode_png, render_cues
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    play = LsfFile.from_file(source).showfile.play
+    resolver = TrackingResolver(play.cue_list)
+    contents = [resolver.content(i) for i in range(len(resolver))]
+    views = [None] + list(
+        {(v.x, v.y, v.scale, v.height): v for v in play.views}.values()
+    )
+
+    print(f"{source.name}: {len(contents)} cues")
+    for view in views:
+        start = time.perf_counter()
+        stage = StageMap(play.patch, view)
+        layout = time.perf_counter() - start
+        out = stage.blank()
+        start = time.perf_counter()
+        for content in contents:
+            stage.render(content, out)
+        draw = (time.perf_counter() - start) / len(contents)
+        start = time.perf_counter()
+        for content in contents:
+            encode_png(stage.width, stage.height, stage.render(content, out))
+        encode = (time.perf_counter() - start) / len(contents) - draw
+        print(
+            f"  {stage.width:4} x {stage.height:<4} layout {layout * 1e3:6.2f} ms  "
+            f"draw {draw * 1e3:6.3f} ms/cue  png {encode * 1e3:6.3f} ms/cue"
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        count = sum(1 for _ in render_cues(play, directory))
+        elapsed = time.perf_counter() - start
+    print(f"  render_cues: {count} files in {elapsed * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Peak memory of the default and the streaming load paths.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_streaming [path/to/show.lsf]
+
+Each mode runs in a fresh interpreter so peak RSS is not shared between them.
+"""
+
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from colorsource.formats import LsfFile
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+MODES = {
+    "from_file": lambda path: LsfFile.from_file(path),
+    "open(stream=True)": lambda path: LsfFile.open(path, stream=True),
+}
+
+
+def measure(mode: str, path: str) -> None:
+    load = MODES[mode]
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    load(path)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    load(path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    lsf = load(path)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert lsf.show_name
+    print(
+        f"  {mode:<18} {elapsed * 1e3:7.1f} ms"
+        f"  peak {peak / 2**20:5.2f} MiB  retained {retained / 2**20:5.2f} MiB"
+        f"  max RSS +{(rss_after - rss_before) / 1024:5.2f} MiB"
+    )
+
+
+def main() -> None:
+    if len(sys.argv) > 2:
+        measure(sys.argv[2], sys.argv[1])
+        return
+    path = sys.argv[1] if len(sys.argv) > 1 else str(EXAMPLE)
+    print(f"{path}: time, traced allocations and RSS growth of one load")
+    for mode in MODES:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_streaming", path, mode],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
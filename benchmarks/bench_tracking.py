@@ -0,0 +1,74 @@
+"""Tracked state of every cue: naive replay against TrackingResolver.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_tracking [path/to/show.lsf]
+
+The cue list is repeated to 1x, 10x and 50x its length. For each, the state
+of every step is computed in random order, once by replaying from the first
+step and once with a resolver, whose result is checked against the replay
+on the original length. The last column times an edit to the middle step
+followed by another full pass.
+"""
+
+import dataclasses
+import random
+import sys
+import time
+from pathlib import Path
+
+from colorsource.formats import LsfFile
+from colorsource.formats.showfile import CueList
+from colorsource.playback.tracking import TrackedState, TrackingResolver
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "SKM.lsf"
+REPEATS = (1, 10, 50)
+
+
+def naive(cue_list: CueList, index: int) -> TrackedState:
+    state = TrackedState()
+    for step in cue_list.steps[: index + 1]:
+        state.apply(step.content)
+    return state
+
+
+def timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else EXAMPLE
+    cue_list = LsfFile.from_file(source).showfile.play.cue_list
+    order = list(range(len(cue_list.steps)))
+    random.Random(0).shuffle(order)
+    resolver = TrackingResolver(cue_list)
+    assert all(resolver.state(i) == naive(cue_list, i) for i in order)
+
+    print(f"{source.name}: state of every step, random order")
+    for repeat in REPEATS:
+        steps = cue_list.steps * repeat
+        repeated = dataclasses.replace(cue_list, steps=steps)
+        order = list(range(len(steps)))
+        random.Random(0).shuffle(order)
+        replay = timed(lambda: [naive(repeated, i) for i in order])
+        resolver = TrackingResolver(repeated)
+        first = timed(lambda: [resolver.state(i) for i in order])
+        again = timed(lambda: [resolver.state(i) for i in order])
+
+        def edit() -> None:
+            resolver.invalidate(len(steps) // 2)
+            for i in order:
+                resolver.state(i)
+
+        edited = timed(edit)
+        print(
+            f"  {len(steps):5} steps  replay {replay * 1e3:9.1f} ms  "
+            f"resolver {first * 1e3:7.1f} ms, then {again * 1e3:7.1f} ms  "
+            f"edit {edited * 1e3:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""Stage-by-stage benchmark of loading and saving shows, with a baseline.
+
+Run from the repository root::
+
+    python -m benchmarks.suite [--scale 1 10 100] [--output results.json]
+                               [--baseline FILE | --no-baseline]
+                               [--threshold 0.4]
+
+The ``bench_*`` scripts each compare alternatives for one feature. This
+suite instead times the load and save paths a stage at a time, so that a
+change to any of them shows up as a number that moved:
+
+- load: ``unzip`` (read ``showfile.json`` from the archive), ``decode``
+  (UTF-8), ``parse`` (``json.loads``), ``build`` (``showfile_from_dict``) and
+  ``build-compiled`` (``fast_showfile_from_dict``), ``settings``
+  (``Settings.from_dict``), and ``from_file`` end to end
+- save: ``to_dict`` (``showfile_to_dict``), ``dumps`` (``json.dumps`` with
+  ``indent=2``), ``utf8``, ``deflate`` (zlib level 6), ``write_json`` (the
+  streamed encoder), and ``to_file`` end to end
+
+Cases are ``examples/SKM.lsf``, ``examples/showfile.json`` (which starts at
+``decode``) and the example scaled by every ``--scale`` factor above 1: its
+devices, topology, cues and palettes repeated with new ids, channels,
+universes, cue and palette numbers. The x100 show is about 120 MB of JSON
+and takes a few minutes; pass ``--scale 1 10`` for a quick run.
+
+Every stage reports the best time of ``--repeat`` runs, fewer once they
+took :data:`BUDGET` seconds, and, traced by :mod:`tracemalloc` during one
+run, the peak of memory, the allocations the stage made that were still
+live at its end (the positive ``count_diff`` of a snapshot diff by line)
+and the bytes its result retains. ``--output`` writes the results as JSON.
+
+The results are compared to ``benchmarks/baseline.json``, or the
+``--baseline`` file. Both record the time of a fixed standard-library
+workload (:func:`calibrate`), and the baseline times are scaled by the
+ratio of the two, so a machine that is slower as a whole does not flag
+every stage. A stage whose time or peak grew by more than
+``--threshold`` is measured again up to :data:`CONFIRM` times, keeping the
+best of all its runs, and the suite exits with status 1 only if it still
+exceeds the threshold: a one-off stall of the machine is not a
+regression. The committed baseline is a run of the default scales; times
+depend on the machine, so regenerate it with ``--output
+benchmarks/baseline.json`` on the machine that checks for regressions.
+"""
+
+import argparse
+import copy
+import gc
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from colorsource.formats import (
+    LsfFile,
+    Settings,
+    fast_showfile_from_dict,
+    showfile_from_dict,
+    showfile_to_dict,
+)
+from colorsource.formats.encoder import write_json
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+BASELINE = Path(__file__).parent / "baseline.json"
+SCALES = (1, 10, 100)
+THRESHOLD = 0.4
+# Time and peak differences below these are noise, whatever the ratio
+NOISE = {"time": 5e-3, "peak": 64 * 1024}
+# Seconds of timed runs per stage after which fewer than --repeat will do
+BUDGET = 1.0
+# Extra measurements of a stage that looks regressed before it fails
+CONFIRM = 3
+
+_Stage = Tuple[str, Callable[[Any], Any], Any]
+
+
+def scale_show(show: dict, factor: int) -> dict:
+    """The showfile dict with patch, topology, cues and palettes repeated.
+
+    Copy ``k`` of every device, topology entry, step and palette is offset
+    by ``k`` times the span of the originals in device id, channel, universe,
+    topology row, cue number and palette number, so keys stay unique.
+    """
+    show = copy.deepcopy(show)
+    play = show["play"]
+    patch = play["patch"]
+    devices, topo = patch["devices"], patch["topo"]
+    steps = play["cueList"]["steps"]
+    palettes = [play[k] for k in ("colorPalettes", "beamPalettes", "positionPalettes")]
+
+    ids = max(d["deviceId"] for d in devices) + 1
+    channels = max(d["channel"] for d in devices) + 1
+    spaces = max(d["space"] for d in devices)
+    rows = max((t["row"] for t in topo), default=-1) + 1
+    cues = max((s["cue"] for s in steps), default=0) + 10
+    numbers = max((p["palette"] for ps in palettes for p in ps), default=0) + 1
+
+    def offset(items: Optional[list], k: int) -> Optional[list]:
+        if items is None:
+            return None
+        return [dict(item, channel=item["channel"] + k * channels) for item in items]
+
+    originals = [
+        list(devices),
+        list(topo),
+        list(steps),
+        [list(ps) for ps in palettes],
+    ]
+    for k in range(1, factor):
+        for d in originals[0]:
+            devices.append(
+                dict(
+                    d,
+                    deviceId=d["deviceId"] + k * ids,
+                    channel=d["channel"] + k * channels,
+                    space=d["space"] + k * spaces,
+                )
+            )
+        for t in originals[1]:
+            copied = dict(t, row=t["row"] + k * rows)
+            if t["deviceId"] >= 0:
+                copied["deviceId"] += k * ids
+                copied["channel"] += k * channels
+            topo.append(copied)
+        for s in originals[2]:
+            c = s["content"]
+            levels = offset(c["levels"], k)
+            ltp = offset(c["ltpParameters"], k)
+            steps.append(
+                dict(
+                    s,
+                    cue=s["cue"] + k * cues,
+                    content=dict(c, levels=levels, ltpParameters=ltp),
+                )
+            )
+        for ps, original in zip(palettes, originals[3]):
+            for palette in original:
+                copied = dict(palette, palette=palette["palette"] + k * numbers)
+                copied["ltpParameters"] = offset(palette["ltpParameters"], k)
+                if "colors" in palette:
+                    copied["colors"] = offset(palette["colors"], k)
+                ps.append(copied)
+    return show
+
+
+def archive(show: dict, settings: dict) -> bytes:
+    """An LSF archive of the two documents, as ``LsfFile.to_file`` writes."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("showfile.json", json.dumps(show, indent=2))
+        zf.writestr("settings.json", json.dumps(settings, indent=2))
+    return buffer.getvalue()
+
+
+def unzip(data: bytes) -> bytes:
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return zf.read("showfile.json")
+
+
+def stages(
+    data: bytes, settings: dict, lsf: Optional[bytes], tmp: Path
+) -> Iterator[_Stage]:
+    """Every stage with its input, computed by running the pipeline once.
+
+    ``data`` is the UTF-8 ``showfile.json``; with ``lsf``, the archive it
+    came from, the archive stages are included. Files go to ``tmp``.
+    """
+    if lsf is not None:
+        yield "unzip", unzip, lsf
+        (tmp / "show.lsf").write_bytes(lsf)
+        yield "from_file", LsfFile.from_file, tmp / "show.lsf"
+    text = data.decode("utf-8")
+    yield "decode", bytes.decode, data
+    parsed = json.loads(text)
+    yield "parse", json.loads, text
+    yield "build", showfile_from_dict, parsed
+    yield "build-compiled", fast_showfile_from_dict, parsed
+    yield "settings", Settings.from_dict, settings
+    show = showfile_from_dict(parsed)
+    yield "to_dict", showfile_to_dict, show
+    plain = showfile_to_dict(show)
+    yield "dumps", lambda d: json.dumps(d, indent=2), plain
+    encoded = json.dumps(plain, indent=2)
+    yield "utf8", str.encode, encoded
+    yield "deflate", lambda b: zlib.compress(b, 6), encoded.encode("utf-8")
+    yield "write_json", lambda s: write_json(io.BytesIO(), s), show
+    saved = LsfFile(show, Settings.from_dict(settings))
+    yield "to_file", lambda lsf: lsf.to_file(tmp / "saved.lsf"), saved
+
+
+def measure(fn: Callable[[Any], Any], arg: Any, repeat: int) -> Dict[str, float]:
+    """Best time, traced peak, allocations and retained bytes of ``fn(arg)``."""
+    best = float("inf")
+    spent = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        # Large shows take seconds per stage; fewer runs still show changes.
+        if spent > BUDGET:
+            break
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn(arg)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    diff = after.compare_to(before, "lineno")
+    return {
+        "time": best,
+        "peak": peak,
+        "allocations": sum(max(d.count_diff, 0) for d in diff),
+        "retained": sum(d.size_diff for d in diff),
+    }
+
+
+def calibrate(repeat: int = 5) -> float:
+    """Best time of a fixed workload that uses no code of this repository."""
+    rows = [
+        {"channel": i, "level": i % 256, "colors": [i % 7, i % 11, i % 13]}
+        for i in range(20000)
+    ]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = json.dumps(rows, indent=2)
+        zlib.compress(text.encode("utf-8"), 6)
+        sum(row["level"] for row in json.loads(text))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def cases(scales: List[int]) -> Iterator[Tuple[str, bytes, dict, Optional[bytes]]]:
+    """``(name, showfile.json bytes, settings dict, archive or None)``."""
+    lsf = (EXAMPLES / "SKM.lsf").read_bytes()
+    with zipfile.ZipFile(io.BytesIO(lsf)) as zf:
+        settings = json.loads(zf.read("settings.json"))
+    data = (EXAMPLES / "showfile.json").read_bytes()
+    if 1 in scales:
+        yield "SKM.lsf", unzip(lsf), settings, lsf
+        yield "showfile.json", data, settings, None
+    show = json.loads(data)
+    for factor in scales:
+        if factor > 1:
+            scaled = archive(scale_show(show, factor), settings)
+            yield f"showfile.json x{factor}", unzip(scaled), settings, scaled
+
+
+def run(
+    scales: List[int], repeat: int, only: Optional[Set[Tuple[str, str]]] = None
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Measure every stage of every case, or only the ``(case, stage)`` pairs."""
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name, data, settings, lsf in cases(scales):
+        if only is not None and not any(case == name for case, _ in only):
+            continue
+        print(f"{name}: {len(data) / 1e6:.1f} MB")
+        print(
+            f"  {'stage':<16} {'time':>10} {'peak':>10} "
+            f"{'allocs':>9} {'retained':>10}"
+        )
+        results[name] = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for stage, fn, arg in stages(data, settings, lsf, Path(tmp)):
+                if only is not None and (name, stage) not in only:
+                    continue
+                m = measure(fn, arg, repeat)
+                results[name][stage] = m
+                print(
+                    f"  {stage:<16} {m['time'] * 1e3:7.1f} ms "
+                    f"{m['peak'] / 2**20:6.1f} MiB {m['allocations']:9} "
+                    f"{m['retained'] / 2**20:6.1f} MiB"
+                )
+    return results
+
+
+def _scale_of(name: str) -> int:
+    """The ``--scale`` factor of the case called ``name``."""
+    return int(name.rpartition(" x")[2]) if " x" in name else 1
+
+
+def compare(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Dict[str, Dict[str, float]]],
+    threshold: float,
+    speed: float = 1.0,
+) -> List[Tuple[str, str, str]]:
+    """Stages whose time or peak grew by more than ``threshold``.
+
+    Baseline times are multiplied by ``speed``, this machine's
+    :func:`calibrate` time over the baseline's. Each stage is reported as
+    ``(case, stage, message)``. Growth below :data:`NOISE` is ignored, so
+    stages that take microseconds do not flag on jitter.
+    """
+    regressions = []
+    for name, stages_ in results.items():
+        for stage, m in stages_.items():
+            base = baseline.get(name, {}).get(stage)
+            if base is None:
+                continue
+            for metric in ("time", "peak"):
+                expected = base[metric] * (speed if metric == "time" else 1.0)
+                grown = m[metric] - expected
+                if grown > NOISE[metric] and grown > expected * threshold:
+                    regressions.append(
+                        (
+                            name,
+                            stage,
+                            f"{name} {stage} {metric}: "
+                            f"{m[metric] / expected:.2f}x the baseline",
+                        )
+                    )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=5, help="runs per stage")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    baseline = parser.add_mutually_exclusive_group()
+    baseline.add_argument(
+        "--baseline",
+        type=Path,
+        default=BASELINE,
+        help=f"results to compare to, default {BASELINE.name}",
+    )
+    baseline.add_argument(
+        "--no-baseline",
+        dest="baseline",
+        action="store_const",
+        const=None,
+        help="only report, do not compare",
+    )
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+    # Read first: --output may overwrite the baseline with the new results.
+    baseline = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+
+    calibration = calibrate()
+    results = run(args.scale, args.repeat)
+    regressions = []
+    if baseline is not None:
+        speed = calibration / baseline.get("calibration", calibration)
+        print(f"this machine runs the calibration at {1 / speed:.2f}x the baseline")
+        baseline = baseline["results"]
+        regressions = compare(results, baseline, args.threshold, speed)
+        for attempt in range(CONFIRM):
+            if not regressions:
+                break
+            only = {(name, stage) for name, stage, _ in regressions}
+            print(f"measuring {len(only)} stages again ({attempt + 1}/{CONFIRM})")
+            scales = sorted({_scale_of(name) for name, _ in only})
+            for name, stages_ in run(scales, args.repeat, only).items():
+                for stage, m in stages_.items():
+                    kept = results[name][stage]
+                    for metric in ("time", "peak"):
+                        kept[metric] = min(kept[metric], m[metric])
+            regressions = compare(results, baseline, args.threshold, speed)
+
+    if args.output is not None:
+        document = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "calibration": calibration,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+    if baseline is not None:
+        for _, _, message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regression over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,12 @@
-from . import formats as formats
+import importlib
+from typing import Any
+
+# Subpackages are imported on first access, so that a command of the command
+# line only imports what it uses.
+_SUBPACKAGES = ("formats", "dmx", "playback", "patch", "stage")
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _SUBPACKAGES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f".{name}", __name__)
@@ -0,0 +1,337 @@
+"""The ``colorsource`` command line.
+
+Commands:
+
+- ``info``: show name, software version and console model
+- ``stats``: counts of devices, cues, palettes, ... and the load time
+- ``validate``: load every file and check it for patch conflicts, duplicate
+  cue numbers and unresolved palette references; channels shared by several
+  devices are only a warning
+- ``extract``: write ``showfile.json`` and ``settings.json`` of each show to
+  a directory, see :meth:`.LsfFile.extract_json_files`
+- ``pack``: build an LSF file from such a directory
+- ``render-dmx``: the DMX frames of cues, one line per cue and universe
+- ``diff``: the structural differences between two shows
+
+Every command but ``diff`` takes any number of paths and glob patterns
+(``"shows/**/*.lsf"``, expanded here so they work where the shell does not
+expand them) and processes the files in ``--jobs`` worker processes.
+Results go to standard output as JSON lines, each object carrying the
+``path`` of its file, in the order the files were given. A file that fails
+is reported as ``{"path": ..., "error": ...}`` and makes the exit status 1.
+
+Only the modules a command needs are imported, when it runs: ``info``
+reads the metadata with ``LsfFile.open(lazy=True)``, which scans the three
+strings out of the raw JSON without decoding the show, and never imports
+the renderer or NumPy.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+_Record = Dict[str, Any]
+_Command = Callable[[str, argparse.Namespace], List[_Record]]
+
+
+def expand(patterns: Sequence[str]) -> List[str]:
+    """Paths of ``patterns``, with glob patterns expanded in sorted order.
+
+    A pattern that matches nothing is kept as it is, so that it is reported
+    as a missing file.
+    """
+    paths: List[str] = []
+    for pattern in patterns:
+        if any(c in pattern for c in "*?["):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            paths.extend(matches or [pattern])
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def _guarded(command: _Command, path: str, args: argparse.Namespace) -> List[_Record]:
+    try:
+        return command(path, args)
+    except Exception as e:
+        return [{"path": path, "error": f"{type(e).__name__}: {e}"}]
+
+
+def run_many(
+    command: _Command, paths: Sequence[str], args: argparse.Namespace, jobs: int
+) -> Iterator[List[_Record]]:
+    """Run ``command`` on every path, in parallel, yielding results in order."""
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield _guarded(command, path, args)
+        return
+    import concurrent.futures
+
+    with concurrent.futures.ProcessPoolExecutor(min(jobs, len(paths))) as executor:
+        count = len(paths)
+        yield from executor.map(
+            _guarded, [command] * count, paths, [args] * count, chunksize=1
+        )
+
+
+def _write(record: _Record) -> None:
+    sys.stdout.write(json.dumps(record, separators=(",", ":"), default=_plain))
+    sys.stdout.write("\n")
+
+
+def _plain(value: Any) -> Any:
+    """JSON form of values ``json`` cannot encode, e.g. show objects."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return repr(value)
+
+
+# Commands
+
+
+def info(path: str, args: argparse.Namespace) -> List[_Record]:
+    from .formats.lsf import LsfFile
+
+    lsf = LsfFile.open(path, lazy=True)
+    return [
+        {
+            "path": path,
+            "showFileName": lsf.show_name,
+            "softwareVersion": lsf.software_version,
+            "consoleModel": lsf.console_model,
+            "bytes": os.path.getsize(path),
+        }
+    ]
+
+
+def stats(path: str, args: argparse.Namespace) -> List[_Record]:
+    import zipfile
+
+    from .formats.lsf import LsfFile
+
+    start = time.perf_counter()
+    play = LsfFile.from_file(path).showfile.play
+    load = time.perf_counter() - start
+    with zipfile.ZipFile(path) as zf:
+        json_bytes = sum(member.file_size for member in zf.infolist())
+    devices = play.patch.devices
+    return [
+        {
+            "path": path,
+            "bytes": os.path.getsize(path),
+            "jsonBytes": json_bytes,
+            "loadSeconds": round(load, 6),
+            "devices": len(devices),
+            "channels": len({d.channel for d in devices}),
+            "universes": len({d.space for d in devices if d.dmx > 0}),
+            "personalities": len(play.patch.personalities),
+            "steps": len(play.cue_list.steps),
+            "memories": len(play.memories),
+            "independents": len(play.independents),
+            "colorPalettes": len(play.color_palettes),
+            "beamPalettes": len(play.beam_palettes),
+            "positionPalettes": len(play.position_palettes),
+        }
+    ]
+
+
+def validate(path: str, args: argparse.Namespace) -> List[_Record]:
+    from .formats.lsf import LsfFile
+    from .formats.palettes import PaletteResolver
+    from .patch.conflicts import patch_conflicts
+
+    play = LsfFile.from_file(path).showfile.play
+    problems: List[str] = []
+    warnings: List[str] = []
+    report = patch_conflicts(play.patch).to_dict()
+    for kind, conflicts in report.items():
+        if conflicts:
+            # Several devices on one channel is how the console groups them.
+            found = warnings if kind == "duplicateChannels" else problems
+            found.append(f"{len(conflicts)} patch conflicts of kind {kind}")
+    cues: Dict[int, int] = {}
+    for step in play.cue_list.steps:
+        cues[step.cue] = cues.get(step.cue, 0) + 1
+    duplicates = sorted(cue for cue, count in cues.items() if count > 1)
+    if duplicates:
+        problems.append(f"duplicate cue numbers {duplicates}")
+    resolver = PaletteResolver(play)
+    contents = [step.content for step in play.cue_list.steps]
+    contents += [memory.content for memory in play.memories]
+    missing = sum(len(resolver.resolve(content).missing) for content in contents)
+    if missing:
+        problems.append(f"{missing} unresolved palette references")
+    record: _Record = {
+        "path": path,
+        "valid": not problems,
+        "problems": problems,
+        "warnings": warnings,
+    }
+    if args.verbose:
+        record["patch"] = report
+    return [record]
+
+
+def extract(path: str, args: argparse.Namespace) -> List[_Record]:
+    from .formats.lsf import LsfFile
+
+    output = Path(args.output) / Path(path).stem
+    LsfFile.from_file(path).extract_json_files(output, args.indent)
+    return [{"path": path, "output": str(output)}]
+
+
+def pack(path: str, args: argparse.Namespace) -> List[_Record]:
+    from .formats.lsf import LsfFile
+    from .formats.settings import Settings
+    from .formats.showfile import showfile_from_dict
+
+    directory = Path(path)
+    if not directory.is_dir():
+        raise NotADirectoryError(f"not a directory: {path}")
+    output = Path(args.output) if args.output else directory.with_suffix(".lsf")
+    showfile = json.loads((directory / "showfile.json").read_bytes())
+    settings = json.loads((directory / "settings.json").read_bytes())
+    lsf = LsfFile(showfile_from_dict(showfile), Settings.from_dict(settings))
+    lsf.to_file(output, args.indent)
+    return [{"path": path, "output": str(output)}]
+
+
+def render_dmx(path: str, args: argparse.Namespace) -> List[_Record]:
+    from .dmx.render import DmxRenderer
+    from .formats.lsf import LsfFile
+    from .playback.tracking import TrackingResolver
+
+    play = LsfFile.from_file(path).showfile.play
+    renderer = DmxRenderer(play.patch)
+    resolver = TrackingResolver(play.cue_list) if args.tracking else None
+    steps = play.cue_list.steps
+    wanted = set(args.cue or ())
+    records = []
+    for index, step in enumerate(steps):
+        if wanted and step.cue not in wanted:
+            continue
+        content = resolver.content(index) if resolver else step.content
+        for universe, slots in renderer.frames(content).items():
+            records.append(
+                {
+                    "path": path,
+                    "cue": step.cue,
+                    "universe": universe,
+                    "dmx": slots.hex(),
+                }
+            )
+    missing = wanted - {step.cue for step in steps}
+    if missing:
+        records.append({"path": path, "error": f"no cues {sorted(missing)}"})
+    return records
+
+
+def diff(args: argparse.Namespace) -> int:
+    from .formats.diff import ShowDiffer
+    from .formats.lsf import LsfFile
+
+    old, new = (LsfFile.from_file(path) for path in (args.old, args.new))
+    differ = ShowDiffer()
+    changes = differ.diff(old.showfile, new.showfile)
+    changes += [
+        type(c)(("settings",) + c.path, c.old, c.new)
+        for c in differ.diff(old.settings, new.settings)
+    ]
+    for change in changes:
+        _write(
+            {
+                "location": change.location,
+                "kind": change.kind,
+                "old": None if change.kind == "added" else change.old,
+                "new": None if change.kind == "removed" else change.new,
+            }
+        )
+    return 1 if changes else 0
+
+
+_COMMANDS: Dict[str, _Command] = {
+    "info": info,
+    "stats": stats,
+    "validate": validate,
+    "extract": extract,
+    "pack": pack,
+    "render-dmx": render_dmx,
+}
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="colorsource", description="Inspect and convert ColorSource show files."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    files = argparse.ArgumentParser(add_help=False)
+    files.add_argument("files", nargs="+", help="paths or glob patterns")
+    files.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes, default the CPU count",
+    )
+
+    commands.add_parser("info", parents=[files], help="show metadata")
+    commands.add_parser("stats", parents=[files], help="show size and counts")
+    check = commands.add_parser("validate", parents=[files], help="check shows")
+    check.add_argument("-v", "--verbose", action="store_true", help="list conflicts")
+    out = commands.add_parser("extract", parents=[files], help="write the JSON files")
+    out.add_argument("-o", "--output", default=".", help="directory, default .")
+    out.add_argument("--indent", type=int, default=2)
+    into = commands.add_parser("pack", parents=[files], help="build LSF files")
+    into.add_argument("-o", "--output", help="LSF file, default <directory>.lsf")
+    into.add_argument("--indent", type=int, default=2)
+    render = commands.add_parser(
+        "render-dmx", parents=[files], help="DMX frames of cues, as hex"
+    )
+    render.add_argument(
+        "--cue", type=int, action="append", help="Step.cue number, default all"
+    )
+    render.add_argument(
+        "--no-tracking",
+        dest="tracking",
+        action="store_false",
+        help="render only the levels each step records",
+    )
+    compare = commands.add_parser(
+        "diff", help="differences between two shows; exit status 1 if any"
+    )
+    compare.add_argument("old")
+    compare.add_argument("new")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parser().parse_args(argv)
+    try:
+        if args.command == "diff":
+            return diff(args)
+        paths = expand(args.files)
+        if args.command == "pack" and args.output and len(paths) > 1:
+            raise ValueError("--output needs a single directory")
+        status = 0
+        command = _COMMANDS[args.command]
+        for records in run_many(command, paths, args, args.jobs):
+            for record in records:
+                _write(record)
+                if "error" in record:
+                    status = 1
+                elif record.get("valid") is False:
+                    status = 1
+            sys.stdout.flush()
+        return status
+    except BrokenPipeError:
+        # The reader, e.g. ``head``, went away; stop quietly.
+        sys.stderr.close()
+        return 1
+    except Exception as e:
+        print(f"colorsource: {e}", file=sys.stderr)
+        return 2
@@ -0,0 +1,10 @@
+__all__ = [
+    "DmxRenderer",
+    "NetworkOutput",
+    "SendStats",
+    "UNIVERSE_SIZE",
+    "dmx_rate",
+]
+
+from .render import UNIVERSE_SIZE, DmxRenderer
+from .net import NetworkOutput, SendStats, dmx_rate
@@ -0,0 +1,334 @@
+"""DMX over the network: sACN (E1.31) and Art-Net output of rendered frames.
+
+:class:`NetworkOutput` sends the frames of a :class:`.DmxRenderer` (one
+512-slot row per universe of :attr:`.DmxRenderer.universes`) as E1.31 data
+packets and/or ArtDmx packets over UDP. Every packet is built once, when the
+output is created; sending a universe only copies its 512 slots into the
+packet and rewrites the sequence number in place.
+
+A universe whose slots did not change since its last packet is skipped,
+unless nothing was sent for it for :data:`KEEP_ALIVE` seconds. E1.31
+receivers treat a source that stays silent for 2.5 s as lost, so the
+keep-alive must stay well below that.
+
+Universes are numbered on the wire as the console's ``Settings`` map them:
+``s_acn_universe_mapping[space - 1]`` and ``art_net_universe_mapping[space -
+1]``, or ``space`` and ``space - 1`` past the end of the mappings. sACN goes
+to the universe's multicast group and Art-Net is broadcast unless a
+``host`` is given, e.g. ``"127.0.0.1"`` for testing against a local
+receiver.
+"""
+
+import socket
+import struct
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..formats.settings import Settings
+from .render import UNIVERSE_SIZE
+
+SACN_PORT = 5568
+ARTNET_PORT = 6454
+
+# Seconds between packets of an unchanged universe
+KEEP_ALIVE = 1.0
+
+# Frames per second of the console's Settings.dmx_speed values
+DMX_RATES = {0: 10.0, 1: 20.0, 2: 30.0, 3: 44.0}
+DEFAULT_RATE = 44.0
+
+PROTOCOLS = ("sacn", "artnet")
+
+SOURCE_NAME = "colorsource.py"
+
+_SACN_SIZE = 126 + UNIVERSE_SIZE
+_SACN_DATA = 126
+_SACN_SEQUENCE = 111
+_SACN_OPTIONS = 112
+_SACN_TERMINATED = 0x40
+_ARTNET_SIZE = 18 + UNIVERSE_SIZE
+_ARTNET_DATA = 18
+_ARTNET_SEQUENCE = 12
+
+
+def dmx_rate(settings: Settings) -> float:
+    """Frames per second for the console's DMX speed setting."""
+    return DMX_RATES.get(settings.dmx_speed, DEFAULT_RATE)
+
+
+def sacn_packet(
+    universe: int, cid: bytes, source_name: str = SOURCE_NAME, priority: int = 100
+) -> bytearray:
+    """An E1.31 data packet for a full universe, sequence number and slots 0."""
+
+    def flags_length(offset: int) -> bytes:
+        return struct.pack(">H", 0x7000 | (_SACN_SIZE - offset))
+
+    name = source_name.encode("utf-8")[:63].ljust(64, b"\x00")
+    packet = bytearray(_SACN_SIZE)
+    # Root layer
+    packet[0:16] = b"\x00\x10\x00\x00ASC-E1.17\x00\x00\x00"
+    packet[16:18] = flags_length(16)
+    packet[18:22] = struct.pack(">I", 0x00000004)  # VECTOR_ROOT_E131_DATA
+    packet[22:38] = cid
+    # Framing layer
+    packet[38:40] = flags_length(38)
+    packet[40:44] = struct.pack(">I", 0x00000002)  # VECTOR_E131_DATA_PACKET
+    packet[44:108] = name
+    packet[108] = priority
+    packet[113:115] = struct.pack(">H", universe)
+    # DMP layer: start code 0 and 512 slots
+    packet[115:117] = flags_length(115)
+    packet[117:119] = b"\x02\xa1"
+    packet[119:125] = struct.pack(">HHH", 0, 1, UNIVERSE_SIZE + 1)
+    return packet
+
+
+def artnet_packet(universe: int) -> bytearray:
+    """An ArtDmx packet for a full universe, sequence number and slots 0."""
+    packet = bytearray(_ARTNET_SIZE)
+    packet[0:8] = b"Art-Net\x00"
+    packet[8:10] = struct.pack("<H", 0x5000)  # OpDmx
+    packet[10:12] = struct.pack(">H", 14)  # protocol version
+    packet[14:16] = struct.pack("<H", universe & 0x7FFF)
+    packet[16:18] = struct.pack(">H", UNIVERSE_SIZE)
+    return packet
+
+
+def sacn_group(universe: int) -> str:
+    """The multicast address of an sACN universe."""
+    return f"239.255.{universe >> 8 & 0xFF}.{universe & 0xFF}"
+
+
+@dataclass
+class _Stream:
+    """One universe on one protocol: its packet and where it goes."""
+
+    row: int
+    packet: bytearray
+    address: Tuple[str, int]
+    data: int
+    sequence_offset: int
+    sequence_start: int
+    sequence: int = 0
+    last_sent: float = float("-inf")
+    slots: memoryview = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.slots = memoryview(self.packet)[self.data :]
+
+
+@dataclass
+class SendStats:
+    """Send statistics of a :class:`NetworkOutput`.
+
+    Attributes:
+        ticks: Frames handed to :meth:`NetworkOutput.send`
+        packets: Packets sent
+        skipped: Packets not sent because their universe was unchanged
+        late: Ticks of :meth:`NetworkOutput.run` that started a whole
+            period or more after their deadline
+        latencies: Seconds spent sending each of the last ``window`` ticks
+    """
+
+    window: int = 1000
+    ticks: int = 0
+    packets: int = 0
+    skipped: int = 0
+    late: int = 0
+    latencies: Deque[float] = field(default_factory=deque)
+
+    def record(self, latency: float) -> None:
+        self.ticks += 1
+        self.latencies.append(latency)
+        if len(self.latencies) > self.window:
+            self.latencies.popleft()
+
+    def percentile(self, q: float) -> float:
+        """The ``q``-th percentile (0-100) of the recent tick latencies."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+    @property
+    def mean(self) -> float:
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    @property
+    def max(self) -> float:
+        return max(self.latencies, default=0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ticks": self.ticks,
+            "packets": self.packets,
+            "skipped": self.skipped,
+            "late": self.late,
+            "latencyMean": self.mean,
+            "latencyP99": self.percentile(99),
+            "latencyMax": self.max,
+        }
+
+
+class NetworkOutput:
+    """Sends rendered DMX frames as sACN and/or Art-Net.
+
+    Args:
+        universes: The console universes of each frame row, as
+            :attr:`.DmxRenderer.universes`
+        settings: Console settings for the universe mappings, sACN priority
+            and DMX speed; without them universes map to themselves
+        protocols: Any of ``"sacn"`` and ``"artnet"``
+        host: Unicast destination instead of multicast and broadcast
+        ports: Destination port by protocol, default the standard ports
+        keep_alive: Seconds after which an unchanged universe is resent
+        source_name: sACN source name
+        cid: sACN component id, 16 bytes; random by default
+        sock: Socket to send with, by default a new UDP socket
+    """
+
+    def __init__(
+        self,
+        universes: Sequence[int],
+        settings: Optional[Settings] = None,
+        protocols: Sequence[str] = PROTOCOLS,
+        host: Optional[str] = None,
+        ports: Optional[Dict[str, int]] = None,
+        keep_alive: float = KEEP_ALIVE,
+        source_name: str = SOURCE_NAME,
+        cid: Optional[bytes] = None,
+        sock: Optional[socket.socket] = None,
+    ) -> None:
+        for protocol in protocols:
+            if protocol not in PROTOCOLS:
+                raise ValueError(f"protocol must be one of {PROTOCOLS}")
+        ports = {"sacn": SACN_PORT, "artnet": ARTNET_PORT, **(ports or {})}
+        self.universes = tuple(universes)
+        self.keep_alive = keep_alive
+        self.rate = dmx_rate(settings) if settings is not None else DEFAULT_RATE
+        self.stats = SendStats()
+        cid = cid if cid is not None else uuid.uuid4().bytes
+        priority = settings.s_acn_priority if settings is not None else 100
+        sacn_map = settings.s_acn_universe_mapping if settings is not None else []
+        artnet_map = settings.art_net_universe_mapping if settings is not None else []
+
+        self._streams: List[_Stream] = []
+        for row, space in enumerate(self.universes):
+            if "sacn" in protocols:
+                universe = _mapped(sacn_map, space, space)
+                self._streams.append(
+                    _Stream(
+                        row,
+                        sacn_packet(universe, cid, source_name, priority),
+                        (host or sacn_group(universe), ports["sacn"]),
+                        _SACN_DATA,
+                        _SACN_SEQUENCE,
+                        0,
+                    )
+                )
+            if "artnet" in protocols:
+                universe = _mapped(artnet_map, space, space - 1)
+                self._streams.append(
+                    _Stream(
+                        row,
+                        artnet_packet(universe),
+                        (host or "255.255.255.255", ports["artnet"]),
+                        _ARTNET_DATA,
+                        _ARTNET_SEQUENCE,
+                        1,  # ArtDmx sequence 0 means "not sequenced"
+                    )
+                )
+
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+        self.sock = sock
+
+    def send(self, frame: Any, now: Optional[float] = None) -> int:
+        """Send the universes of ``frame`` that changed or are due a keep-alive.
+
+        Args:
+            frame: ``len(universes) * 512`` slots, e.g. from
+                :meth:`.DmxRenderer.render`; a bytearray or a uint8 array
+            now: The time in :func:`time.monotonic` seconds, default now
+
+        Returns:
+            The number of packets sent.
+        """
+        start = time.perf_counter()
+        if now is None:
+            now = time.monotonic()
+        slots = memoryview(frame).cast("B")
+        sent = 0
+        for stream in self._streams:
+            offset = stream.row * UNIVERSE_SIZE
+            row = slots[offset : offset + UNIVERSE_SIZE]
+            if stream.slots == row and now - stream.last_sent < self.keep_alive:
+                self.stats.skipped += 1
+                continue
+            stream.slots[:] = row
+            self._transmit(stream)
+            stream.last_sent = now
+            sent += 1
+        self.stats.packets += sent
+        self.stats.record(time.perf_counter() - start)
+        return sent
+
+    def _transmit(self, stream: _Stream) -> None:
+        stream.packet[stream.sequence_offset] = stream.sequence + stream.sequence_start
+        stream.sequence = (stream.sequence + 1) % (256 - stream.sequence_start)
+        self.sock.sendto(stream.packet, stream.address)
+
+    def run(self, frames: Iterable[Any], rate: Optional[float] = None) -> SendStats:
+        """Send ``frames`` one per tick at ``rate`` frames per second.
+
+        Ticks are scheduled against the start time, so time lost to a slow
+        tick is made up by the following ones instead of accumulating. A
+        frame may be the same buffer every time, as the frames of
+        :meth:`.Playback.play`.
+
+        Args:
+            frames: The frames to send
+            rate: Frames per second, default from ``Settings.dmx_speed``
+        """
+        period = 1.0 / (rate or self.rate)
+        start = time.monotonic()
+        for tick, frame in enumerate(frames):
+            deadline = start + tick * period
+            now = time.monotonic()
+            if now < deadline:
+                time.sleep(deadline - now)
+                now = time.monotonic()
+            elif now - deadline > period:
+                self.stats.late += 1
+            self.send(frame, now)
+        return self.stats
+
+    def close(self, terminate: bool = True) -> None:
+        """Close the socket, first ending the sACN streams.
+
+        With ``terminate`` every sACN universe is sent three times with the
+        Stream_Terminated option, so receivers release it at once.
+        """
+        if terminate:
+            for stream in self._streams:
+                if stream.data == _SACN_DATA:
+                    stream.packet[_SACN_OPTIONS] |= _SACN_TERMINATED
+                    for _ in range(3):
+                        self._transmit(stream)
+        self.sock.close()
+
+    def __enter__(self) -> "NetworkOutput":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _mapped(mapping: Sequence[int], space: int, default: int) -> int:
+    return mapping[space - 1] if 0 < space <= len(mapping) else default
@@ -0,0 +1,340 @@
+"""Rendering of cue contents to DMX frames.
+
+:class:`DmxRenderer` joins every patched ``Device`` to the parameters of its
+``Personality`` once and compiles the result into flat target tables: one row
+per DMX slot that a cue can drive, with the slot's position in the frame
+buffer, the cue value it takes, which byte of the 16-bit value it receives
+and whether it is inverted. Rendering a cue then fills a table of the cue's
+values (:meth:`DmxRenderer.values`) and moves them into the frame with a
+single gather and scatter (:meth:`DmxRenderer.apply`), no matter how many
+devices are patched.
+
+Frames hold one 512-slot row per universe (``Device.space``) in patch order,
+see :attr:`DmxRenderer.universes`. Slots that the cue does not set keep the
+home value of their parameter; unpatched slots are 0.
+
+Values are resolved as follows:
+
+- intensity parameters, and the single slot of a dimmer, take ``Level.level``
+- color parameters take ``Level.colors`` in personality order; a level whose
+  ``colors`` are empty or all 0 but whose ``r``/``g``/``b`` are not takes the
+  emitter levels :class:`.ColorMixer` finds for that RGB instead, so frames
+  show the color the stage map does. In a personality without an intensity
+  parameter the colors are scaled by the level
+- other parameters take the cue's ``LtpParameter`` values, matched by name
+  through ``Patch.parameters``
+
+8-bit values are widened to 16 bits as ``v * 257``, so a 16-bit parameter
+receives the value in both its coarse and fine slot. NumPy is used when it is
+installed, otherwise an equivalent pure-Python path over the same tables.
+"""
+
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..formats.columnar import ColumnarContent, LevelColumns
+from ..formats.showfile import Content, LtpParameter, Patch, PersonalityParameter
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+UNIVERSE_SIZE = 512
+
+# PersonalityParameter.type values
+INTENSITY = 1
+COLOR = 5
+
+_CueContent = Union[Content, ColumnarContent]
+
+
+class DmxRenderer:
+    """Precompiled mapping from cue contents to DMX slots of a patch.
+
+    Args:
+        patch: The patch to render; later changes to it are not seen, build a
+            new renderer instead
+
+    Attributes:
+        universes: The DMX universes of the patch, one frame row each
+    """
+
+    def __init__(self, patch: Patch) -> None:
+        personalities = {p.dcid: p for p in patch.personalities}
+        numbers = {p.name: p.number for p in patch.parameters}
+        self.universes: Tuple[int, ...] = tuple(
+            sorted({d.space for d in patch.devices if d.dmx > 0})
+        )
+        row_of = {u: i for i, u in enumerate(self.universes)}
+
+        self.channels = max((d.channel for d in patch.devices), default=-1) + 1
+        self.max_colors = max(
+            (
+                sum(p.type == COLOR for p in personality.parameters)
+                for personality in personalities.values()
+            ),
+            default=0,
+        )
+        # Imported here: the patch package imports this module.
+        from ..patch.color import ColorMixer
+
+        self._mixer = ColorMixer(patch)
+        self._ltp_numbers = sorted(set(numbers.values()))
+        ltp_index = {number: i for i, number in enumerate(self._ltp_numbers)}
+        self._color_base = self.channels
+        self._ltp_base = self.channels * (1 + self.max_colors)
+        self._table_size = self._ltp_base + self.channels * len(ltp_index)
+
+        base = bytearray(len(self.universes) * UNIVERSE_SIZE)
+        # (cue key, level key for scaled colors or -1, slot, shift, invert)
+        targets: List[Tuple[int, int, int, int, bool]] = []
+        for device in patch.devices:
+            if device.dmx <= 0 or device.channel < 0:
+                continue
+            row = row_of[device.space] * UNIVERSE_SIZE
+            start = row + device.dmx - 1
+            channel = device.channel
+            personality = personalities.get(device.personality_dcid)
+            if personality is None:
+                # A dimmer: one 8-bit intensity slot.
+                if start < row + UNIVERSE_SIZE:
+                    targets.append((channel, -1, start, 8, False))
+                continue
+            scale_key = -1 if personality.has_intensity else channel
+            color = 0
+            for param in personality.parameters:
+                if param.type == INTENSITY:
+                    cue_key, scaled_by = channel, -1
+                elif param.type == COLOR:
+                    cue_key = self._color_base + channel * self.max_colors + color
+                    scaled_by = scale_key
+                    color += 1
+                elif numbers.get(param.name) in ltp_index:
+                    index = ltp_index[numbers[param.name]]
+                    cue_key = self._ltp_base + channel * len(ltp_index) + index
+                    scaled_by = -1
+                else:
+                    cue_key = -1
+                for offset, shift in _slots(param):
+                    slot = start + offset
+                    if slot >= row + UNIVERSE_SIZE:
+                        continue
+                    home = param.home ^ 0xFFFF if param.invert else param.home
+                    base[slot] = (home >> shift) & 0xFF
+                    if cue_key >= 0:
+                        targets.append((cue_key, scaled_by, slot, shift, param.invert))
+
+        columns = list(zip(*targets)) or [()] * 5
+        key, level_key, slot, shift, invert = (array("l", c) for c in columns)
+
+        self._base = base
+        self._key = key
+        self._level_key = level_key
+        self._slot = slot
+        self._shift = shift
+        self._invert = invert
+        if np is not None:
+            self._np_base = np.frombuffer(base, dtype=np.uint8).reshape(
+                len(self.universes), UNIVERSE_SIZE
+            )
+            self._np_key = np.asarray(key, dtype=np.intp)
+            self._np_level_key = np.asarray(level_key, dtype=np.intp)
+            self._np_scaled = self._np_level_key >= 0
+            self._np_slot = np.asarray(slot, dtype=np.intp)
+            self._np_shift = np.asarray(shift, dtype=np.int64)
+            self._np_invert = np.asarray(invert, dtype=bool)
+            ltp_lookup = np.full(max(self._ltp_numbers, default=-1) + 2, -1, np.intp)
+            for number, index in ltp_index.items():
+                ltp_lookup[number] = index
+            self._np_ltp_lookup = ltp_lookup
+
+    def __len__(self) -> int:
+        """The number of slots a cue can drive."""
+        return len(self._key)
+
+    def blank(self) -> Any:
+        """Return a new frame holding the home values.
+
+        A ``(len(universes), 512)`` uint8 array with NumPy, otherwise a
+        bytearray of ``len(universes) * 512`` slots.
+        """
+        if np is not None:
+            return self._np_base.copy()
+        return bytearray(self._base)
+
+    def values(self, content: _CueContent) -> Any:
+        """Collect the values ``content`` gives each cue key.
+
+        The result holds one 16-bit value per intensity, color and LTP
+        parameter of every channel, -1 where the cue sets none: an int64
+        NumPy array, or an ``array("l")`` without NumPy. It can be rendered
+        any number of times with :meth:`apply`.
+
+        Args:
+            content: A cue or memory's ``Content`` or ``ColumnarContent``
+        """
+        levels = (
+            content.levels
+            if isinstance(content.levels, LevelColumns)
+            else LevelColumns.from_levels(content.levels)
+        )
+        if np is not None:
+            return self._values_numpy(levels, content.ltp_parameters)
+        return self._values_python(levels, content.ltp_parameters)
+
+    def apply(self, values: Any, out: Optional[Any] = None) -> Any:
+        """Render cue values from :meth:`values` into a frame.
+
+        Args:
+            values: The cue values
+            out: Frame from :meth:`blank` to overwrite instead of allocating a
+                new one, for rendering many frames into the same buffer
+
+        Returns:
+            The frame, ``out`` if given
+        """
+        if out is None:
+            out = self.blank()
+        else:
+            out[:] = self._np_base if np is not None else self._base
+        if np is not None:
+            self._apply_numpy(values, out)
+        else:
+            self._apply_python(values, out)
+        return out
+
+    def render(self, content: _CueContent, out: Optional[Any] = None) -> Any:
+        """Render the levels and LTP values of ``content`` into a frame.
+
+        Equivalent to ``apply(values(content), out)``.
+        """
+        return self.apply(self.values(content), out)
+
+    def frames(self, content: _CueContent) -> Dict[int, bytearray]:
+        """Render ``content`` to one 512-slot bytearray per universe."""
+        frame = self.render(content)
+        flat = frame.tobytes() if np is not None else frame
+        return {
+            universe: bytearray(flat[i * UNIVERSE_SIZE : (i + 1) * UNIVERSE_SIZE])
+            for i, universe in enumerate(self.universes)
+        }
+
+    def _values_numpy(self, levels: LevelColumns, ltp: Sequence[LtpParameter]) -> Any:
+        cols = levels.as_numpy()
+        table = np.full(self._table_size, -1, dtype=np.int64)
+        channel = cols["channel"].astype(np.intp)
+        # Only the last row of a channel counts, as in LevelColumns.lookup:
+        # NumPy leaves unspecified which of several writes to a key wins.
+        _, first = np.unique(channel[::-1], return_index=True)
+        last = np.zeros(len(channel), dtype=bool)
+        last[len(channel) - 1 - first] = True
+        valid = last & (channel >= 0) & (channel < self.channels)
+        table[channel[valid]] = cols["level"][valid].astype(np.int64) * 257
+
+        if self.max_colors and len(cols["colors"]):
+            offsets = cols["color_offsets"].astype(np.intp)
+            rows = np.repeat(np.arange(len(channel)), np.diff(offsets))
+            index = np.arange(len(cols["colors"])) - offsets[rows]
+            keep = valid[rows] & (index < self.max_colors)
+            keys = self._color_base + channel[rows] * self.max_colors + index
+            values = np.clip(cols["colors"], 0, 255).astype(np.int64) * 257
+            table[keys[keep]] = values[keep]
+
+        if self.max_colors and self._mixer.models:
+            rgb = np.stack([cols["r"], cols["g"], cols["b"]], axis=1)
+            mix = valid & rgb.any(axis=1)
+            if len(cols["colors"]):
+                lit = rows[cols["colors"] != 0]
+                mix &= np.bincount(lit, minlength=len(channel)) == 0
+            self._mix_colors(table, channel[mix].tolist(), rgb[mix].tolist())
+
+        if ltp and self._ltp_numbers:
+            channel = np.array([p.channel for p in ltp], dtype=np.intp)
+            number = np.array([p.parameter for p in ltp], dtype=np.intp)
+            values = np.array([p.value for p in ltp], dtype=np.int64)
+            wide = np.array([p.is16_bit for p in ltp], dtype=bool)
+            lookup = self._np_ltp_lookup
+            index = lookup[np.clip(number, -1, len(lookup) - 1)]
+            keep = (index >= 0) & (channel >= 0) & (channel < self.channels)
+            keys = self._ltp_base + channel * len(self._ltp_numbers) + index
+            values = np.where(wide, values, values * 257)
+            table[keys[keep]] = np.clip(values[keep], 0, 0xFFFF)
+        return table
+
+    def _apply_numpy(self, table: Any, out: Any) -> None:
+        values = table[self._np_key]
+        hit = values >= 0
+        scaled = self._np_scaled & hit
+        if scaled.any():
+            level = table[self._np_level_key[scaled]]
+            values[scaled] = values[scaled] * np.maximum(level, 0) // 0xFFFF
+        values = values[hit]
+        values = np.where(self._np_invert[hit], 0xFFFF - values, values)
+        flat = out.reshape(-1)
+        flat[self._np_slot[hit]] = (values >> self._np_shift[hit]) & 0xFF
+
+    def _values_python(
+        self, levels: LevelColumns, ltp: Sequence[LtpParameter]
+    ) -> array:
+        table = array("l", [-1]) * self._table_size
+        offsets = levels.color_offsets
+        colors = levels.colors
+        mix_channels: List[int] = []
+        mix_rgb: List[Tuple[int, int, int]] = []
+        last = {channel: i for i, channel in enumerate(levels.channel)}
+        rows = zip(levels.channel, levels.level, levels.r, levels.g, levels.b)
+        for i, (channel, level, r, g, b) in enumerate(rows):
+            if last[channel] != i or not 0 <= channel < self.channels:
+                continue
+            table[channel] = level * 257
+            base = self._color_base + channel * self.max_colors
+            row = colors[offsets[i] : offsets[i + 1]]
+            for index, value in enumerate(row[: self.max_colors]):
+                table[base + index] = min(max(value, 0), 255) * 257
+            if (r or g or b) and not any(row):
+                mix_channels.append(channel)
+                mix_rgb.append((r, g, b))
+        if self.max_colors and self._mixer.models:
+            self._mix_colors(table, mix_channels, mix_rgb)
+
+        ltp_index = {n: i for i, n in enumerate(self._ltp_numbers)}
+        for p in ltp:
+            index = ltp_index.get(p.parameter)
+            if index is None or not 0 <= p.channel < self.channels:
+                continue
+            key = self._ltp_base + p.channel * len(ltp_index) + index
+            value = p.value if p.is16_bit else p.value * 257
+            table[key] = min(max(value, 0), 0xFFFF)
+        return table
+
+    def _mix_colors(
+        self, table: Any, channels: List[int], rgb: List[Sequence[int]]
+    ) -> None:
+        """Set the color keys of ``channels`` to emitter levels for ``rgb``."""
+        mixed = self._mixer.levels(dict(zip(channels, rgb)))
+        for channel, emitters in mixed.items():
+            base = self._color_base + channel * self.max_colors
+            for index, value in enumerate(emitters[: self.max_colors]):
+                table[base + index] = value * 257
+
+    def _apply_python(self, table: array, out: bytearray) -> None:
+        for key, level_key, slot, shift, invert in zip(
+            self._key, self._level_key, self._slot, self._shift, self._invert
+        ):
+            value = table[key]
+            if value < 0:
+                continue
+            if level_key >= 0:
+                value = value * max(table[level_key], 0) // 0xFFFF
+            if invert:
+                value = 0xFFFF - value
+            out[slot] = (value >> shift) & 0xFF
+
+
+def _slots(param: PersonalityParameter) -> List[Tuple[int, int]]:
+    """The (offset, shift) of each DMX slot of ``param``."""
+    if param.fine < 0:
+        return [(param.coarse, 8)]
+    return [(param.coarse, 8), (param.fine, 0)]
@@ -1,7 +1,27 @@
+import importlib
+from typing import TYPE_CHECKING, Any
+
 __all__ = [
+    "ColumnarContent",
+    "CompactModel",
+    "DedupePool",
+    "FROZEN",
+    "IncrementalSaver",
+    "LazyPlay",
+    "LevelColumns",
+    "LoadCache",
     "LsfFile",
+    "PaletteResolver",
+    "SLOTS",
+    "ShowDiffer",
     "Settings",
     "ShowFile",
+    "compile_decoder",
+    "compile_encoder",
+    "diff",
+    "fast_settings_from_dict",
+    "fast_showfile_from_dict",
+    "load_many",
     "settings_from_dict",
     "settings_to_dict",
     "showfile_from_dict",
@@ -9,5 +29,37 @@ __all__ = [
 ]
 
 from .lsf import LsfFile
+from .batch import load_many
+from .cache import LoadCache
+from .incremental import IncrementalSaver
+from .lazy import LazyPlay
+from .dedupe import DedupePool
 from .settings import Settings, settings_from_dict, settings_to_dict
 from .showfile import ShowFile, showfile_from_dict, showfile_to_dict
+from .decoder import compile_decoder, fast_settings_from_dict, fast_showfile_from_dict
+from .encoder import compile_encoder
+from .diff import ShowDiffer, diff
+from .palettes import PaletteResolver
+
+# NumPy and the compact models are imported on first access, so that reading
+# a show, e.g. the metadata read of the command line, does not pay for them.
+_LAZY = {
+    "ColumnarContent": "columnar",
+    "LevelColumns": "columnar",
+    "FROZEN": "compact",
+    "SLOTS": "compact",
+    "CompactModel": "compact",
+}
+
+if TYPE_CHECKING:
+    from .columnar import ColumnarContent, LevelColumns
+    from .compact import FROZEN, SLOTS, CompactModel
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
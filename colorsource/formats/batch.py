@@ -0,0 +1,121 @@
+"""Loading many LSF files in parallel.
+
+:func:`load_many` spreads :meth:`.LsfFile.from_file` calls over a pool of
+worker processes (or threads) and yields every result as soon as it is ready.
+Only a bounded number of loads is in flight at any time, so ``paths`` can be
+a lazy iterator over an arbitrarily large directory tree.
+
+Process workers do not send the loaded dataclasses back as they are: pickling
+a ``ShowFile`` object by object is slower than parsing it. They send the
+positional form from ``compile_encoder(cls, positional=True)`` instead, nested
+tuples of plain values that pickle in a fraction of the time and size, and the
+parent rebuilds the objects with the matching positional decoder.
+"""
+
+import concurrent.futures
+import itertools
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Tuple, Union
+
+from .decoder import compile_decoder
+from .encoder import compile_encoder
+from .lsf import LsfFile
+from .settings import Settings
+from .showfile import ShowFile
+
+
+BACKENDS = ("process", "thread")
+
+_Packed = Tuple[tuple, tuple]
+
+
+def pack(lsf: LsfFile) -> _Packed:
+    """Convert ``lsf`` to its compact positional form for pickling."""
+    return (
+        compile_encoder(ShowFile, positional=True)(lsf.showfile),
+        compile_encoder(Settings, positional=True)(lsf.settings),
+    )
+
+
+def unpack(packed: _Packed) -> LsfFile:
+    """Rebuild the LsfFile converted by :func:`pack`."""
+    showfile, settings = packed
+    return LsfFile(
+        compile_decoder(ShowFile, positional=True)(showfile),
+        compile_decoder(Settings, positional=True)(settings),
+    )
+
+
+def _load_packed(path: Path) -> _Packed:
+    return pack(LsfFile.from_file(path))
+
+
+def load_many(
+    paths: Iterable[Union[str, Path]],
+    workers: Optional[int] = None,
+    backend: str = "process",
+    max_pending: Optional[int] = None,
+) -> Iterator[Tuple[Path, Union[LsfFile, BaseException]]]:
+    """Load LSF files in parallel, yielding them in completion order.
+
+    A file that fails to load does not stop the batch: its exception is
+    yielded in place of the LsfFile.
+
+    Args:
+        paths: Paths of the .lsf files, consumed lazily
+        workers: Number of worker processes or threads, default the CPU count
+        backend: ``"process"`` for a process pool, ``"thread"`` for a thread
+            pool. Threads avoid the transfer between processes but share the
+            GIL, so they only overlap file reading and decompression.
+        max_pending: Maximum number of loads submitted but not yet yielded,
+            default twice ``workers``
+
+    Yields:
+        ``(path, result)`` pairs where result is an LsfFile or the exception
+        raised while loading it
+
+    Raises:
+        ValueError: If ``backend``, ``workers`` or ``max_pending`` is invalid
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, not {backend!r}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * workers
+    if workers < 1 or max_pending < 1:
+        raise ValueError("workers and max_pending must be at least 1")
+
+    if backend == "process":
+        executor: concurrent.futures.Executor = (
+            concurrent.futures.ProcessPoolExecutor(workers)
+        )
+        load: Any = _load_packed
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(workers)
+        load = LsfFile.from_file
+
+    pending = {}
+    queued = (Path(path) for path in paths)
+    try:
+        while True:
+            for path in itertools.islice(queued, max_pending - len(pending)):
+                pending[executor.submit(load, path)] = path
+            if not pending:
+                return
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                path = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    yield path, error
+                elif backend == "process":
+                    yield path, unpack(future.result())
+                else:
+                    yield path, future.result()
+    finally:
+        # Abandoning the generator cancels the loads not yet started.
+        executor.shutdown(wait=True, cancel_futures=True)
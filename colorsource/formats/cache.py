@@ -0,0 +1,200 @@
+"""A cache of loaded LSF files keyed on archive contents.
+
+:class:`LoadCache` keeps shows that were already parsed so that reopening an
+unchanged ``.lsf`` file skips decompression and JSON decoding. Entries are
+keyed on a hash of the archive bytes. The hash of a path is remembered
+together with its modification time and size, so an unchanged file is not
+even read again; a file whose stat changed is re-read and re-hashed, and
+still hits if its contents are the same.
+
+Entries are stored as pickles of the positional form used by
+:func:`.batch.load_many`, never as live objects: every load returns a fresh
+``LsfFile`` that the caller may mutate freely, equal to what
+:meth:`.LsfFile.from_file` returns for the same archive. The in-memory part is
+an LRU bounded by the total size of those pickles. With a ``directory`` the
+pickles are also written to disk and survive restarts. An entry that fails
+to unpickle, e.g. a disk entry truncated by a crash, is dropped and the file
+parsed again.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from .batch import pack, unpack
+from .lsf import LsfFile
+
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Bump when the model or the positional form changes; older disk entries are
+# then ignored.
+CACHE_VERSION = 1
+
+_StatKey = Tuple[int, int]
+
+# What unpickling a damaged entry, or unpacking a malformed one, can raise.
+_CORRUPT = (
+    pickle.UnpicklingError,
+    EOFError,
+    ValueError,
+    AttributeError,
+    ImportError,
+    IndexError,
+    TypeError,
+)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters of a :class:`LoadCache`."""
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    corrupt: int = 0
+
+
+class LoadCache:
+    """Cache of parsed LSF files, safe to share between threads.
+
+    Args:
+        max_bytes: Upper bound on the total size of the in-memory entries.
+            Least recently used entries are evicted beyond it; an entry
+            larger than the bound is not kept in memory at all.
+        directory: Optional directory for the on-disk cache. Its entries
+            are unpickled, so it must not be writable by untrusted users.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        directory: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.stats = CacheStats()
+        self.nbytes = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._digests: Dict[Path, Tuple[_StatKey, str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, filepath: Union[str, Path]) -> LsfFile:
+        """Load an LSF file, from the cache when its contents are known.
+
+        Raises:
+            Same as :meth:`.LsfFile.from_file`
+        """
+        path = Path(filepath).resolve()
+        stat = path.stat()
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        data = None
+        with self._lock:
+            known = self._digests.get(path)
+        if known is not None and known[0] == stat_key:
+            digest = known[1]
+        else:
+            data = path.read_bytes()
+            digest = _digest(data)
+            with self._lock:
+                self._digests[path] = (stat_key, digest)
+
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                self.stats.hits += 1
+        if entry is None:
+            entry = self._read_disk(digest)
+            if entry is not None:
+                with self._lock:
+                    self.stats.disk_hits += 1
+                    self._store(digest, entry)
+        if entry is not None:
+            try:
+                return unpack(pickle.loads(entry))
+            except _CORRUPT:
+                self._discard(digest)
+
+        if data is None:
+            # Known stat but evicted entry. Re-hash what is actually parsed in
+            # case the file was rewritten without changing mtime and size.
+            data = path.read_bytes()
+            digest = _digest(data)
+            with self._lock:
+                self._digests[path] = (stat_key, digest)
+        lsf = LsfFile.from_bytes(data)
+        entry = pickle.dumps(pack(lsf), pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self.stats.misses += 1
+            self._store(digest, entry)
+        self._write_disk(digest, entry)
+        return lsf
+
+    def clear(self) -> None:
+        """Drop the in-memory entries. The on-disk cache is kept."""
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+            self.nbytes = 0
+
+    def _store(self, digest: str, entry: bytes) -> None:
+        if len(entry) > self.max_bytes or digest in self._entries:
+            return
+        self._entries[digest] = entry
+        self.nbytes += len(entry)
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= len(evicted)
+            self.stats.evictions += 1
+
+    def _discard(self, digest: str) -> None:
+        """Drop a corrupt entry from memory and disk."""
+        with self._lock:
+            entry = self._entries.pop(digest, None)
+            if entry is not None:
+                self.nbytes -= len(entry)
+            self.stats.corrupt += 1
+        if self.directory is not None:
+            self._disk_path(digest).unlink(missing_ok=True)
+
+    def _disk_path(self, digest: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{digest}.v{CACHE_VERSION}.pickle"
+
+    def _read_disk(self, digest: str) -> Optional[bytes]:
+        if self.directory is None:
+            return None
+        try:
+            return self._disk_path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, digest: str, entry: bytes) -> None:
+        if self.directory is None:
+            return
+        # Write to a temporary file first so readers never see a partial entry.
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(entry)
+            os.replace(tmp, self._disk_path(digest))
+        except BaseException:
+            os.unlink(tmp)
+            raise
@@ -0,0 +1,217 @@
+"""Array-backed storage for the levels of a cue or memory.
+
+``Content.levels`` is a list of ``Level`` dataclasses, each with its own
+``colors`` list. :class:`LevelColumns` stores the same data as one typed
+``array`` per field plus a flat ``colors`` buffer indexed by offsets, and
+:class:`ColumnarContent` is the matching drop-in for ``Content``. Both convert
+losslessly to and from the regular model. When NumPy is installed the columns
+can be viewed as NumPy arrays without copying.
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .showfile import Content, Level, LtpParameter, from_int, from_list, to_class
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+def _column(typecode: str, values: Iterable[int] = ()) -> array:
+    return array(typecode, values)
+
+
+@dataclass
+class LevelColumns:
+    """Columns of a list of :class:`Level` entries, one row per level.
+
+    The colors of row ``i`` are ``colors[color_offsets[i]:color_offsets[i + 1]]``.
+    Channel numbers are stored as unsigned 16-bit values and levels and
+    r/g/b as unsigned bytes; values outside those ranges raise
+    ``OverflowError`` on conversion.
+
+    A channel may have several rows. Lookups by channel then use the last
+    of them, as rendering does, where later levels overwrite earlier ones.
+    """
+
+    channel: array = field(default_factory=lambda: _column("H"))
+    level: array = field(default_factory=lambda: _column("B"))
+    r: array = field(default_factory=lambda: _column("B"))
+    g: array = field(default_factory=lambda: _column("B"))
+    b: array = field(default_factory=lambda: _column("B"))
+    color_offsets: array = field(default_factory=lambda: _column("I", [0]))
+    colors: array = field(default_factory=lambda: _column("i"))
+
+    @staticmethod
+    def from_levels(levels: Sequence[Level]) -> "LevelColumns":
+        offsets = [0]
+        colors: List[int] = []
+        for lv in levels:
+            colors.extend(lv.colors)
+            offsets.append(len(colors))
+        return LevelColumns(
+            _column("H", [lv.channel for lv in levels]),
+            _column("B", [lv.level for lv in levels]),
+            _column("B", [lv.r for lv in levels]),
+            _column("B", [lv.g for lv in levels]),
+            _column("B", [lv.b for lv in levels]),
+            _column("I", offsets),
+            _column("i", colors),
+        )
+
+    @staticmethod
+    def from_dicts(levels: Sequence[Dict[str, Any]]) -> "LevelColumns":
+        """Build the columns straight from the JSON level objects."""
+        offsets = [0]
+        colors: List[int] = []
+        for lv in levels:
+            colors.extend(lv["colors"])
+            offsets.append(len(colors))
+        return LevelColumns(
+            _column("H", [lv["channel"] for lv in levels]),
+            _column("B", [lv["level"] for lv in levels]),
+            _column("B", [lv["r"] for lv in levels]),
+            _column("B", [lv["g"] for lv in levels]),
+            _column("B", [lv["b"] for lv in levels]),
+            _column("I", offsets),
+            _column("i", colors),
+        )
+
+    def to_levels(self) -> List[Level]:
+        offsets = self.color_offsets
+        colors = self.colors
+        rows = zip(self.channel, self.level, self.r, self.g, self.b)
+        return [
+            Level(b, ch, colors[offsets[i] : offsets[i + 1]].tolist(), g, level, r)
+            for i, (ch, level, r, g, b) in enumerate(rows)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.channel)
+
+    def row(self, channel: int) -> Optional[int]:
+        """Return the last row of ``channel``, or ``None`` if it has no level."""
+        channels = self.channel
+        for i in range(len(channels) - 1, -1, -1):
+            if channels[i] == channel:
+                return i
+        return None
+
+    def level_of(self, channel: int) -> Optional[Level]:
+        i = self.row(channel)
+        if i is None:
+            return None
+        colors = self.colors[self.color_offsets[i] : self.color_offsets[i + 1]]
+        return Level(
+            self.b[i], channel, colors.tolist(), self.g[i], self.level[i], self.r[i]
+        )
+
+    def as_numpy(self) -> Dict[str, Any]:
+        """Return zero-copy NumPy views of the columns, keyed by field name.
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        if np is None:
+            raise ImportError("as_numpy requires numpy")
+        names = ("channel", "level", "r", "g", "b", "color_offsets", "colors")
+        return {
+            name: np.frombuffer(column, dtype=column.typecode)
+            for name, column in ((name, getattr(self, name)) for name in names)
+        }
+
+    def lookup(self, channels: Sequence[int], column: str = "level") -> Any:
+        """Gather ``column`` for each of ``channels``, with -1 where absent.
+
+        A channel with several rows takes the value of its last row.
+
+        Returns a NumPy array when NumPy is installed, otherwise a list.
+        The NumPy path pays for building a channel index on every call, so
+        it only beats scanning a list of ``Level`` objects on large, dense
+        contents, such as a rig with every channel in every cue; on the
+        sparse cues of the example show it is slower, see
+        ``benchmarks/bench_columnar.py``.
+        """
+        if np is not None:
+            cols = self.as_numpy()
+            wanted = np.asarray(channels, dtype=np.int64)
+            out = np.full(wanted.shape, -1, dtype=np.int64)
+            if len(self) and wanted.size:
+                size = int(cols["channel"].max()) + 1
+                index = np.full(size, -1, dtype=np.int64)
+                # The first of the reversed rows is the last row of a channel;
+                # an assignment with repeated indices keeps no defined one.
+                channels, first = np.unique(cols["channel"][::-1], return_index=True)
+                index[channels] = len(self) - 1 - first
+                # Negative channels would wrap around to the end of the index.
+                known = (wanted >= 0) & (wanted < size)
+                rows = np.full(wanted.shape, -1, dtype=np.int64)
+                rows[known] = index[wanted[known]]
+                hit = rows >= 0
+                out[hit] = cols[column][rows[hit]]
+            return out
+        values = getattr(self, column)
+        index = {channel: i for i, channel in enumerate(self.channel)}
+        return [values[index[c]] if c in index else -1 for c in channels]
+
+
+@dataclass
+class ColumnarContent:
+    """A :class:`Content` whose levels are stored as :class:`LevelColumns`."""
+
+    assigned_ranges: List[Any]
+    include_flags: int
+    levels: LevelColumns
+    ltp_parameters: List[LtpParameter]
+
+    @staticmethod
+    def from_content(content: Content) -> "ColumnarContent":
+        return ColumnarContent(
+            content.assigned_ranges,
+            content.include_flags,
+            LevelColumns.from_levels(content.levels),
+            content.ltp_parameters,
+        )
+
+    @staticmethod
+    def from_dict(obj: Any) -> "ColumnarContent":
+        assert isinstance(obj, dict)
+        return ColumnarContent(
+            from_list(lambda x: x, obj.get("assignedRanges")),
+            from_int(obj.get("includeFlags")),
+            LevelColumns.from_dicts(from_list(lambda x: x, obj.get("levels"))),
+            from_list(LtpParameter.from_dict, obj.get("ltpParameters")),
+        )
+
+    def to_content(self) -> Content:
+        return Content(
+            self.assigned_ranges,
+            self.include_flags,
+            self.levels.to_levels(),
+            self.ltp_parameters,
+        )
+
+    def to_dict(self) -> dict:
+        columns = self.levels
+        offsets = columns.color_offsets
+        result: dict = {}
+        result["assignedRanges"] = from_list(lambda x: x, self.assigned_ranges)
+        result["includeFlags"] = from_int(self.include_flags)
+        result["levels"] = [
+            {
+                "b": columns.b[i],
+                "channel": columns.channel[i],
+                "colors": columns.colors[offsets[i] : offsets[i + 1]].tolist(),
+                "g": columns.g[i],
+                "level": columns.level[i],
+                "r": columns.r[i],
+            }
+            for i in range(len(columns))
+        ]
+        result["ltpParameters"] = from_list(
+            lambda x: to_class(LtpParameter, x), self.ltp_parameters
+        )
+        return result
@@ -0,0 +1,151 @@
+"""Slot-based variants of the show file and settings dataclasses.
+
+The classes in :mod:`.showfile` and :mod:`.settings` carry a per-instance
+``__dict__``. A :class:`CompactModel` mirrors every one of them as a
+``@dataclass(slots=True)`` with the same field names, which removes that
+overhead from the tens of thousands of ``Level``, ``Color``, ``LtpParameter``,
+``Topo`` and ``Device`` objects in a show. Two families are provided:
+
+- :data:`SLOTS`: mutable, lists stay lists
+- :data:`FROZEN`: frozen and hashable, lists become tuples
+
+Classes are reached as attributes of the family (``SLOTS.Level``). Instances
+decode from JSON with the compiled decoder, encode back with ``to_dict``, and
+convert to and from the regular model.
+"""
+
+import dataclasses
+import typing
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import settings as _settings
+from . import showfile as _showfile
+from .dedupe import DedupePool
+from .decoder import _list_arg, _optional_arg, compile_decoder, json_key
+
+
+_SOURCE_CLASSES: Dict[str, type] = {
+    name: obj
+    for module in (_showfile, _settings)
+    for name, obj in vars(module).items()
+    if dataclasses.is_dataclass(obj) and obj.__module__ == module.__name__
+}
+
+
+def _encode(value: Any) -> Any:
+    if dataclasses.is_dataclass(value):
+        return value.to_dict()  # type: ignore[union-attr]
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _to_dict(self: Any) -> dict:
+    result: dict = {}
+    for name, key, optional in self._json_fields:
+        value = getattr(self, name)
+        if value is None and optional:
+            continue
+        result[key] = _encode(value)
+    return result
+
+
+class CompactModel:
+    """A family of slotted dataclasses mirroring the regular model."""
+
+    def __init__(self, name: str, frozen: bool) -> None:
+        self.name = name
+        self.frozen = frozen
+        self.classes: Dict[str, type] = {}
+        for cls_name in _SOURCE_CLASSES:
+            self._build(cls_name)
+
+    def __getattr__(self, name: str) -> type:
+        try:
+            return self.__dict__["classes"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __reduce__(self) -> str:
+        # Families are module-level singletons; pickle them by name.
+        return self.name
+
+    def _map_type(self, tp: Any) -> Any:
+        inner = _optional_arg(tp)
+        if inner is not None:
+            return Optional[self._map_type(inner)]
+        item = _list_arg(tp)
+        if item is not None:
+            item = self._map_type(item)
+            return Tuple[item, ...] if self.frozen else List[item]
+        if dataclasses.is_dataclass(tp):
+            return self._build(tp.__name__)
+        return tp
+
+    def _build(self, cls_name: str) -> type:
+        if cls_name in self.classes:
+            return self.classes[cls_name]
+        source = _SOURCE_CLASSES[cls_name]
+        hints = typing.get_type_hints(source)
+        fields = []
+        json_fields = []
+        for f in dataclasses.fields(source):
+            tp = self._map_type(hints[f.name])
+            optional = _optional_arg(tp) is not None
+            if f.default is not dataclasses.MISSING:
+                fields.append((f.name, tp, dataclasses.field(default=f.default)))
+            else:
+                fields.append((f.name, tp))
+            json_fields.append((f.name, json_key(source, f.name), optional))
+        cls = dataclasses.make_dataclass(
+            cls_name,
+            fields,
+            namespace={"to_dict": _to_dict, "_json_fields": tuple(json_fields)},
+            slots=True,
+            frozen=self.frozen,
+        )
+        cls.__module__ = __name__
+        cls.__qualname__ = f"{self.name}.{cls_name}"
+        self.classes[cls_name] = cls
+        return cls
+
+    def from_dict(
+        self,
+        obj: Any,
+        cls_name: str = "ShowFile",
+        strict: bool = False,
+        pool: Optional[DedupePool] = None,
+    ) -> Any:
+        """Decode a parsed JSON document into this family's ``cls_name``.
+
+        With a :class:`~.dedupe.DedupePool`, repeated values are shared.
+        """
+        cls = self.classes[cls_name]
+        if pool is not None:
+            return compile_decoder(cls, strict, dedupe=True)(obj, pool)
+        return compile_decoder(cls, strict)(obj)
+
+    def convert(self, value: Any) -> Any:
+        """Convert a regular model object (or list of them) to this family."""
+        return self._convert(value, self.classes, tuple if self.frozen else list)
+
+    def to_model(self, value: Any) -> Any:
+        """Convert an object of this family back to the regular model."""
+        return self._convert(value, _SOURCE_CLASSES, list)
+
+    def _convert(self, value: Any, classes: Dict[str, type], seq: type) -> Any:
+        if dataclasses.is_dataclass(value):
+            cls = classes[type(value).__name__]
+            return cls(
+                *(
+                    self._convert(getattr(value, f.name), classes, seq)
+                    for f in dataclasses.fields(cls)
+                )
+            )
+        if isinstance(value, (list, tuple)):
+            return seq(self._convert(v, classes, seq) for v in value)
+        return value
+
+
+SLOTS = CompactModel("SLOTS", frozen=False)
+FROZEN = CompactModel("FROZEN", frozen=True)
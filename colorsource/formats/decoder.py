@@ -0,0 +1,273 @@
+"""Schema-compiled decoders for the show file dataclasses.
+
+The ``from_dict`` methods in :mod:`.showfile` and :mod:`.settings` decode
+field-by-field through the generic ``from_int``/``from_list``/``from_optional``
+helpers, which costs several Python calls and an ``isinstance`` check per
+scalar. This module reads the dataclass field definitions once and generates a
+specialized decode function per class, so a ``Level`` or ``Color`` is built by
+a single constructor call over plain dictionary lookups.
+
+Validation is opt-in: ``strict=True`` generates functions that check every
+value the same way the hand-written ``from_dict`` methods do.
+"""
+
+import dataclasses
+import functools
+import typing
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Type, TypeVar
+
+from .showfile import ShowFile, from_bool, from_float, from_int, from_str
+from .settings import Settings
+
+if TYPE_CHECKING:
+    from .dedupe import DedupePool
+
+
+T = TypeVar("T")
+
+_SCALARS = (int, str, bool, float)
+
+# JSON keys that do not follow the plain snake_case -> camelCase rule, by
+# class name so that mirrors of the model (see .compact) share them.
+_KEY_OVERRIDES: Dict[Any, str] = {
+    ("Settings", "s_acn_priority"): "sACNPriority",
+}
+
+
+def json_key(cls: type, name: str) -> str:
+    """Return the JSON key used for field ``name`` of dataclass ``cls``."""
+    override = _KEY_OVERRIDES.get((cls.__name__, name))
+    if override is not None:
+        return override
+    head, *rest = name.split("_")
+    return head + "".join(part[:1].upper() + part[1:] for part in rest)
+
+
+def _check_dict(x: Any) -> Any:
+    assert isinstance(x, dict)
+    return x
+
+
+def _check_list(x: Any) -> Any:
+    assert isinstance(x, list)
+    return x
+
+
+_STRICT_CHECKS = {
+    int: "from_int",
+    bool: "from_bool",
+    str: "from_str",
+    float: "from_float",
+}
+
+
+def _optional_arg(tp: Any) -> Any:
+    """Return ``X`` for ``Optional[X]``, otherwise ``None``."""
+    if typing.get_origin(tp) is typing.Union:
+        args = [a for a in typing.get_args(tp) if a is not type(None)]
+        if len(args) == 1 and len(typing.get_args(tp)) == 2:
+            return args[0]
+    return None
+
+
+def _list_arg(tp: Any) -> Any:
+    if typing.get_origin(tp) is list:
+        (arg,) = typing.get_args(tp) or (Any,)
+        return arg
+    return None
+
+
+def _tuple_arg(tp: Any) -> Any:
+    """Return ``X`` for ``Tuple[X, ...]``, otherwise ``None``."""
+    if typing.get_origin(tp) is tuple:
+        args = typing.get_args(tp)
+        if len(args) == 2 and args[1] is Ellipsis:
+            return args[0]
+    return None
+
+
+def _is_flat(cls: type) -> bool:
+    """A class is flat when all its fields are scalars or sequences of scalars."""
+    for f in dataclasses.fields(cls):
+        tp = f.type
+        item = _list_arg(tp)
+        if item is None:
+            item = _tuple_arg(tp)
+        if item is not None:
+            tp = item
+        if tp not in _SCALARS and tp is not Any:
+            return False
+    return True
+
+
+class _Compiler:
+    """Generates decode functions for a closed set of dataclasses."""
+
+    def __init__(self, strict: bool, dedupe: bool, positional: bool) -> None:
+        self.strict = strict
+        self.dedupe = dedupe
+        self.positional = positional
+        self.params = "obj, pool" if dedupe else "obj"
+        self.namespace: Dict[str, Any] = {
+            "_check_dict": _check_dict,
+            "_check_list": _check_list,
+            "from_int": from_int,
+            "from_bool": from_bool,
+            "from_str": from_str,
+            "from_float": from_float,
+        }
+        self.sources: Dict[type, str] = {}
+        self._counter = 0
+
+    def func_name(self, cls: type) -> str:
+        return f"_decode_{cls.__name__}"
+
+    def _var(self) -> str:
+        self._counter += 1
+        return f"_v{self._counter}"
+
+    def expr(self, tp: Any, src: str) -> str:
+        """Return an expression decoding the JSON value ``src`` as ``tp``."""
+        inner = _optional_arg(tp)
+        if inner is not None:
+            var = self._var()
+            return f"(None if ({var} := {src}) is None else {self.expr(inner, var)})"
+
+        item = _list_arg(tp)
+        if item is not None:
+            seq = f"_check_list({src})" if self.strict else src
+            if item is Any or (item in _SCALARS and item is not float and not self.strict):
+                return f"list({seq})"
+            var = self._var()
+            return f"[{self.expr(item, var)} for {var} in {seq}]"
+
+        item = _tuple_arg(tp)
+        if item is not None:
+            seq = f"_check_list({src})" if self.strict else src
+            copyable = item in _SCALARS and item is not float and not self.strict
+            if item is Any or copyable:
+                values = f"tuple({seq})"
+            else:
+                var = self._var()
+                values = f"tuple([{self.expr(item, var)} for {var} in {seq}])"
+            if self.dedupe and item in _SCALARS:
+                return f"_t({values})"
+            return values
+
+        if tp is Any:
+            return src
+        if tp in _SCALARS:
+            if self.strict:
+                src = f"{_STRICT_CHECKS[tp]}({src})"
+            elif tp is float:
+                src = f"float({src})"
+            if self.dedupe and tp is str:
+                src = f"_s({src})"
+            return src
+
+        if dataclasses.is_dataclass(tp):
+            self.compile(tp)
+            if not self.strict and src.isidentifier() and _is_flat(tp):
+                return self.construct(tp, src)
+            if self.dedupe:
+                return f"{self.func_name(tp)}({src}, pool)"
+            return f"{self.func_name(tp)}({src})"
+
+        raise TypeError(f"cannot compile a decoder for {tp!r}")
+
+    def field_source(
+        self, cls: type, index: int, f: "dataclasses.Field[Any]", obj: str
+    ) -> str:
+        if self.positional:
+            return f"{obj}[{index}]"
+        key = json_key(cls, f.name)
+        if self.strict or _optional_arg(f.type) is not None:
+            return f"{obj}.get({key!r})"
+        return f"{obj}[{key!r}]"
+
+    def construct(self, cls: type, obj: str) -> str:
+        self.namespace[cls.__name__] = cls
+        args = ", ".join(
+            self.expr(f.type, self.field_source(cls, i, f, obj))
+            for i, f in enumerate(dataclasses.fields(cls))
+        )
+        if self.dedupe and _is_flat(cls) and cls.__dataclass_params__.frozen:
+            return f"_o({cls.__name__}({args}))"
+        return f"{cls.__name__}({args})"
+
+    def preamble(self) -> List[str]:
+        lines = []
+        if self.dedupe:
+            lines.append("    _s, _t, _o = pool.str, pool.tuple, pool.object")
+        return lines
+
+    def compile(self, cls: type) -> None:
+        if cls in self.sources:
+            return
+        # Reserve the slot first so self-referencing schemas terminate.
+        self.sources[cls] = ""
+        lines = [f"def {self.func_name(cls)}({self.params}):", *self.preamble()]
+        if self.strict and not self.positional:
+            lines.append("    _check_dict(obj)")
+        lines.append(f"    return {self.construct(cls, 'obj')}")
+        self.sources[cls] = "\n".join(lines)
+
+    def build(self, tp: Any) -> Callable[[Any], Any]:
+        root = "\n".join(
+            [
+                f"def _decode({self.params}):",
+                *self.preamble(),
+                f"    return {self.expr(tp, 'obj')}",
+            ]
+        )
+        source = "\n\n".join([*self.sources.values(), root])
+        code = compile(source, f"<colorsource decoder for {tp!r}>", "exec")
+        exec(code, self.namespace)
+        fn = self.namespace["_decode"]
+        fn.__source__ = source
+        return fn
+
+
+@functools.lru_cache(maxsize=None)
+def compile_decoder(
+    tp: Type[T], strict: bool = False, dedupe: bool = False, positional: bool = False
+) -> Callable[..., T]:
+    """Compile a decoder for ``tp`` and every dataclass it contains.
+
+    Args:
+        tp: A model dataclass such as ``ShowFile`` or ``Settings``, or a type
+            expression over them such as ``List[Palette]``
+        strict: Validate every value like the generated ``from_dict`` methods
+        dedupe: Share equal strings, scalar tuples and flat frozen objects
+            through a :class:`~.dedupe.DedupePool`
+        positional: Read each object from a tuple of its field values in
+            declaration order, as made by ``compile_encoder(positional=True)``,
+            instead of from a JSON dict
+
+    Returns:
+        A function taking the parsed JSON value and returning a ``tp`` value.
+        With ``dedupe`` it takes the pool as a second argument.
+        The generated source is available as its ``__source__`` attribute.
+
+    Without ``strict`` the input is trusted: a missing key raises ``KeyError``
+    and values of the wrong type are passed through unchecked.
+    """
+    return _Compiler(strict, dedupe, positional).build(tp)
+
+
+def fast_showfile_from_dict(
+    s: Any, strict: bool = False, pool: Optional["DedupePool"] = None
+) -> ShowFile:
+    """Compiled equivalent of :func:`showfile_from_dict`.
+
+    Pass a :class:`~.dedupe.DedupePool` as ``pool`` to share repeated strings.
+    """
+    if pool is not None:
+        return compile_decoder(ShowFile, strict, dedupe=True)(s, pool)
+    return compile_decoder(ShowFile, strict)(s)
+
+
+def fast_settings_from_dict(s: Any, strict: bool = False) -> Settings:
+    """Compiled equivalent of :func:`settings_from_dict`."""
+    return compile_decoder(Settings, strict)(s)
+
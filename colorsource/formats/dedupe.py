@@ -0,0 +1,85 @@
+"""Sharing of repeated values while a show is decoded.
+
+A show repeats the same values thousands of times: personality GUIDs and the
+manufacturer/model/mode strings on every ``Device``, the all-zero emitter
+vector of every palette ``Color``, the empty ``colors`` of every ``Level``. A
+:class:`DedupePool` passed to the compiled decoder keeps one canonical copy of
+each and hands it out for every repeat:
+
+- strings are shared in every model
+- scalar tuples and flat frozen objects (``Color``, ``Level``, ...) are
+  shared in the :data:`~.compact.FROZEN` model, where they are immutable.
+  Tuples are matched on the types of their items as well as their values,
+  so ``(0, 0, 0)`` never stands in for ``(0.0, 0.0, 0.0)``
+
+Lists in the regular and :data:`~.compact.SLOTS` models are never shared, since
+mutating one would silently change every other owner.
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Tuple
+
+
+@dataclass
+class DedupeStats:
+    """How many values of one kind were seen and how many were kept."""
+
+    seen: int = 0
+    unique: int = 0
+    bytes_saved: int = 0
+
+    @property
+    def shared(self) -> int:
+        return self.seen - self.unique
+
+
+class DedupePool:
+    """Canonical copies of the values seen while decoding one or more shows.
+
+    Reusing a pool across several loads shares values between those shows.
+    """
+
+    def __init__(self) -> None:
+        self._strings: Dict[str, str] = {}
+        # (item types, tuple) -> tuple
+        self._tuples: Dict[Any, Tuple[Any, ...]] = {}
+        self._objects: Dict[Hashable, Any] = {}
+        self.stats: Dict[str, DedupeStats] = {
+            "str": DedupeStats(),
+            "tuple": DedupeStats(),
+            "object": DedupeStats(),
+        }
+
+    @staticmethod
+    def _share(
+        table: Dict[Any, Any], stats: DedupeStats, value: Any, key: Any = None
+    ) -> Any:
+        stats.seen += 1
+        size = len(table)
+        canonical = table.setdefault(value if key is None else key, value)
+        if len(table) > size:
+            stats.unique += 1
+        elif canonical is not value:
+            stats.bytes_saved += sys.getsizeof(value)
+        return canonical
+
+    def str(self, value: str) -> str:
+        return self._share(self._strings, self.stats["str"], value)
+
+    def tuple(self, value: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        key = (tuple(map(type, value)), value)
+        return self._share(self._tuples, self.stats["tuple"], value, key)
+
+    def object(self, value: Hashable) -> Any:
+        return self._share(self._objects, self.stats["object"], value)
+
+    def report(self) -> str:
+        """Summarize the deduplication, one line per kind of value."""
+        lines = []
+        for kind, stats in self.stats.items():
+            lines.append(
+                f"{kind:<7} {stats.seen:8} seen {stats.unique:8} unique "
+                f"{stats.shared:8} shared {stats.bytes_saved / 1024:9.1f} KiB saved"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,237 @@
+"""Structural diff of two ShowFile (or Settings) objects.
+
+:func:`diff` walks two dataclass trees side by side and reports every leaf
+that differs as a :class:`Change` with its path, e.g.
+``play.cue_list.steps[cue=14].up_time``. Lists of objects that have a natural
+key are matched by it rather than by position (see :data:`KEYS`), so
+inserting a cue reports one added step instead of a change to every step
+after it. Lists whose keys are not unique on both sides fall back to
+matching by position.
+
+Every object and list gets a digest computed bottom-up from its fields and
+its children's digests. Subtrees with equal digests are skipped without
+being walked, so once both trees are hashed the walk only visits the paths
+leading to changes. :class:`ShowDiffer` caches the digests by object
+identity; reusing one differ to compare a kept version against several
+others hashes the kept version only once.
+"""
+
+import dataclasses
+import functools
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+
+# Attribute that identifies each element of a list of these classes
+KEYS: Dict[str, str] = {
+    "Step": "cue",
+    "Device": "device_id",
+    "Palette": "palette",
+    "Personality": "dcid",
+    "Color": "channel",
+    "Level": "channel",
+}
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+# Old value of an added element, new value of a removed one
+MISSING: Any = _Missing()
+
+
+@dataclass(frozen=True)
+class Key:
+    """Path element of a list element matched by ``name == value``."""
+
+    name: str
+    value: Any
+
+    def __str__(self) -> str:
+        return f"[{self.name}={self.value!r}]"
+
+
+_PathElement = Union[str, int, Key]
+
+
+@dataclass(frozen=True)
+class Change:
+    """One difference between two trees.
+
+    Attributes:
+        path: Field names, list indices and keys from the root to the value
+        old: The old value, or :data:`MISSING` if it was added
+        new: The new value, or :data:`MISSING` if it was removed
+    """
+
+    path: Tuple[_PathElement, ...]
+    old: Any
+    new: Any
+
+    @property
+    def kind(self) -> str:
+        """``"added"``, ``"removed"`` or ``"changed"``."""
+        if self.old is MISSING:
+            return "added"
+        if self.new is MISSING:
+            return "removed"
+        return "changed"
+
+    @property
+    def location(self) -> str:
+        """The path as a string, e.g. ``play.patch.devices[device_id=9].dmx``."""
+        parts: List[str] = []
+        for element in self.path:
+            if isinstance(element, str):
+                parts.append(f".{element}" if parts else element)
+            elif isinstance(element, int):
+                parts.append(f"[{element}]")
+            else:
+                parts.append(str(element))
+        return "".join(parts)
+
+    def __str__(self) -> str:
+        if self.kind == "changed":
+            return f"{self.location}: {self.old!r} -> {self.new!r}"
+        return f"{self.location}: {self.kind}"
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names(cls: type) -> Tuple[str, ...]:
+    return tuple(f.name for f in dataclasses.fields(cls))
+
+
+_SCALARS = frozenset((int, float, str, bool, type(None)))
+
+
+def _is_object(value: Any) -> bool:
+    return hasattr(type(value), "__dataclass_fields__")
+
+
+class ShowDiffer:
+    """Diffs dataclass trees, caching subtree digests between calls.
+
+    Digests are cached by object identity and the differ keeps a reference
+    to every object it has hashed. After mutating a hashed object, call
+    :meth:`clear`.
+
+    Args:
+        keys: Key attribute by class name for keyed list matching, default
+            :data:`KEYS`
+    """
+
+    def __init__(self, keys: Optional[Dict[str, str]] = None) -> None:
+        self.keys = KEYS if keys is None else keys
+        self._digests: Dict[int, Tuple[Any, bytes]] = {}
+
+    def clear(self) -> None:
+        self._digests.clear()
+
+    def digest(self, value: Any) -> bytes:
+        """The digest of an object or list, computed once per object."""
+        entry = self._digests.get(id(value))
+        if entry is not None and entry[0] is value:
+            return entry[1]
+        if isinstance(value, list):
+            parts: Any = tuple(self._part(item) for item in value)
+        else:
+            parts = (type(value).__name__,) + tuple(
+                self._part(getattr(value, name)) for name in _field_names(type(value))
+            )
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).digest()
+        self._digests[id(value)] = (value, digest)
+        return digest
+
+    def _part(self, value: Any) -> Any:
+        if type(value) in _SCALARS:
+            return value
+        if type(value) is list:
+            if value and _is_object(value[0]):
+                return self.digest(value)
+            return tuple(value)
+        if _is_object(value):
+            return self.digest(value)
+        return value
+
+    def diff(self, old: Any, new: Any) -> List[Change]:
+        """Every difference between ``old`` and ``new``, in tree order.
+
+        Within a keyed list, removed elements come first, then changed ones
+        in the order of ``new``, then added ones.
+        """
+        changes: List[Change] = []
+        self._diff((), old, new, changes)
+        return changes
+
+    def _diff(
+        self, path: Tuple[_PathElement, ...], old: Any, new: Any, out: List[Change]
+    ) -> None:
+        if old is new:
+            return
+        if _is_object(old) and type(old) is type(new):
+            if self.digest(old) == self.digest(new):
+                return
+            for name in _field_names(type(old)):
+                self._diff(path + (name,), getattr(old, name), getattr(new, name), out)
+        elif isinstance(old, list) and isinstance(new, list):
+            objects = [v for v in old[:1] + new[:1] if _is_object(v)]
+            if not objects:
+                if old != new:
+                    out.append(Change(path, old, new))
+            elif self.digest(old) != self.digest(new):
+                self._diff_list(path, old, new, out, objects[0])
+        elif old != new:
+            out.append(Change(path, old, new))
+
+    def _diff_list(
+        self,
+        path: Tuple[_PathElement, ...],
+        old: List[Any],
+        new: List[Any],
+        out: List[Change],
+        sample: Any,
+    ) -> None:
+        name = self.keys.get(type(sample).__name__)
+        old_keyed = _keyed(old, name) if name is not None else None
+        new_keyed = _keyed(new, name) if name is not None else None
+        if old_keyed is None or new_keyed is None:
+            for i, (a, b) in enumerate(zip(old, new)):
+                self._diff(path + (i,), a, b, out)
+            for i in range(len(new), len(old)):
+                out.append(Change(path + (i,), old[i], MISSING))
+            for i in range(len(old), len(new)):
+                out.append(Change(path + (i,), MISSING, new[i]))
+            return
+        assert name is not None
+        for key, item in old_keyed.items():
+            if key not in new_keyed:
+                out.append(Change(path + (Key(name, key),), item, MISSING))
+        for key, item in new_keyed.items():
+            if key in old_keyed:
+                self._diff(path + (Key(name, key),), old_keyed[key], item, out)
+        for key, item in new_keyed.items():
+            if key not in old_keyed:
+                out.append(Change(path + (Key(name, key),), MISSING, item))
+
+
+def _keyed(items: Iterable[Any], name: str) -> Optional[Dict[Any, Any]]:
+    """``items`` by their ``name`` attribute, or ``None`` if not unique."""
+    keyed: Dict[Any, Any] = {}
+    for item in items:
+        key = getattr(item, name, MISSING)
+        if key is MISSING or key in keyed:
+            return None
+        keyed[key] = item
+    return keyed
+
+
+def diff(old: Any, new: Any, keys: Optional[Dict[str, str]] = None) -> List[Change]:
+    """Every difference between two ShowFile, Settings or other dataclass trees.
+
+    See :meth:`ShowDiffer.diff`; use a :class:`ShowDiffer` to keep the
+    digests of a tree between diffs.
+    """
+    return ShowDiffer(keys).diff(old, new)
@@ -0,0 +1,266 @@
+"""Compiled and incremental JSON encoding of a ShowFile.
+
+:func:`compile_encoder` is the counterpart of :func:`.decoder.compile_decoder`:
+it generates a specialized ``to_dict`` per class, without the per-field
+validation helpers.
+
+``json.dumps(showfile_to_dict(show), indent=2)`` builds the full dict tree and
+then the full document before a single byte is written. :func:`write_json`
+walks the container objects (``ShowFile``, ``Play``, ``CueList``, ``Patch``)
+itself and encodes every element of their lists (each ``Step``, ``Device``,
+``Palette``, ...) separately with the C encoder, writing the result to a
+binary stream in batches. The bytes are identical to the one-shot encode.
+"""
+
+import dataclasses
+import functools
+import json
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .decoder import _SCALARS, _is_flat, _list_arg, _optional_arg, json_key
+from .showfile import CueList, Patch, Play, ShowFile
+
+
+DEFAULT_BATCH_SIZE = 64 * 1024
+
+_STREAMED = (ShowFile, Play, CueList, Patch)
+
+_FIELDS = {
+    cls: [
+        (f.name, json_key(cls, f.name), _optional_arg(f.type) is not None)
+        for f in dataclasses.fields(cls)
+    ]
+    for cls in _STREAMED
+}
+
+
+def _fields(cls: type) -> List[Tuple[str, str, bool]]:
+    """The field table of ``cls`` or of its streamed base, e.g. of LazyPlay."""
+    fields = _FIELDS.get(cls)
+    if fields is None:
+        fields = next(f for base, f in list(_FIELDS.items()) if issubclass(cls, base))
+        _FIELDS[cls] = fields
+    return fields
+
+
+class _Compiler:
+    """Generates to_dict functions for a closed set of dataclasses."""
+
+    def __init__(self, positional: bool) -> None:
+        self.positional = positional
+        self.namespace: Dict[str, Any] = {}
+        self.sources: Dict[type, str] = {}
+        self._counter = 0
+
+    def func_name(self, cls: type) -> str:
+        return f"_encode_{cls.__name__}"
+
+    def _var(self) -> str:
+        self._counter += 1
+        return f"_v{self._counter}"
+
+    def expr(self, tp: Any, src: str) -> str:
+        """Return an expression encoding the model value ``src`` of type ``tp``."""
+        item = _list_arg(tp)
+        if item is not None:
+            if item is Any or item in _SCALARS:
+                return f"list({src})"
+            var = self._var()
+            return f"[{self.expr(item, var)} for {var} in {src}]"
+        if tp is Any or tp in _SCALARS:
+            return src
+        if dataclasses.is_dataclass(tp):
+            self.compile(tp)
+            if src.isidentifier() and _is_flat(tp):
+                return self.literal(tp, src)
+            return f"{self.func_name(tp)}({src})"
+        raise TypeError(f"cannot compile an encoder for {tp!r}")
+
+    def field(self, f: "dataclasses.Field[Any]", src: str) -> str:
+        """Encode a field value that may be ``None`` if the field is optional."""
+        inner = _optional_arg(f.type)
+        if inner is None:
+            return self.expr(f.type, src)
+        var = self._var()
+        return f"(None if ({var} := {src}) is None else {self.expr(inner, var)})"
+
+    def literal(self, cls: type, obj: str) -> str:
+        if self.positional:
+            values = [self.field(f, f"{obj}.{f.name}") for f in dataclasses.fields(cls)]
+            return f"({', '.join(values)},)" if values else "()"
+        items = ", ".join(
+            f"{json_key(cls, f.name)!r}: {self.expr(f.type, f'{obj}.{f.name}')}"
+            for f in dataclasses.fields(cls)
+        )
+        return f"{{{items}}}"
+
+    def compile(self, cls: type) -> None:
+        if cls in self.sources:
+            return
+        self.sources[cls] = ""
+        fields = dataclasses.fields(cls)
+        lines = [f"def {self.func_name(cls)}(obj):"]
+        optional = any(_optional_arg(f.type) is not None for f in fields)
+        if self.positional or not optional:
+            lines.append(f"    return {self.literal(cls, 'obj')}")
+        else:
+            # Optional fields are left out when None, like the to_dict methods.
+            lines.append("    result = {}")
+            for f in fields:
+                key = json_key(cls, f.name)
+                inner = _optional_arg(f.type)
+                if inner is None:
+                    value = self.expr(f.type, f"obj.{f.name}")
+                    lines.append(f"    result[{key!r}] = {value}")
+                else:
+                    var = self._var()
+                    lines.append(f"    if ({var} := obj.{f.name}) is not None:")
+                    lines.append(f"        result[{key!r}] = {self.expr(inner, var)}")
+            lines.append("    return result")
+        self.sources[cls] = "\n".join(lines)
+
+    def build(self, cls: type) -> Callable[[Any], dict]:
+        self.compile(cls)
+        source = "\n\n".join(self.sources.values())
+        code = compile(source, f"<colorsource encoder for {cls!r}>", "exec")
+        exec(code, self.namespace)
+        fn = self.namespace[self.func_name(cls)]
+        fn.__source__ = source
+        return fn
+
+
+@functools.lru_cache(maxsize=None)
+def compile_encoder(cls: type, positional: bool = False) -> Callable[[Any], Any]:
+    """Compile a ``to_dict`` equivalent for dataclass ``cls``.
+
+    The generated function returns the same dict as ``cls.to_dict`` but trusts
+    the field types instead of checking them. Its source is available as the
+    ``__source__`` attribute.
+
+    With ``positional`` every object becomes a tuple of its field values in
+    declaration order instead, a compact form for pickling that
+    ``compile_decoder(cls, positional=True)`` turns back into objects.
+    """
+    return _Compiler(positional).build(cls)
+
+
+def separators(indent: Optional[int]) -> Tuple[str, str]:
+    """The separators ``json.dumps`` uses with ``indent``, compact without."""
+    return (",", ": ") if indent is not None else (",", ":")
+
+
+def _plain(value: Any) -> Any:
+    if dataclasses.is_dataclass(value):
+        return compile_encoder(type(value))(value)
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+class _Encoder:
+    def __init__(self, indent: Optional[int]) -> None:
+        self.indent = indent
+        self.item_separator, self.key_separator = separators(indent)
+
+    def newline(self, level: int) -> str:
+        if self.indent is None:
+            return ""
+        return "\n" + " " * (self.indent * level)
+
+    def dumps(self, value: Any, level: int) -> str:
+        text = json.dumps(
+            value,
+            indent=self.indent,
+            separators=(self.item_separator, self.key_separator),
+        )
+        if self.indent and level:
+            # Strings never contain a raw newline, so every one is layout.
+            text = text.replace("\n", self.newline(level))
+        return text
+
+    def value(self, value: Any, level: int) -> Iterator[str]:
+        if isinstance(value, _STREAMED):
+            yield from self.container(value, level)
+        elif isinstance(value, list) and value and dataclasses.is_dataclass(value[0]):
+            yield from self.array(value, level)
+        else:
+            yield self.dumps(_plain(value), level)
+
+    def container(self, obj: Any, level: int) -> Iterator[str]:
+        items = [
+            (key, getattr(obj, name))
+            for name, key, optional in _fields(type(obj))
+            if not (optional and getattr(obj, name) is None)
+        ]
+        if not items:
+            yield "{}"
+            return
+        yield "{"
+        for i, (key, value) in enumerate(items):
+            prefix = self.item_separator if i else ""
+            yield prefix + self.newline(level + 1)
+            yield json.dumps(key) + self.key_separator
+            yield from self.value(value, level + 1)
+        yield self.newline(level) + "}"
+
+    def array(self, items: List[Any], level: int) -> Iterator[str]:
+        encode = compile_encoder(type(items[0]))
+        yield "["
+        for i, item in enumerate(items):
+            prefix = self.item_separator if i else ""
+            yield prefix + self.newline(level + 1)
+            yield self.dumps(encode(item), level + 1)
+        yield self.newline(level) + "]"
+
+
+def iter_json(showfile: ShowFile, indent: Optional[int] = 2) -> Iterator[str]:
+    """Yield the JSON text of ``showfile`` in pieces.
+
+    Joined, the pieces equal ``json.dumps(showfile_to_dict(showfile),
+    indent=indent, separators=separators(indent))``.
+    """
+    return _Encoder(indent).value(showfile, 0)
+
+
+def write_json(
+    fp: BinaryIO,
+    showfile: ShowFile,
+    indent: Optional[int] = 2,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> None:
+    """Encode ``showfile`` as UTF-8 JSON into the binary stream ``fp``.
+
+    Args:
+        fp: Binary stream, e.g. from ``zipfile.ZipFile.open(name, "w")``
+        showfile: The show to encode
+        indent: Indentation as in ``json.dumps``; ``None`` writes compact JSON
+        batch_size: Approximate number of characters per write
+    """
+    write_pieces(fp, iter_json(showfile, indent), batch_size)
+
+
+def write_pieces(
+    fp: BinaryIO, pieces: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE
+) -> None:
+    """Write text pieces to ``fp`` as UTF-8, about ``batch_size`` at a time."""
+    batch: List[str] = []
+    size = 0
+    for piece in pieces:
+        batch.append(piece)
+        size += len(piece)
+        if size >= batch_size:
+            fp.write("".join(batch).encode("utf-8"))
+            batch.clear()
+            size = 0
+    if batch:
+        fp.write("".join(batch).encode("utf-8"))
@@ -0,0 +1,239 @@
+"""Incremental saving of a show that is edited between saves.
+
+:func:`.encoder.write_json` encodes the container objects (``ShowFile``,
+``Play``, ``CueList``, ``Patch``) field by field and every element of their
+lists (each ``Step``, ``Device``, ``Palette``, ...) on its own. An
+:class:`IncrementalSaver` keeps the JSON text of every such element and of
+every whole list from the previous save, and only encodes again:
+
+- elements that were reported changed with :meth:`IncrementalSaver.touch`
+- elements that are new, i.e. objects it has not encoded before
+- lists whose elements were added, removed, replaced or reordered
+
+The scalar fields of the containers are encoded on every save; they are a
+handful of values. The text of a list is reused when the list holds the same
+element objects as before and none of them was touched, so a save costs one
+identity check per element plus the encoding of what changed. The JSON is
+identical to a full encode with the same indent.
+
+Changes are tracked by object identity. Replacing an element, e.g.
+``steps[i] = dataclasses.replace(step, up_time=30)``, is picked up without
+any call. Mutating an object in place, e.g. ``steps[3].up_time = 99``, must
+be reported with ``touch``, or it is not saved.
+
+With ``verify=True`` in-place edits are also caught without ``touch``:
+every cached element keeps a hash of its field values (from
+``compile_encoder(cls, positional=True)``) and an element whose hash changed
+is encoded again. This hashes every element of the show on every save, so
+a save then costs in proportion to the size of the show rather than to the
+edit; it is a fraction of a full encode, but use it as a safety net for code
+that cannot report its edits, not for autosaves.
+"""
+
+import hashlib
+import json
+import pickle
+import zipfile
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .encoder import (
+    DEFAULT_BATCH_SIZE,
+    _Encoder,
+    compile_encoder,
+    separators,
+    write_pieces,
+)
+from .lsf import LsfFile, _replacing
+
+
+def _walk(value: Any) -> Iterator[Any]:
+    """``value`` and every object and list nested in it."""
+    if isinstance(value, list):
+        yield value
+        for item in value:
+            if isinstance(item, list) or hasattr(item, "__dataclass_fields__"):
+                yield from _walk(item)
+    elif hasattr(value, "__dataclass_fields__"):
+        yield value
+        for name in value.__dataclass_fields__:
+            item = getattr(value, name)
+            if isinstance(item, list) or hasattr(item, "__dataclass_fields__"):
+                yield from _walk(item)
+
+
+def _digest(snapshot: Callable[[Any], Any], item: Any) -> bytes:
+    """A hash of the field values of ``item``, nested objects included."""
+    data = pickle.dumps(snapshot(item), pickle.HIGHEST_PROTOCOL)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class _CachingEncoder(_Encoder):
+    def __init__(self, saver: "IncrementalSaver") -> None:
+        super().__init__(saver.indent)
+        self.saver = saver
+
+    def array(self, items: List[Any], level: int) -> Iterator[str]:
+        saver = self.saver
+        ids = tuple(map(id, items))
+        snapshot = compile_encoder(type(items[0]), positional=True)
+        digests = [_digest(snapshot, item) for item in items] if saver.verify else []
+        entry = saver._arrays.get(id(items))
+        if entry is not None and entry[0] is items and entry[1] == ids:
+            if not saver.verify or self._unchanged(items, digests):
+                saver.hits += 1
+                yield entry[2]
+                return
+        encode = compile_encoder(type(items[0]))
+        pieces = ["["]
+        for i, item in enumerate(items):
+            pieces.append((self.item_separator if i else "") + self.newline(level + 1))
+            digest = digests[i] if digests else None
+            cached = saver._elements.get(id(item))
+            if cached is not None and cached[0] is item:
+                if digest is None or cached[3] == digest:
+                    saver.hits += 1
+                    pieces.append(cached[1])
+                    continue
+                saver.stale += 1
+            saver.misses += 1
+            text = self.dumps(encode(item), level + 1)
+            if digest is None:
+                digest = _digest(snapshot, item)
+            saver._elements[id(item)] = (item, text, items, digest)
+            if saver._indexed:
+                saver._index(item, items)
+            pieces.append(text)
+        pieces.append(self.newline(level) + "]")
+        text = "".join(pieces)
+        saver._arrays[id(items)] = (items, ids, text)
+        yield text
+
+    def _unchanged(self, items: List[Any], digests: List[bytes]) -> bool:
+        """Whether every element of a cached list still has its digest."""
+        elements = self.saver._elements
+        for item, digest in zip(items, digests):
+            cached = elements.get(id(item))
+            if cached is None or cached[0] is not item or cached[3] != digest:
+                return False
+        return True
+
+
+class IncrementalSaver:
+    """Saves an LSF file, re-encoding only what changed since the last save.
+
+    The saver keeps a reference to every object it has encoded. Call
+    :meth:`clear` to drop the cache, e.g. after replacing the whole show.
+
+    Args:
+        lsf: The show to save; ``lsf.showfile`` may be edited between saves
+        indent: JSON indentation; ``None`` writes compact JSON
+        verify: Compare the digest of every cached element on each save, so
+            that in-place edits not reported to :meth:`touch` are saved too.
+            Each save then hashes the whole show.
+
+    Attributes:
+        hits: Elements and lists reused from the cache, over all saves
+        misses: Elements encoded, over all saves
+        stale: Elements found changed in place without a :meth:`touch`,
+            over all saves; always 0 without ``verify``
+    """
+
+    def __init__(
+        self, lsf: LsfFile, indent: Optional[int] = 2, verify: bool = False
+    ) -> None:
+        self.lsf = lsf
+        self.indent = indent
+        self.verify = verify
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        # id -> (element, JSON text, the list it was encoded in, digest)
+        self._elements: Dict[int, Tuple[Any, str, List[Any], bytes]] = {}
+        # id -> (list, ids of its elements, JSON text)
+        self._arrays: Dict[int, Tuple[List[Any], Tuple[int, ...], str]] = {}
+        # id of an element or anything nested in it -> the elements it is
+        # part of (more than one when objects are shared, see DedupePool),
+        # built by the first touch
+        self._owners: Dict[int, Dict[int, Tuple[Any, List[Any]]]] = {}
+        self._indexed = False
+
+    def clear(self) -> None:
+        self._elements.clear()
+        self._arrays.clear()
+        self._owners.clear()
+        self._indexed = False
+
+    def _index(self, element: Any, items: List[Any]) -> None:
+        for nested in _walk(element):
+            self._owners.setdefault(id(nested), {})[id(element)] = (element, items)
+
+    def touch(self, *objects: Any) -> None:
+        """Report objects changed in place since the last save.
+
+        Each object may be an element of a show list (a ``Step``), anything
+        nested in one (its ``Content``, a ``Level``, a list of levels) or a
+        show list itself (``cue_list.steps``). Objects the saver has not
+        encoded, and the container objects, need no call; with ``verify``
+        no call is needed at all.
+
+        Without ``verify`` an in-place edit that is not reported here is
+        missing from the next save.
+        """
+        if not self._indexed:
+            for element, _, items, _ in self._elements.values():
+                self._index(element, items)
+            self._indexed = True
+        for obj in objects:
+            self._arrays.pop(id(obj), None)
+            for element, items in self._owners.get(id(obj), {}).values():
+                self._elements.pop(id(element), None)
+                self._arrays.pop(id(items), None)
+
+    def iter_json(self) -> Iterator[str]:
+        """Yield the JSON text of ``lsf.showfile`` in pieces, see
+        :func:`.encoder.iter_json`."""
+        return _CachingEncoder(self).value(self.lsf.showfile, 0)
+
+    def dumps(self) -> str:
+        """The JSON text of ``lsf.showfile``."""
+        return "".join(self.iter_json())
+
+    def write_json(self, fp: BinaryIO, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        """Encode ``lsf.showfile`` as UTF-8 JSON into the binary stream ``fp``."""
+        write_pieces(fp, self.iter_json(), batch_size)
+
+    def save(
+        self,
+        filepath: Union[str, Path],
+        compression: int = zipfile.ZIP_DEFLATED,
+        compresslevel: Optional[int] = None,
+    ) -> None:
+        """Save the show like :meth:`.LsfFile.to_file` with the saver's indent.
+
+        Only the JSON encoding is incremental: the archive member is still
+        compressed as a whole, so ``compression=zipfile.ZIP_STORED`` or a
+        low ``compresslevel`` keeps autosaves fast. The file is replaced
+        only once it is written completely.
+        """
+        with _replacing(Path(filepath)) as tmp, zipfile.ZipFile(
+            tmp, "w", compression, compresslevel=compresslevel
+        ) as zf:
+            with zf.open("showfile.json", "w") as fp:
+                self.write_json(fp)
+            settings_json = json.dumps(
+                self.lsf.settings.to_dict(),
+                indent=self.indent,
+                separators=separators(self.indent),
+            ).encode("utf-8")
+            zf.writestr("settings.json", settings_json)
@@ -0,0 +1,105 @@
+"""On-demand decoding of the ``Play`` sections of a show file.
+
+A :class:`LazyPlay` keeps the raw ``showfile.json`` bytes and decodes each
+section (``patch``, ``cue_list``, ``color_palettes``, ...) the first time it is
+accessed. The scalar metadata fields are scanned straight out of the raw bytes,
+so reading ``show_file_name`` never parses the rest of the document.
+"""
+
+import dataclasses
+import json
+import re
+from typing import Any, Dict, FrozenSet, Optional
+
+from .decoder import compile_decoder, json_key
+from .dedupe import DedupePool
+from .showfile import Play
+
+
+_PLAY_FIELDS: Dict[str, Any] = {f.name: f.type for f in dataclasses.fields(Play)}
+
+# Matches the ": "value"" following a key, honouring escaped quotes.
+_STRING_VALUE = re.compile(rb'\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+class _ShowSource:
+    """The undecoded showfile.json, parsed into a dict at most once."""
+
+    def __init__(self, data: bytes, pool: Optional[DedupePool]) -> None:
+        self._data: Optional[bytes] = data
+        self._play: Optional[Dict[str, Any]] = None
+        self._pool = pool
+
+    def scan_string(self, key: str) -> Optional[str]:
+        """Find a ``Play`` string value in the raw bytes without parsing them.
+
+        An unescaped ``"key"`` followed by a colon can only be an object key,
+        and the metadata keys only occur on ``Play``. Keys are written sorted,
+        which puts them near the end of the document, so search backwards.
+        Returns ``None`` if the key is not found, in which case the caller
+        falls back to a full parse.
+        """
+        data = self._data
+        if data is None:
+            return None
+        needle = b'"' + key.encode("utf-8") + b'"'
+        index = data.rfind(needle)
+        if index < 0:
+            return None
+        match = _STRING_VALUE.match(data, index + len(needle))
+        if match is None:
+            return None
+        return json.loads(match.group(1))
+
+    def play_dict(self) -> Dict[str, Any]:
+        if self._play is None:
+            assert self._data is not None
+            self._play = json.loads(self._data.decode("utf-8"))["play"]
+            self._data = None
+        return self._play
+
+    def section(self, name: str) -> Any:
+        key = json_key(Play, name)
+        tp = _PLAY_FIELDS[name]
+        pool = self._pool
+        if tp is str and self._play is None:
+            value = self.scan_string(key)
+            if value is not None:
+                return value if pool is None else pool.str(value)
+        # Each section is decoded once, so the raw dict can be let go of.
+        value = self.play_dict().pop(key)
+        if pool is not None:
+            return compile_decoder(tp, dedupe=True)(value, pool)
+        return compile_decoder(tp)(value)
+
+
+class LazyPlay(Play):
+    """A :class:`Play` whose sections are decoded on first access.
+
+    Decoded sections are stored as ordinary attributes, so every access after
+    the first costs the same as on a regular ``Play``. Once all sections have
+    been decoded the raw show data is released.
+    """
+
+    def __init__(self, data: bytes, pool: Optional[DedupePool] = None) -> None:
+        self._source = _ShowSource(data, pool)
+
+    def __getattr__(self, name: str) -> Any:
+        source = self.__dict__.get("_source")
+        if source is None or name not in _PLAY_FIELDS:
+            raise AttributeError(name)
+        value = source.section(name)
+        setattr(self, name, value)
+        if len(self.materialized) == len(_PLAY_FIELDS):
+            del self._source
+        return value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Play):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _PLAY_FIELDS)
+
+    @property
+    def materialized(self) -> FrozenSet[str]:
+        """Names of the sections that have been decoded so far."""
+        return frozenset(name for name in _PLAY_FIELDS if name in self.__dict__)
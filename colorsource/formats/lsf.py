@@ -1,11 +1,36 @@
+import contextlib
+import io
 import json
+import os
+import uuid
 import zipfile
 from pathlib import Path
-from typing import Union
+from typing import Iterator, Optional, Union
 from dataclasses import dataclass
 
-from .showfile import ShowFile, showfile_from_dict, showfile_to_dict
+from .showfile import ShowFile, showfile_from_dict
 from .settings import Settings
+from .lazy import LazyPlay
+from .dedupe import DedupePool
+from .decoder import fast_showfile_from_dict
+from .encoder import separators, write_json
+from .streaming import showfile_from_stream
+
+
+@contextlib.contextmanager
+def _replacing(filepath: Path) -> Iterator[Path]:
+    """Yield a temporary path that replaces ``filepath`` if the block succeeds.
+
+    The file is written next to ``filepath`` and renamed over it, so a failed
+    write leaves any existing file untouched and no partial file behind.
+    """
+    tmp = filepath.with_name(f".{filepath.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        yield tmp
+        os.replace(tmp, filepath)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
 
 
 @dataclass
@@ -39,63 +64,179 @@ class LsfFile:
         filepath = Path(filepath)
 
         with zipfile.ZipFile(filepath, "r") as zf:
-            # Read showfile.json
-            try:
+            return cls._from_zip(zf)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LsfFile":
+        """Load an LSF file from the bytes of the archive.
+
+        Args:
+            data: Contents of a .lsf file
+
+        Returns:
+            LsfFile instance with parsed showfile and settings data
+
+        Raises:
+            Same as :meth:`from_file`, except FileNotFoundError
+        """
+        with zipfile.ZipFile(io.BytesIO(data), "r") as zf:
+            return cls._from_zip(zf)
+
+    @classmethod
+    def _from_zip(cls, zf: zipfile.ZipFile) -> "LsfFile":
+        # Read showfile.json
+        try:
+            showfile_data = zf.read("showfile.json")
+            showfile_dict = json.loads(showfile_data.decode("utf-8"))
+            showfile = showfile_from_dict(showfile_dict)
+        except KeyError:
+            raise KeyError("showfile.json not found in LSF archive")
+
+        # Read settings.json
+        try:
+            settings_data = zf.read("settings.json")
+            settings_dict = json.loads(settings_data.decode("utf-8"))
+            settings = Settings.from_dict(settings_dict)
+        except KeyError:
+            raise KeyError("settings.json not found in LSF archive")
+
+        return cls(showfile=showfile, settings=settings)
+
+    @classmethod
+    def open(
+        cls,
+        filepath: Union[str, Path],
+        lazy: bool = False,
+        stream: bool = False,
+        pool: Optional[DedupePool] = None,
+    ) -> "LsfFile":
+        """Load an LSF file from disk, optionally deferring the show data.
+
+        With ``lazy=True`` showfile.json is read but not parsed. The show
+        name, software version and console model are scanned straight from the
+        raw JSON, and every other ``Play`` section (``patch``, ``cue_list``,
+        ``color_palettes``, ``memories``, ...) is decoded once, on first access.
+        ``showfile.play.materialized`` reports which sections have been decoded.
+
+        With ``stream=True`` showfile.json is decoded incrementally while it is
+        decompressed, without ever holding the whole document in memory, so
+        the peak memory of the load stays close to the size of the resulting
+        objects. ``benchmarks/bench_streaming.py`` measures both loads; on the
+        example show it found a peak RSS growth of 6.5 MiB with
+        :meth:`from_file` and 1.6 MiB streamed.
+
+        With a ``pool``, repeated strings in the show data are shared through
+        it, and ``pool.report()`` summarizes what was deduplicated.
+
+        Args:
+            filepath: Path to the .lsf file
+            lazy: Defer decoding of the show data until it is accessed
+            stream: Decode the show data incrementally from the archive
+            pool: Deduplicate repeated values through this pool
+
+        Returns:
+            LsfFile instance
+
+        Raises:
+            Same as :meth:`from_file`. In lazy mode, malformed show data is
+            only reported when the affected section is first accessed.
+            ValueError: If ``stream`` is combined with ``lazy`` or ``pool``
+        """
+        if stream and (lazy or pool is not None):
+            raise ValueError("stream cannot be combined with lazy or pool")
+        if not (lazy or stream or pool is not None):
+            return cls.from_file(filepath)
+
+        filepath = Path(filepath)
+
+        with zipfile.ZipFile(filepath, "r") as zf:
+            # Only a missing member is reported as such; a KeyError from
+            # decoding a malformed show propagates unchanged.
+            for name in ("showfile.json", "settings.json"):
+                try:
+                    zf.getinfo(name)
+                except KeyError:
+                    raise KeyError(f"{name} not found in LSF archive")
+
+            if stream:
+                with zf.open("showfile.json") as fp:
+                    showfile = showfile_from_stream(fp)
+            elif lazy:
+                showfile = ShowFile(LazyPlay(zf.read("showfile.json"), pool))
+            else:
                 showfile_data = zf.read("showfile.json")
                 showfile_dict = json.loads(showfile_data.decode("utf-8"))
-                showfile = showfile_from_dict(showfile_dict)
-            except KeyError:
-                raise KeyError("showfile.json not found in LSF archive")
-
-            # Read settings.json
-            try:
-                settings_data = zf.read("settings.json")
-                settings_dict = json.loads(settings_data.decode("utf-8"))
-                settings = Settings.from_dict(settings_dict)
-            except KeyError:
-                raise KeyError("settings.json not found in LSF archive")
+                showfile = fast_showfile_from_dict(showfile_dict, pool=pool)
+
+            settings_data = zf.read("settings.json")
+            settings_dict = json.loads(settings_data.decode("utf-8"))
+            settings = Settings.from_dict(settings_dict)
 
         return cls(showfile=showfile, settings=settings)
 
-    def to_file(self, filepath: Union[str, Path]) -> None:
+    def to_file(
+        self,
+        filepath: Union[str, Path],
+        indent: Optional[int] = 2,
+        compression: int = zipfile.ZIP_DEFLATED,
+        compresslevel: Optional[int] = None,
+    ) -> None:
         """Save the LSF file to disk.
 
+        The show data is encoded piece by piece straight into the archive
+        member, so the full JSON document is never held in memory. For fast
+        autosaves, ``indent=None`` writes compact JSON and
+        ``compression=zipfile.ZIP_STORED`` skips compression altogether; see
+        ``benchmarks/bench_save.py`` for the trade-off on the example show.
+        To save repeatedly while editing, :class:`.IncrementalSaver` only
+        re-encodes what changed.
+
         Args:
             filepath: Path where to save the .lsf file
+            indent: JSON indentation; ``None`` writes compact JSON
+            compression: ``zipfile.ZIP_DEFLATED`` or ``zipfile.ZIP_STORED``
+            compresslevel: Deflate level from 0 to 9, default 6
         """
         filepath = Path(filepath)
 
-        with zipfile.ZipFile(filepath, "w", zipfile.ZIP_DEFLATED) as zf:
+        with _replacing(filepath) as tmp, zipfile.ZipFile(
+            tmp, "w", compression, compresslevel=compresslevel
+        ) as zf:
             # Write showfile.json
-            showfile_dict = showfile_to_dict(self.showfile)
-            showfile_json = json.dumps(showfile_dict, indent=2).encode("utf-8")
-            zf.writestr("showfile.json", showfile_json)
+            with zf.open("showfile.json", "w") as fp:
+                write_json(fp, self.showfile, indent)
 
             # Write settings.json
             settings_dict = self.settings.to_dict()
-            settings_json = json.dumps(settings_dict, indent=2).encode("utf-8")
+            settings_json = json.dumps(
+                settings_dict, indent=indent, separators=separators(indent)
+            ).encode("utf-8")
             zf.writestr("settings.json", settings_json)
 
-    def extract_json_files(self, output_dir: Union[str, Path]) -> None:
+    def extract_json_files(
+        self, output_dir: Union[str, Path], indent: Optional[int] = 2
+    ) -> None:
         """Extract the JSON files to a directory for inspection.
 
         Args:
             output_dir: Directory where to extract the JSON files
+            indent: JSON indentation; ``None`` writes compact JSON
         """
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
         # Write showfile.json
-        showfile_dict = showfile_to_dict(self.showfile)
-        showfile_path = output_dir / "showfile.json"
-        with open(showfile_path, "w", encoding="utf-8") as f:
-            json.dump(showfile_dict, f, indent=2)
+        with _replacing(output_dir / "showfile.json") as tmp:
+            with open(tmp, "wb") as f:
+                write_json(f, self.showfile, indent)
 
         # Write settings.json
         settings_dict = self.settings.to_dict()
-        settings_path = output_dir / "settings.json"
-        with open(settings_path, "w", encoding="utf-8") as f:
-            json.dump(settings_dict, f, indent=2)
+        with _replacing(output_dir / "settings.json") as tmp:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(
+                    settings_dict, f, indent=indent, separators=separators(indent)
+                )
 
     @property
     def show_name(self) -> str:
@@ -0,0 +1,217 @@
+"""Resolution of the palette references of cue contents.
+
+An ``LtpParameter`` whose ``palette`` is 0 or more takes its value from
+palette number ``palette`` rather than from its own ``value``. The palettes
+are the ``Play.color_palettes``, ``beam_palettes`` and ``position_palettes``
+lists, which are only ordered by position. :class:`PaletteResolver` builds,
+the first time a palette is referenced, a :class:`PaletteTable` of it:
+
+- ``values``: ``(channel, parameter) -> (value, is16_bit)`` of the palette's
+  ``ltp_parameters``
+- ``colors``: ``channel -> Color`` of a color palette's ``colors``
+
+A reference resolves to the value of the first of the position, beam and
+color palettes with its number that holds its channel and parameter, or
+else to the ``Color`` of the color palette with its number that holds its
+channel. Resolving a cue is then one table lookup per reference; the result
+is also kept per content until a palette it references is invalidated.
+
+Tables are kept until :meth:`PaletteResolver.invalidate` is called with an
+edited palette, which drops that palette's tables and the cues that
+referenced its number, and nothing else.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from .showfile import Color, Content, LtpParameter, Palette, Play
+
+
+# Palette kinds in resolution order, each the prefix of a Play list
+KINDS = ("position", "beam", "color")
+
+
+@dataclass
+class PaletteTable:
+    """Lookup tables of one palette."""
+
+    palette: Palette
+    values: Dict[Tuple[int, int], Tuple[int, bool]]
+    colors: Dict[int, Color]
+
+    @classmethod
+    def from_palette(cls, palette: Palette) -> "PaletteTable":
+        values = {}
+        for p in palette.ltp_parameters:
+            if isinstance(p, dict):
+                values[p["channel"], p["parameter"]] = (p["value"], p["is16Bit"])
+            else:
+                values[p.channel, p.parameter] = (p.value, p.is16_bit)
+        colors = {c.channel: c for c in palette.colors or ()}
+        return cls(palette, values, colors)
+
+
+@dataclass
+class Resolution:
+    """The palette references of one cue content, resolved.
+
+    Attributes:
+        ltp_parameters: The content's LTP parameters, those referencing a
+            palette value with that value
+        colors: ``Color`` by channel of references to color palettes
+        missing: References to palettes or entries that do not exist
+    """
+
+    ltp_parameters: List[LtpParameter]
+    colors: Dict[int, Color] = field(default_factory=dict)
+    missing: List[LtpParameter] = field(default_factory=list)
+
+
+class PaletteResolver:
+    """Resolves palette references against the palettes of a show.
+
+    The resolver keeps a reference to every palette and content it has
+    resolved. After editing a palette in place, or adding, removing or
+    renumbering one, call :meth:`invalidate` with it; after replacing the
+    palette lists, call :meth:`clear`.
+
+    Args:
+        play: The show whose palettes are referenced
+
+    Attributes:
+        builds: Palette tables built, over the resolver's life
+    """
+
+    def __init__(self, play: Play) -> None:
+        self.play = play
+        self.builds = 0
+        # kind -> palette number -> palette
+        self._numbers: Dict[str, Dict[int, Palette]] = {}
+        self._tables: Dict[Tuple[str, int], PaletteTable] = {}
+        # id(content) -> (content, palette numbers referenced, resolution)
+        self._resolved: Dict[int, Tuple[Content, Set[int], Resolution]] = {}
+        # id(content) -> (content, content with resolved LTP parameters)
+        self._applied: Dict[int, Tuple[Content, Content]] = {}
+
+    def clear(self) -> None:
+        self._numbers.clear()
+        self._tables.clear()
+        self._resolved.clear()
+        self._applied.clear()
+
+    def palettes(self, kind: str) -> List[Palette]:
+        """The ``Play`` list of palettes of ``kind``, one of :data:`KINDS`."""
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {KINDS}")
+        return getattr(self.play, f"{kind}_palettes")
+
+    def palette(self, kind: str, number: int) -> Optional[Palette]:
+        """The palette of ``kind`` with ``number``, or ``None``."""
+        numbers = self._numbers.get(kind)
+        if numbers is None:
+            numbers = self._numbers[kind] = {}
+            for palette in self.palettes(kind):
+                numbers.setdefault(palette.palette, palette)
+        return numbers.get(number)
+
+    def table(self, kind: str, number: int) -> Optional[PaletteTable]:
+        """The tables of the palette of ``kind`` with ``number``, or ``None``."""
+        table = self._tables.get((kind, number))
+        if table is None:
+            palette = self.palette(kind, number)
+            if palette is None:
+                return None
+            table = self._tables[kind, number] = PaletteTable.from_palette(palette)
+            self.builds += 1
+        return table
+
+    def invalidate(self, palette: Palette) -> None:
+        """Drop everything derived from ``palette``, which was edited.
+
+        The palette may be new, removed from its list or renumbered; its
+        tables under both its old and its current number are dropped.
+        """
+        kind = next(
+            (k for k in KINDS if any(p is palette for p in self.palettes(k))),
+            None,
+        )
+        numbers = {palette.palette}
+        for (table_kind, number), table in list(self._tables.items()):
+            if table.palette is palette:
+                kind = kind or table_kind
+                numbers.add(number)
+                del self._tables[table_kind, number]
+        if kind is None:
+            self._numbers.clear()
+            return
+        for number in numbers:
+            self._tables.pop((kind, number), None)
+        self._numbers.pop(kind, None)
+        for key, (_, referenced, _) in list(self._resolved.items()):
+            if referenced & numbers:
+                del self._resolved[key]
+                self._applied.pop(key, None)
+
+    def resolve(self, content: Content) -> Resolution:
+        """Resolve every palette reference of ``content``.
+
+        A content without references resolves to its own LTP parameters.
+        """
+        entry = self._resolved.get(id(content))
+        if entry is not None and entry[0] is content:
+            return entry[2]
+        references: Dict[int, List[int]] = {}
+        for i, p in enumerate(content.ltp_parameters):
+            if p.palette >= 0:
+                references.setdefault(p.palette, []).append(i)
+        resolution = Resolution(content.ltp_parameters)
+        if references:
+            resolution.ltp_parameters = list(content.ltp_parameters)
+            for number, indices in references.items():
+                self._resolve_palette(number, indices, resolution)
+        self._resolved[id(content)] = (content, set(references), resolution)
+        return resolution
+
+    def _resolve_palette(
+        self, number: int, indices: List[int], resolution: Resolution
+    ) -> None:
+        tables = [self.table(kind, number) for kind in KINDS]
+        parameters = resolution.ltp_parameters
+        for i in indices:
+            p = parameters[i]
+            key = (p.channel, p.parameter)
+            for table in tables:
+                if table is not None and key in table.values:
+                    value, is16_bit = table.values[key]
+                    parameters[i] = LtpParameter(
+                        p.channel, is16_bit, p.palette, p.parameter, value
+                    )
+                    break
+            else:
+                color = tables[-1].colors.get(p.channel) if tables[-1] else None
+                if color is not None:
+                    resolution.colors[p.channel] = color
+                else:
+                    resolution.missing.append(p)
+
+    def apply(self, content: Content) -> Content:
+        """``content`` with its LTP parameters resolved, e.g. for rendering.
+
+        The result is kept like the resolution, so caches keyed by content
+        identity, as :class:`.Playback`'s, keep working; a content without
+        references is returned itself.
+        """
+        entry = self._applied.get(id(content))
+        if entry is not None and entry[0] is content:
+            return entry[1]
+        resolution = self.resolve(content)
+        applied = content
+        if resolution.ltp_parameters is not content.ltp_parameters:
+            applied = Content(
+                content.assigned_ranges,
+                content.include_flags,
+                content.levels,
+                resolution.ltp_parameters,
+            )
+        self._applied[id(content)] = (content, applied)
+        return applied
@@ -20,18 +20,10 @@ def from_str(x: Any) -> str:
     return x
 
 
-def from_none(x: Any) -> Any:
-    assert x is None
-    return x
-
-
-def from_union(fs, x):
-    for f in fs:
-        try:
-            return f(x)
-        except Exception:
-            pass
-    assert False
+def from_optional(f: Callable[[Any], T], x: Any) -> Optional[T]:
+    if x is None:
+        return None
+    return f(x)
 
 
 def to_class(c: Type[T], x: Any) -> dict:
@@ -97,8 +89,8 @@ class Palette:
         ltp_parameters = from_list(lambda x: x, obj.get("ltpParameters"))
         palette = from_int(obj.get("palette"))
         text = from_str(obj.get("text"))
-        colors = from_union(
-            [lambda x: from_list(Color.from_dict, x), from_none], obj.get("colors")
+        colors = from_optional(
+            lambda x: from_list(Color.from_dict, x), obj.get("colors")
         )
         return Palette(display_color, ltp_parameters, palette, text, colors)
 
@@ -109,10 +101,7 @@ class Palette:
         result["palette"] = from_int(self.palette)
         result["text"] = from_str(self.text)
         if self.colors is not None:
-            result["colors"] = from_union(
-                [lambda x: from_list(lambda x: to_class(Color, x), x), from_none],
-                self.colors,
-            )
+            result["colors"] = from_list(lambda x: to_class(Color, x), self.colors)
         return result
 
 
@@ -530,12 +519,11 @@ class PersonalityParameter:
         size = from_int(obj.get("size"))
         snap = from_bool(obj.get("snap"))
         type = from_int(obj.get("type"))
-        ranges = from_union(
-            [lambda x: from_list(Range.from_dict, x), from_none], obj.get("ranges")
+        ranges = from_optional(
+            lambda x: from_list(Range.from_dict, x), obj.get("ranges")
         )
-        emitter_definition = from_union(
-            [lambda x: from_list(from_float, x), from_none],
-            obj.get("emitterDefinition"),
+        emitter_definition = from_optional(
+            lambda x: from_list(from_float, x), obj.get("emitterDefinition")
         )
         return PersonalityParameter(
             coarse,
@@ -563,14 +551,9 @@ class PersonalityParameter:
         result["snap"] = from_bool(self.snap)
         result["type"] = from_int(self.type)
         if self.ranges is not None:
-            result["ranges"] = from_union(
-                [lambda x: from_list(lambda x: to_class(Range, x), x), from_none],
-                self.ranges,
-            )
+            result["ranges"] = from_list(lambda x: to_class(Range, x), self.ranges)
         if self.emitter_definition is not None:
-            result["emitterDefinition"] = from_union(
-                [lambda x: from_list(to_float, x), from_none], self.emitter_definition
-            )
+            result["emitterDefinition"] = from_list(to_float, self.emitter_definition)
         return result
 
 
@@ -0,0 +1,190 @@
+"""Incremental decoding of showfile.json from a file-like object.
+
+``json.loads`` needs the whole document in memory as ``bytes``, then ``str``,
+then a dict tree, all alive at once next to the resulting dataclasses. The
+pull parser here reads the document in chunks and walks the container objects
+(``ShowFile``, ``Play``, ``CueList``, ``Patch``) key by key. Every element of
+a list of dataclasses (each ``Step``, ``Device``, ``Palette``, ...) is parsed
+on its own and converted immediately, so only one element's dict is alive at
+any time and consumed text is dropped from the buffer as the parser advances.
+"""
+
+import dataclasses
+import io
+import json
+import re
+from typing import Any, BinaryIO, Callable, Dict, Tuple
+
+from .decoder import _list_arg, compile_decoder, json_key
+from .showfile import ShowFile
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+class _Reader:
+    """A window over a text stream that parses one JSON value at a time."""
+
+    def __init__(self, fp: io.TextIOBase, chunk_size: int) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._eof = False
+        self.buf = ""
+        self.pos = 0
+
+    def _fill(self, size: int) -> bool:
+        chunk = self._fp.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop the consumed prefix so the buffer only holds unparsed text.
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or '' at the end."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def separator(self, close: str) -> bool:
+        """Consume ',' or ``close``. Returns True when the container ended."""
+        char = self.peek()
+        if char == close:
+            self.pos += 1
+            return True
+        self.expect(",")
+        return False
+
+    def value(self) -> Any:
+        """Parse the next complete JSON value."""
+        self.peek()
+        while True:
+            pending = len(self.buf) - self.pos
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Incomplete value: grow the window geometrically and retry.
+                if self._fill(max(self._chunk_size, pending)):
+                    continue
+                raise
+            # A number at the very end of the window may continue in the
+            # next chunk.
+            if end == len(self.buf) and not self._eof:
+                if self._fill(self._chunk_size):
+                    continue
+            self.pos = end
+            return value
+
+
+_Read = Callable[[_Reader], Any]
+
+
+def _read_array(reader: _Reader, decode: Callable[[Any], Any]) -> list:
+    items: list = []
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return items
+    while True:
+        items.append(decode(reader.value()))
+        if reader.separator("]"):
+            return items
+
+
+def _reader_for(tp: Any, strict: bool) -> _Read:
+    if dataclasses.is_dataclass(tp):
+        return lambda reader: _read_object(reader, tp, strict)
+    item = _list_arg(tp)
+    if dataclasses.is_dataclass(item):
+        decode_item = compile_decoder(item, strict)
+        return lambda reader: _read_array(reader, decode_item)
+    decode = compile_decoder(tp, strict)
+    return lambda reader: decode(reader.value())
+
+
+_FIELD_READERS: Dict[Tuple[type, bool], Dict[str, Tuple[str, _Read]]] = {}
+
+
+def _field_readers(cls: type, strict: bool) -> Dict[str, Tuple[str, _Read]]:
+    readers = _FIELD_READERS.get((cls, strict))
+    if readers is None:
+        readers = {
+            json_key(cls, f.name): (f.name, _reader_for(f.type, strict))
+            for f in dataclasses.fields(cls)
+        }
+        _FIELD_READERS[(cls, strict)] = readers
+    return readers
+
+
+def _read_object(reader: _Reader, cls: type, strict: bool) -> Any:
+    readers = _field_readers(cls, strict)
+    kwargs: Dict[str, Any] = {}
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            entry = readers.get(key)
+            if entry is None:
+                reader.value()
+            else:
+                name, read = entry
+                kwargs[name] = read(reader)
+            if reader.separator("}"):
+                break
+    for key, (name, _) in readers.items():
+        if name not in kwargs and _required(cls, name):
+            raise KeyError(key)
+    return cls(**kwargs)
+
+
+def _required(cls: type, name: str) -> bool:
+    field = cls.__dataclass_fields__[name]  # type: ignore[attr-defined]
+    return (
+        field.default is dataclasses.MISSING
+        and field.default_factory is dataclasses.MISSING
+    )
+
+
+def showfile_from_stream(
+    fp: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE, strict: bool = False
+) -> ShowFile:
+    """Decode a ShowFile from a binary stream of UTF-8 showfile.json.
+
+    Args:
+        fp: Binary file object, e.g. from ``zipfile.ZipFile.open``
+        chunk_size: Number of characters read from ``fp`` at a time
+        strict: Validate values like :func:`showfile_from_dict`
+
+    Returns:
+        The decoded ShowFile, equal to ``showfile_from_dict(json.load(fp))``
+
+    Raises:
+        json.JSONDecodeError: If the JSON is malformed
+        KeyError: If a required key is missing
+    """
+    text = io.TextIOWrapper(fp, encoding="utf-8")
+    try:
+        reader = _Reader(text, chunk_size)
+        showfile = _read_object(reader, ShowFile, strict)
+        if reader.peek() != "":
+            raise json.JSONDecodeError("Extra data", reader.buf, reader.pos)
+        return showfile
+    finally:
+        # Leave closing to the owner of fp.
+        text.detach()
@@ -0,0 +1,15 @@
+__all__ = [
+    "ColorMixer",
+    "ConflictReport",
+    "DIMMER_DCID",
+    "EmitterModel",
+    "PatchIndex",
+    "SlotInfo",
+    "emitter_model",
+    "find_conflicts",
+    "patch_conflicts",
+]
+
+from .color import ColorMixer, EmitterModel, emitter_model
+from .conflicts import DIMMER_DCID, ConflictReport, find_conflicts, patch_conflicts
+from .index import PatchIndex, SlotInfo
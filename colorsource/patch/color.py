@@ -0,0 +1,295 @@
+"""Emitter color mixing.
+
+The color parameters of a personality (``type`` 5) carry an
+``emitter_definition``: the CIE XYZ tristimulus of that emitter at full. An
+:class:`EmitterModel` stacks them into a 3 x E matrix, one column per color
+parameter in personality order (the order of ``Level.colors`` and
+``Color.emitters``), and maps it to linear sRGB, scaled so that every emitter
+at full displays as white. Displayed RGB is then ``A @ emitters`` and the
+emitter levels for a wanted RGB are ``pinv(A) @ rgb``, clipped to the range
+the fixture can produce. A color parameter without a definition (e.g. the
+Magenta flag of a CMY fixture) contributes nothing.
+
+Models are cached per personality dcid, colortable and definitions.
+:class:`ColorMixer` resolves the model of every channel of a patch once and
+converts a whole palette or cue at a time, one matrix product per
+personality when NumPy is installed.
+
+All values are 0-255. RGB values are linear, not gamma encoded.
+"""
+
+import functools
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..formats.showfile import Content, Palette, Patch, Personality
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+COLOR = 5
+
+# CIE XYZ to linear sRGB (D65)
+XYZ_TO_RGB = (
+    (3.2404542, -1.5371385, -0.4985314),
+    (-0.9692660, 1.8760108, 0.0415560),
+    (0.0556434, -0.2040259, 1.0572252),
+)
+
+_Matrix = Tuple[Tuple[float, ...], ...]
+_RGB = Tuple[int, int, int]
+
+
+def _matmul(a: _Matrix, b: _Matrix) -> _Matrix:
+    return tuple(
+        tuple(sum(x * y for x, y in zip(row, col)) for col in zip(*b)) for row in a
+    )
+
+
+def _transpose(a: _Matrix) -> _Matrix:
+    return tuple(zip(*a))
+
+
+def _inverse(m: _Matrix) -> _Matrix:
+    """Gauss-Jordan inverse of a small square matrix."""
+    n = len(m)
+    rows = [list(row) + [float(i == j) for j in range(n)] for i, row in enumerate(m)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        if abs(rows[pivot][col]) < 1e-12:
+            raise ValueError("singular emitter matrix")
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        scale = rows[col][col]
+        rows[col] = [v / scale for v in rows[col]]
+        for r in range(n):
+            if r != col and rows[r][col]:
+                factor = rows[r][col]
+                rows[r] = [v - factor * p for v, p in zip(rows[r], rows[col])]
+    return tuple(tuple(row[n:]) for row in rows)
+
+
+def _independent(columns: Sequence[Sequence[float]]) -> List[int]:
+    """Indices of a maximal linearly independent subset of ``columns``."""
+    scale = max((sum(v * v for v in col) for col in columns), default=0.0)
+    basis: List[List[float]] = []
+    chosen = []
+    for i, col in enumerate(columns):
+        # Gram-Schmidt: what is left of the column outside the basis so far
+        rest = list(col)
+        for q in basis:
+            dot = sum(x * y for x, y in zip(rest, q))
+            rest = [x - dot * y for x, y in zip(rest, q)]
+        norm = sum(v * v for v in rest)
+        if norm > 1e-18 * scale:
+            basis.append([v / norm**0.5 for v in rest])
+            chosen.append(i)
+    return chosen
+
+
+def _pinv(a: _Matrix) -> _Matrix:
+    """Pseudo-inverse of a 3 x E matrix, skipping all-zero columns.
+
+    Emitters whose colors are linear combinations of others, e.g. two
+    identical emitters, make the matrix rank deficient. Least squares then
+    uses a maximal independent subset of them and leaves the rest at 0.
+    """
+    columns = _transpose(a)
+    used = [i for i, col in enumerate(columns) if any(col)]
+    independent = _independent([columns[i] for i in used])
+    if len(independent) < 3 or len(used) <= 3:
+        used = [used[i] for i in independent]
+    if not used:
+        return tuple((0.0, 0.0, 0.0) for _ in columns)
+    b = _transpose(tuple(columns[i] for i in used))
+    bt = _transpose(b)
+    if len(used) <= 3:
+        # Least squares: (B^T B)^-1 B^T
+        partial = _matmul(_inverse(_matmul(bt, b)), bt)
+    else:
+        # Minimum norm: B^T (B B^T)^-1
+        partial = _matmul(bt, _inverse(_matmul(b, bt)))
+    rows = dict(zip(used, partial))
+    return tuple(rows.get(i, (0.0, 0.0, 0.0)) for i in range(len(columns)))
+
+
+def _byte(value: float) -> int:
+    return min(max(round(value * 255), 0), 255)
+
+
+@dataclass(frozen=True)
+class EmitterModel:
+    """Color mixing of one personality.
+
+    Attributes:
+        names: Names of the color parameters, one per emitter
+        xyz: 3 x E matrix of the emitter definitions
+        forward: 3 x E matrix from emitter levels to RGB, both 0.0 to 1.0
+        inverse: E x 3 pseudo-inverse of ``forward``
+    """
+
+    names: Tuple[str, ...]
+    xyz: _Matrix
+    forward: _Matrix
+    inverse: _Matrix
+
+    @property
+    def emitters(self) -> int:
+        return len(self.names)
+
+    def rgb(self, levels: Sequence[int]) -> _RGB:
+        """Displayed RGB of emitter ``levels``; missing levels count as 0."""
+        levels = list(levels[: self.emitters])
+        levels += [0] * (self.emitters - len(levels))
+        r, g, b = (
+            sum(a * x for a, x in zip(row, levels)) / 255 for row in self.forward
+        )
+        return _byte(r), _byte(g), _byte(b)
+
+    def levels(self, rgb: Sequence[int]) -> Tuple[int, ...]:
+        """Emitter levels that best display ``rgb``."""
+        return tuple(
+            _byte(sum(a * x for a, x in zip(row, rgb)) / 255) for row in self.inverse
+        )
+
+    def rgb_many(self, levels: Sequence[Sequence[int]]) -> List[_RGB]:
+        """:meth:`rgb` of many rows of levels at once."""
+        if np is None or not len(levels):
+            return [self.rgb(row) for row in levels]
+        rows = _rows(levels, self.emitters)
+        out = rows @ (np.asarray(self.forward).T / 255)
+        return [tuple(row) for row in _bytes(out).tolist()]
+
+    def levels_many(self, rgb: Sequence[Sequence[int]]) -> List[Tuple[int, ...]]:
+        """:meth:`levels` of many RGB values at once."""
+        if np is None or not len(rgb):
+            return [self.levels(row) for row in rgb]
+        out = _rows(rgb, 3) @ (np.asarray(self.inverse).T / 255)
+        return [tuple(row) for row in _bytes(out).tolist()]
+
+
+def _rows(values: Sequence[Sequence[int]], width: int) -> "np.ndarray":
+    """``values`` as a matrix of ``width`` columns, cut or padded with 0."""
+    try:
+        rows = np.asarray(values, dtype=np.float64)
+    except ValueError:
+        rows = None  # rows of different lengths
+    if rows is None or rows.ndim != 2:
+        rows = np.zeros((len(values), width), dtype=np.float64)
+        for i, row in enumerate(values):
+            row = row[:width]
+            rows[i, : len(row)] = row
+        return rows
+    if rows.shape[1] >= width:
+        return rows[:, :width]
+    return np.pad(rows, ((0, 0), (0, width - rows.shape[1])))
+
+
+def _bytes(values: "np.ndarray") -> "np.ndarray":
+    return np.clip(np.rint(values * 255), 0, 255).astype(np.uint8)
+
+
+def emitter_model(personality: Personality) -> Optional[EmitterModel]:
+    """The color mixing of ``personality``, or ``None`` without emitters."""
+    params = [p for p in personality.parameters if p.type == COLOR]
+    definitions = tuple(
+        tuple(p.emitter_definition) if p.emitter_definition else (0.0, 0.0, 0.0)
+        for p in params
+    )
+    if not any(any(d) for d in definitions):
+        return None
+    return _model(
+        personality.dcid,
+        personality.colortable,
+        tuple(p.name for p in params),
+        definitions,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _model(
+    dcid: str,
+    colortable: str,
+    names: Tuple[str, ...],
+    definitions: Tuple[Tuple[float, ...], ...],
+) -> EmitterModel:
+    xyz = _transpose(definitions)
+    rgb = _matmul(XYZ_TO_RGB, xyz)
+    # Scale each primary so that all emitters at full display white.
+    white = [sum(row) for row in rgb]
+    forward = tuple(
+        tuple(v / w if w > 0 else 0.0 for v in row) for row, w in zip(rgb, white)
+    )
+    return EmitterModel(names, xyz, forward, _pinv(forward))
+
+
+class ColorMixer:
+    """Displayed colors of the channels of a patch.
+
+    Each channel takes the model of the first device on it that has one;
+    channels without emitters (dimmers) are left out of every result.
+    """
+
+    def __init__(self, patch: Patch) -> None:
+        personalities = {p.dcid: p for p in patch.personalities}
+        self.models: Dict[int, EmitterModel] = {}
+        for device in patch.devices:
+            personality = personalities.get(device.personality_dcid)
+            if device.channel in self.models or personality is None:
+                continue
+            model = emitter_model(personality)
+            if model is not None:
+                self.models[device.channel] = model
+
+    def _grouped(
+        self, rows: Dict[int, Sequence[int]]
+    ) -> Dict[EmitterModel, Tuple[List[int], List[Sequence[int]]]]:
+        groups: Dict[EmitterModel, Tuple[List[int], List[Sequence[int]]]] = {}
+        for channel, row in rows.items():
+            model = self.models.get(channel)
+            if model is not None:
+                channels, values = groups.setdefault(model, ([], []))
+                channels.append(channel)
+                values.append(row)
+        return groups
+
+    def rgb(self, levels: Dict[int, Sequence[int]]) -> Dict[int, _RGB]:
+        """Displayed RGB for emitter levels by channel."""
+        result: Dict[int, _RGB] = {}
+        for model, (channels, rows) in self._grouped(levels).items():
+            result.update(zip(channels, model.rgb_many(rows)))
+        return result
+
+    def levels(self, rgb: Dict[int, Sequence[int]]) -> Dict[int, Tuple[int, ...]]:
+        """Emitter levels by channel that best display the wanted RGB."""
+        result: Dict[int, Tuple[int, ...]] = {}
+        for model, (channels, rows) in self._grouped(rgb).items():
+            result.update(zip(channels, model.levels_many(rows)))
+        return result
+
+    def palette_rgb(self, palette: Palette) -> Dict[int, _RGB]:
+        """Displayed RGB of the ``Color.emitters`` of a color palette."""
+        return self.rgb({c.channel: c.emitters for c in palette.colors or ()})
+
+    def palette_levels(self, palette: Palette) -> Dict[int, Tuple[int, ...]]:
+        """Emitter levels for the ``Color.r/g/b`` of a color palette."""
+        return self.levels({c.channel: (c.r, c.g, c.b) for c in palette.colors or ()})
+
+    def content_rgb(self, content: Content, intensity: bool = True) -> Dict[int, _RGB]:
+        """Displayed RGB of the ``Level.colors`` of a cue or memory.
+
+        With ``intensity`` the colors are scaled by ``Level.level``.
+        """
+        levels = {lv.channel: lv for lv in content.levels if lv.colors}
+        result = self.rgb({c: lv.colors for c, lv in levels.items()})
+        if intensity:
+            for channel, (r, g, b) in result.items():
+                level = levels[channel].level
+                result[channel] = (
+                    r * level // 255,
+                    g * level // 255,
+                    b * level // 255,
+                )
+        return result
@@ -0,0 +1,177 @@
+"""Patch conflict analysis.
+
+:func:`find_conflicts` checks a list of devices, e.g. the union of several
+shows' patches, for:
+
+- DMX ranges ``dmx`` to ``dmx + footprint - 1`` that overlap within a universe
+- ranges that run past the end of their universe
+- channels shared by more than one device
+- devices whose ``personality_dcid`` matches no personality
+
+Overlaps are found with a sweep over the devices of each universe sorted by
+start address, keeping the ranges still open in a heap ordered by end
+address, so the analysis takes O(n log n) plus the number of overlapping
+pairs reported.
+"""
+
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..dmx.render import UNIVERSE_SIZE
+from ..formats.showfile import Device, Patch, Personality
+
+
+# personality_dcid of a dimmer, which has no Personality entry
+DIMMER_DCID = "00000000-0000-0000-0000-000000000000"
+
+
+@dataclass(frozen=True)
+class AddressOverlap:
+    """Two devices sharing the slots ``start`` to ``end`` of ``space``."""
+
+    space: int
+    start: int
+    end: int
+    first: Device
+    second: Device
+
+
+@dataclass(frozen=True)
+class AddressOutOfRange:
+    """A device whose range ends at ``end``, past the end of its universe."""
+
+    device: Device
+    end: int
+
+
+@dataclass(frozen=True)
+class DuplicateChannel:
+    """Devices sharing one channel, in input order."""
+
+    channel: int
+    devices: Tuple[Device, ...]
+
+
+@dataclass(frozen=True)
+class MissingPersonality:
+    """A device whose personality is not in the patch."""
+
+    device: Device
+    dcid: str
+
+
+@dataclass
+class ConflictReport:
+    """All conflicts found in a patch. Empty lists mean no conflict."""
+
+    overlaps: List[AddressOverlap] = field(default_factory=list)
+    out_of_range: List[AddressOutOfRange] = field(default_factory=list)
+    duplicate_channels: List[DuplicateChannel] = field(default_factory=list)
+    missing_personalities: List[MissingPersonality] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.overlaps
+            or self.out_of_range
+            or self.duplicate_channels
+            or self.missing_personalities
+        )
+
+    def to_dict(self) -> dict:
+        """Summarize the report as JSON-compatible data, by device id."""
+        return {
+            "overlaps": [
+                {
+                    "space": o.space,
+                    "start": o.start,
+                    "end": o.end,
+                    "devices": [o.first.device_id, o.second.device_id],
+                }
+                for o in self.overlaps
+            ],
+            "outOfRange": [
+                {"device": o.device.device_id, "end": o.end} for o in self.out_of_range
+            ],
+            "duplicateChannels": [
+                {"channel": d.channel, "devices": [x.device_id for x in d.devices]}
+                for d in self.duplicate_channels
+            ],
+            "missingPersonalities": [
+                {"device": m.device.device_id, "dcid": m.dcid}
+                for m in self.missing_personalities
+            ],
+        }
+
+
+def find_overlaps(devices: Iterable[Device]) -> List[AddressOverlap]:
+    """Every pair of patched devices whose DMX ranges overlap.
+
+    Pairs are ordered by universe, then by the start of the later device.
+    """
+    universes: Dict[int, List[Tuple[int, int, int, Device]]] = defaultdict(list)
+    for i, device in enumerate(devices):
+        if device.dmx > 0:
+            end = device.dmx + max(device.footprint, 1) - 1
+            universes[device.space].append((device.dmx, end, i, device))
+
+    overlaps = []
+    for space in sorted(universes):
+        ranges = universes[space]
+        ranges.sort(key=lambda r: (r[0], r[2]))
+        active: List[Tuple[int, int, Device]] = []  # (end, order, device)
+        for start, end, i, device in ranges:
+            while active and active[0][0] < start:
+                heapq.heappop(active)
+            for other_end, _, other in sorted(active, key=lambda a: a[1]):
+                overlaps.append(
+                    AddressOverlap(space, start, min(end, other_end), other, device)
+                )
+            heapq.heappush(active, (end, i, device))
+    return overlaps
+
+
+def find_conflicts(
+    devices: Iterable[Device],
+    personalities: Optional[Iterable[Personality]] = None,
+) -> ConflictReport:
+    """Analyze devices for address, channel and personality conflicts.
+
+    Args:
+        devices: The devices to check, e.g. ``patch.devices``
+        personalities: Known personalities. When omitted, the personality
+            check is skipped.
+
+    Returns:
+        The conflicts. Overlaps are ordered as in :func:`find_overlaps`, the
+        other lists by the input order of the devices involved.
+    """
+    devices = list(devices)
+    report = ConflictReport(overlaps=find_overlaps(devices))
+
+    channels: Dict[int, List[Device]] = defaultdict(list)
+    for device in devices:
+        channels[device.channel].append(device)
+        end = device.dmx + max(device.footprint, 1) - 1
+        if device.dmx > 0 and end > UNIVERSE_SIZE:
+            report.out_of_range.append(AddressOutOfRange(device, end))
+    report.duplicate_channels = [
+        DuplicateChannel(channel, tuple(shared))
+        for channel, shared in channels.items()
+        if len(shared) > 1
+    ]
+
+    if personalities is not None:
+        known = {p.dcid for p in personalities} | {DIMMER_DCID}
+        report.missing_personalities = [
+            MissingPersonality(device, device.personality_dcid)
+            for device in devices
+            if device.personality_dcid not in known
+        ]
+    return report
+
+
+def patch_conflicts(patch: Patch) -> ConflictReport:
+    """Analyze a patch against its own personalities."""
+    return find_conflicts(patch.devices, patch.personalities)
@@ -0,0 +1,256 @@
+"""Lookup tables over a patch.
+
+``Patch`` keeps its devices, personalities and topology as plain lists.
+:class:`PatchIndex` builds the lookups needed to use them once:
+
+- channel -> devices on that channel, in patch order
+- device id -> ``Device`` and -> ``Topo``
+- dcid -> ``Personality``
+- per universe, the patched address ranges sorted by start address, so that
+  the device and parameter behind a DMX slot are found by bisection
+
+Devices added, removed or re-addressed through the index's mutation methods
+update both the patch and the affected lookups; changes made to the patch
+directly are only seen after :meth:`PatchIndex.rebuild`.
+"""
+
+import bisect
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..formats.showfile import Device, Patch, Personality, PersonalityParameter, Topo
+
+
+@dataclass(frozen=True)
+class SlotInfo:
+    """What drives one DMX slot.
+
+    Attributes:
+        device: The device patched over the slot
+        offset: Position of the slot in the device's footprint, from 0
+        parameter: The personality parameter of the slot, ``None`` for the
+            slot of a dimmer or a slot the personality does not describe
+        fine: Whether the slot is the fine byte of a 16-bit parameter
+    """
+
+    device: Device
+    offset: int
+    parameter: Optional[PersonalityParameter] = None
+    fine: bool = False
+
+
+class _Universe:
+    """The patched address ranges of one universe, sorted by start."""
+
+    def __init__(self) -> None:
+        self.keys: List[Tuple[int, int]] = []  # (start, device id)
+        self.devices: List[Device] = []
+        self.max_footprint = 1
+
+    def add(self, device: Device) -> None:
+        key = (device.dmx, device.device_id)
+        i = bisect.bisect_left(self.keys, key)
+        self.keys.insert(i, key)
+        self.devices.insert(i, device)
+        self.max_footprint = max(self.max_footprint, device.footprint, 1)
+
+    def remove(self, device: Device) -> None:
+        i = bisect.bisect_left(self.keys, (device.dmx, device.device_id))
+        del self.keys[i]
+        del self.devices[i]
+
+    def covering(self, address: int) -> Iterator[Device]:
+        """Devices whose footprint contains ``address``, by start address."""
+        stop = bisect.bisect_right(self.keys, (address, float("inf")))
+        # A range starting more than max_footprint slots back cannot reach.
+        start = bisect.bisect_left(self.keys, (address - self.max_footprint + 1,))
+        for device in self.devices[start:stop]:
+            if address < device.dmx + max(device.footprint, 1):
+                yield device
+
+
+class PatchIndex:
+    """Indexes over ``patch``, kept up to date by the mutation methods."""
+
+    def __init__(self, patch: Patch) -> None:
+        self.patch = patch
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Rebuild every index from the patch."""
+        self._personalities: Dict[str, Personality] = {}
+        self._slots: Dict[str, Dict[int, Tuple[PersonalityParameter, bool]]] = {}
+        for personality in self.patch.personalities:
+            self._add_personality(personality)
+        self._devices: Dict[int, Device] = {}
+        self._order: Dict[int, int] = {}
+        self._next_order = 0
+        self._channels: Dict[int, List[Device]] = {}
+        self._universes: Dict[int, _Universe] = {}
+        for device in self.patch.devices:
+            self._add_device(device)
+        self._topo: Dict[int, Topo] = {
+            topo.device_id: topo for topo in self.patch.topo if topo.device_id >= 0
+        }
+
+    # Lookups
+
+    def device(self, device_id: int) -> Optional[Device]:
+        return self._devices.get(device_id)
+
+    def devices_on(self, channel: int) -> List[Device]:
+        """The devices on ``channel``, in patch order."""
+        return list(self._channels.get(channel, ()))
+
+    def personality(self, dcid: str) -> Optional[Personality]:
+        return self._personalities.get(dcid)
+
+    def personality_of(self, device: Device) -> Optional[Personality]:
+        """The personality of ``device``; ``None`` for a dimmer."""
+        return self._personalities.get(device.personality_dcid)
+
+    def topo(self, device_id: int) -> Optional[Topo]:
+        return self._topo.get(device_id)
+
+    def slots_at(self, space: int, address: int) -> List[SlotInfo]:
+        """Everything patched over DMX ``address`` (1-512) of universe ``space``.
+
+        More than one entry means overlapping devices.
+        """
+        universe = self._universes.get(space)
+        if universe is None:
+            return []
+        return [self._slot(d, address - d.dmx) for d in universe.covering(address)]
+
+    def slot_at(self, space: int, address: int) -> Optional[SlotInfo]:
+        """The first device patched over ``address``, or ``None`` if free."""
+        slots = self.slots_at(space, address)
+        return slots[0] if slots else None
+
+    def universes(self) -> List[int]:
+        return sorted(s for s, u in self._universes.items() if u.devices)
+
+    def devices_in(self, space: int) -> List[Device]:
+        """The patched devices of universe ``space``, by start address."""
+        universe = self._universes.get(space)
+        return list(universe.devices) if universe is not None else []
+
+    def _slot(self, device: Device, offset: int) -> SlotInfo:
+        entry = self._slots.get(device.personality_dcid, {}).get(offset)
+        if entry is None:
+            return SlotInfo(device, offset)
+        return SlotInfo(device, offset, entry[0], entry[1])
+
+    # Mutations
+
+    def add_device(self, device: Device) -> None:
+        """Append ``device`` to the patch.
+
+        Raises:
+            ValueError: If a device with the same ``device_id`` exists
+        """
+        if device.device_id in self._devices:
+            raise ValueError(f"device {device.device_id} is already patched")
+        self.patch.devices.append(device)
+        self._add_device(device)
+
+    def remove_device(self, device_id: int) -> Device:
+        """Remove a device and its topology entry from the patch.
+
+        Raises:
+            KeyError: If there is no such device
+        """
+        device = self._devices[device_id]
+        self._remove_device(device)
+        self.patch.devices.remove(device)
+        topo = self._topo.pop(device_id, None)
+        if topo is not None:
+            self.patch.topo.remove(topo)
+        return device
+
+    def readdress(
+        self, device_id: int, dmx: int, space: Optional[int] = None
+    ) -> Device:
+        """Move a device to start address ``dmx``, optionally in another universe.
+
+        An address of 0 or less unpatches the device from DMX.
+
+        Raises:
+            KeyError: If there is no such device
+        """
+        device = self._devices[device_id]
+        self._unplace(device)
+        device.dmx = dmx
+        if space is not None:
+            device.space = space
+        self._place(device)
+        return device
+
+    def set_channel(self, device_id: int, channel: int) -> Device:
+        """Move a device to another channel.
+
+        Raises:
+            KeyError: If there is no such device
+        """
+        device = self._devices[device_id]
+        self._channels[device.channel].remove(device)
+        device.channel = channel
+        self._insert_on_channel(device)
+        return device
+
+    def add_personality(self, personality: Personality) -> None:
+        """Add ``personality`` to the patch, replacing one with the same dcid."""
+        old = self._personalities.get(personality.dcid)
+        if old is not None:
+            self.patch.personalities.remove(old)
+        self.patch.personalities.append(personality)
+        self._add_personality(personality)
+
+    def set_topo(self, topo: Topo) -> None:
+        """Add the topology entry of a device, replacing its previous one."""
+        old = self._topo.get(topo.device_id)
+        if old is not None:
+            self.patch.topo[self.patch.topo.index(old)] = topo
+        else:
+            self.patch.topo.append(topo)
+        if topo.device_id >= 0:
+            self._topo[topo.device_id] = topo
+
+    def _add_personality(self, personality: Personality) -> None:
+        slots: Dict[int, Tuple[PersonalityParameter, bool]] = {}
+        for param in personality.parameters:
+            slots[param.coarse] = (param, False)
+            if param.fine >= 0:
+                slots[param.fine] = (param, True)
+        self._personalities[personality.dcid] = personality
+        self._slots[personality.dcid] = slots
+
+    def _add_device(self, device: Device) -> None:
+        self._devices[device.device_id] = device
+        self._order[device.device_id] = self._next_order
+        self._next_order += 1
+        self._insert_on_channel(device)
+        self._place(device)
+
+    def _remove_device(self, device: Device) -> None:
+        del self._devices[device.device_id]
+        del self._order[device.device_id]
+        self._channels[device.channel].remove(device)
+        self._unplace(device)
+
+    def _insert_on_channel(self, device: Device) -> None:
+        # Channel lists are short; keep them in patch order.
+        devices = self._channels.setdefault(device.channel, [])
+        order = self._order[device.device_id]
+        i = 0
+        while i < len(devices) and self._order[devices[i].device_id] < order:
+            i += 1
+        devices.insert(i, device)
+
+    def _place(self, device: Device) -> None:
+        if device.dmx > 0:
+            self._universes.setdefault(device.space, _Universe()).add(device)
+
+    def _unplace(self, device: Device) -> None:
+        if device.dmx > 0:
+            self._universes[device.space].remove(device)
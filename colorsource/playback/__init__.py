@@ -0,0 +1,33 @@
+__all__ = [
+    "Back",
+    "ClockStats",
+    "Fade",
+    "Go",
+    "MergeEngine",
+    "Playback",
+    "SetGrandmaster",
+    "SetMaster",
+    "ShowRuntime",
+    "Stop",
+    "TIME_UNIT",
+    "ToggleIndependent",
+    "TrackedState",
+    "TrackingResolver",
+    "fade_curve",
+    "run_headless",
+]
+
+from .fade import TIME_UNIT, Fade, Playback, fade_curve
+from .merge import MergeEngine
+from .tracking import TrackedState, TrackingResolver
+from .runtime import (
+    Back,
+    ClockStats,
+    Go,
+    SetGrandmaster,
+    SetMaster,
+    ShowRuntime,
+    Stop,
+    ToggleIndependent,
+    run_headless,
+)
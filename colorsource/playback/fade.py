@@ -0,0 +1,323 @@
+"""Cue fades rendered to DMX frames at a fixed rate.
+
+A :class:`Playback` holds the current output state of a patch as the cue
+values of :meth:`.DmxRenderer.values`: one 16-bit value per intensity, color
+and LTP parameter of every channel. Going to a cue builds a :class:`Fade`
+from the current state to the cue's values, where every key is assigned to
+one of three timing groups:
+
+- intensity keys that rise fade with the up time
+- intensity keys that fall fade with the down time
+- color and LTP keys move with the up time
+
+A fade is precomputed once as a start vector, a delta vector and a group
+vector. Frame ``i`` is ``start + delta * coefficients[group]``, where the
+three coefficients come from cached :func:`fade_curve` tables, so a frame
+costs a few array operations regardless of the number of channels. 16-bit
+parameters (``LtpParameter.is16_bit``) fade in 16 bits and fill both their
+coarse and fine slot.
+
+Keys a cue does not set take intensity 0 and keep their current color and
+LTP value. Step and memory times are in tenths of a second, see
+:data:`TIME_UNIT`.
+"""
+
+import functools
+import hashlib
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from ..dmx.render import DmxRenderer
+from ..formats.columnar import ColumnarContent
+from ..formats.showfile import Content, Memory, Step
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+DEFAULT_RATE = 44.0
+
+# Seconds per unit of Step.up_time, down_time, wait_time and Memory.move_time
+TIME_UNIT = 0.1
+
+UP, DOWN, MOVE = 0, 1, 2
+
+CURVES = ("linear", "s")
+
+_CueContent = Union[Content, ColumnarContent]
+
+
+def _digest(values: Any) -> bytes:
+    """A hash of cue values, an int64 array or an ``array("l")``."""
+    return hashlib.blake2b(memoryview(values), digest_size=16).digest()
+
+
+@functools.lru_cache(maxsize=None)
+def fade_curve(frames: int, shape: str = "linear") -> Tuple[float, ...]:
+    """Fade progress at each of ``frames + 1`` frames, from 0.0 to 1.0.
+
+    Args:
+        frames: Length of the fade in frames; 0 is a snap
+        shape: ``"linear"``, or ``"s"`` for an ease-in/ease-out smoothstep
+    """
+    if shape not in CURVES:
+        raise ValueError(f"shape must be one of {CURVES}, not {shape!r}")
+    if frames <= 0:
+        return (1.0,)
+    progress = [i / frames for i in range(frames + 1)]
+    if shape == "s":
+        progress = [p * p * (3 - 2 * p) for p in progress]
+    return tuple(progress)
+
+
+class Fade:
+    """A precomputed transition between two sets of cue values.
+
+    Attributes:
+        frames: Number of frames until every key reaches its target
+        target: The cue values at the end of the fade
+    """
+
+    def __init__(
+        self,
+        start: Any,
+        target: Any,
+        channels: int,
+        up_frames: int,
+        down_frames: int,
+        shape: str = "linear",
+    ) -> None:
+        self.curves = (
+            fade_curve(up_frames, shape),
+            fade_curve(down_frames, shape),
+            fade_curve(up_frames, shape),
+        )
+        self.frames = max(up_frames, down_frames)
+        if np is not None:
+            self._init_numpy(start, target, channels)
+        else:
+            self._init_python(start, target, channels)
+
+    def _init_numpy(self, start: Any, target: Any, channels: int) -> None:
+        start = np.array(start, dtype=np.int64)
+        target = np.array(target, dtype=np.int64)
+        intensity = np.arange(len(target)) < channels
+        # Intensity fades from and to 0 where unset.
+        start[intensity & (start < 0)] = 0
+        target[intensity & (target < 0)] = 0
+        # Other keys hold their value where unset and snap where unknown.
+        unset = target < 0
+        target[unset] = start[unset]
+        unknown = start < 0
+        start[unknown] = target[unknown]
+        group = np.full(len(target), MOVE, dtype=np.intp)
+        group[intensity & (target >= start)] = UP
+        group[intensity & (target < start)] = DOWN
+        self.target = target
+        self._start = start.astype(np.float64)
+        self._delta = (target - start).astype(np.float64)
+        self._group = group
+
+    def _init_python(self, start: Any, target: Any, channels: int) -> None:
+        starts = array("l")
+        targets = array("l")
+        groups = array("b")
+        for key, (s, t) in enumerate(zip(start, target)):
+            if key < channels:
+                s, t = max(s, 0), max(t, 0)
+                group = UP if t >= s else DOWN
+            else:
+                t = s if t < 0 else t
+                s = t if s < 0 else s
+                group = MOVE
+            starts.append(s)
+            targets.append(t)
+            groups.append(group)
+        self.target = targets
+        self._start = starts
+        self._delta = array("l", (t - s for s, t in zip(starts, targets)))
+        self._group = groups
+
+    def __len__(self) -> int:
+        return self.frames + 1
+
+    def values(self, frame: int) -> Any:
+        """The cue values at ``frame``, clamped to the end of the fade."""
+        coefficients = [curve[min(frame, len(curve) - 1)] for curve in self.curves]
+        if np is not None:
+            return np.rint(
+                self._start + self._delta * np.array(coefficients)[self._group]
+            ).astype(np.int64)
+        return array(
+            "l",
+            (
+                round(s + d * coefficients[g])
+                for s, d, g in zip(self._start, self._delta, self._group)
+            ),
+        )
+
+
+class Playback:
+    """Cue playback of one patch, rendering frames at a fixed rate.
+
+    Fades are cached per start state, cue content and timing, and cue
+    values per cue content, so replaying a show only computes each
+    transition once. The start state is keyed by a digest of its values:
+    it holds the colors and LTP values of every earlier cue, not only of
+    the one before. The cache keeps a reference to every content it has
+    seen; call :meth:`clear_cache` after editing one.
+
+    Args:
+        renderer: Renderer of the patch
+        rate: Frames per second
+        shape: Fade curve shape, see :func:`fade_curve`
+    """
+
+    def __init__(
+        self,
+        renderer: DmxRenderer,
+        rate: float = DEFAULT_RATE,
+        shape: str = "linear",
+    ) -> None:
+        fade_curve(0, shape)  # validates the shape
+        self.renderer = renderer
+        self.rate = rate
+        self.shape = shape
+        self.state = renderer.values(Content([], 0, [], []))
+        self._blank_state = self.state
+        self._blank_key = _digest(self.state)
+        # Digest of the state, None after an interrupted fade
+        self._state_key: Optional[bytes] = self._blank_key
+        self._values: Dict[int, Tuple[_CueContent, Any]] = {}
+        # (start digest, id(content), up, down) -> (fade, target digest)
+        self._fades: Dict[Tuple[bytes, int, int, int], Tuple[Fade, bytes]] = {}
+
+    def clear_cache(self) -> None:
+        self._values.clear()
+        self._fades.clear()
+
+    def reset(self) -> None:
+        """Return to the blank state, as if no cue had been played."""
+        self.state = self._blank_state
+        self._state_key = self._blank_key
+
+    def frames_for(self, seconds: float) -> int:
+        return max(0, round(seconds * self.rate))
+
+    def cue_values(self, content: _CueContent) -> Any:
+        """The renderer values of ``content``, computed once per content."""
+        entry = self._values.get(id(content))
+        if entry is None:
+            entry = (content, self.renderer.values(content))
+            self._values[id(content)] = entry
+        return entry[1]
+
+    def go(
+        self,
+        content: _CueContent,
+        up_time: float,
+        down_time: Optional[float] = None,
+    ) -> Fade:
+        """Start a fade from the current state to ``content``.
+
+        Args:
+            content: Target cue contents
+            up_time: Seconds for rising intensities and for moves
+            down_time: Seconds for falling intensities, default ``up_time``
+
+        Returns:
+            The fade. The state becomes its target; use :meth:`frames` to
+            render it, or :meth:`stop` if it is interrupted.
+        """
+        if down_time is None:
+            down_time = up_time
+        up = self.frames_for(up_time)
+        down = self.frames_for(down_time)
+        if self._state_key is None:
+            entry = None
+        else:
+            key = (self._state_key, id(content), up, down)
+            entry = self._fades.get(key)
+        if entry is None:
+            fade = Fade(
+                self.state,
+                self.cue_values(content),
+                self.renderer.channels,
+                up,
+                down,
+                self.shape,
+            )
+            entry = (fade, _digest(fade.target))
+            if self._state_key is not None:
+                self._fades[key] = entry
+        fade, self._state_key = entry
+        self.state = fade.target
+        return fade
+
+    def go_step(self, step: Step) -> Fade:
+        """Start the fade of a cue list step with its up and down times."""
+        return self.go(
+            step.content, step.up_time * TIME_UNIT, step.down_time * TIME_UNIT
+        )
+
+    def go_memory(self, memory: Memory) -> Fade:
+        """Start the fade of a memory with its move time."""
+        return self.go(memory.content, memory.move_time * TIME_UNIT)
+
+    def stop(self, fade: Fade, frame: int) -> None:
+        """Freeze the state at ``frame`` of an interrupted ``fade``."""
+        if frame < fade.frames:
+            self.state = fade.values(frame)
+            self._state_key = None
+
+    def frames(
+        self, fade: Fade, count: Optional[int] = None, out: Optional[Any] = None
+    ) -> Iterator[Any]:
+        """Render ``count`` frames of ``fade``, default all of them.
+
+        Frames past the end of the fade hold its target. Every frame is
+        rendered into the same buffer, ``out`` if given; copy it to keep it.
+        """
+        if out is None:
+            out = self.renderer.blank()
+        if count is None:
+            count = len(fade)
+        target = None
+        for i in range(count):
+            if i < fade.frames:
+                yield self.renderer.apply(fade.values(i), out)
+            else:
+                if target is None:
+                    target = self.renderer.apply(fade.target, out)
+                yield target
+
+    def play(
+        self, steps: Iterable[Step], hold: float = 0.0, out: Optional[Any] = None
+    ) -> Iterator[Tuple[int, Any]]:
+        """Play cue list steps in order, yielding ``(frame_number, frame)``.
+
+        A step with a ``wait_time`` is followed by the next step that long
+        after its GO, interrupting its fade if it is still running. Otherwise
+        the next step starts ``hold`` seconds after the fade completes. The
+        last fade is played to its end.
+
+        Every frame is rendered into the same buffer, ``out`` if given.
+        """
+        if out is None:
+            out = self.renderer.blank()
+        number = 0
+        steps = list(steps)
+        for i, step in enumerate(steps):
+            fade = self.go_step(step)
+            if i == len(steps) - 1:
+                count = len(fade)
+            elif step.wait_time > 0:
+                count = self.frames_for(step.wait_time * TIME_UNIT)
+            else:
+                count = len(fade) + self.frames_for(hold)
+            for frame in self.frames(fade, count, out):
+                yield number, frame
+                number += 1
+            self.stop(fade, count)
@@ -0,0 +1,315 @@
+"""Incremental HTP/LTP merge of the cue list, memories and independents.
+
+A :class:`MergeEngine` holds one contribution per source: the renderer
+values (:meth:`.DmxRenderer.values`) of the cue list or of a memory's
+``Content``, kept as a sparse map of the keys the source sets, and the
+source's level. The merged values follow the console's rules:
+
+- intensity keys are highest-takes-precedence: each source's value scaled
+  by its level, the highest of them, then scaled by the grandmaster
+- color and LTP keys are latest-takes-precedence: the value of the active
+  source that acted last, i.e. whose values were last taken with
+  ``retake`` (the cue list on GO) or whose level last rose from 0
+- independents output their level on their DMX addresses of universe 1,
+  or of the universe given to :meth:`MergeEngine.add_independent`,
+  highest-takes-precedence over the rendered frame; an independent on a
+  universe the renderer does not patch outputs nothing
+
+For every key the engine keeps the sources that set it. A change to one
+source re-resolves only the keys that source sets: a level change of an
+active source touches its intensity keys, raising it from or dropping it
+to 0 also its other keys, and new values touch the keys whose value
+changed. A fader move therefore costs time in proportion to the size of
+that memory's content and the number of sources sharing its keys, however
+large the rig. Rendering the merged values to a frame is one vectorized
+:meth:`.DmxRenderer.apply`.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from ..dmx.render import UNIVERSE_SIZE, DmxRenderer
+from ..formats.showfile import Content
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+@dataclass(eq=False)
+class _Source:
+    """The contribution of one source to the merge."""
+
+    name: Hashable
+    # The renderer values as given, to find what a new set changes
+    values: Any
+    # key -> value of the keys the source sets
+    keys: Dict[int, int] = field(default_factory=dict)
+    level: float = 0.0
+    # Order of the source's last action, for latest-takes-precedence
+    stamp: int = 0
+
+
+@dataclass
+class _Independent:
+    slots: Tuple[int, ...]
+    level: int
+    active: bool
+
+
+class MergeEngine:
+    """Merges sources of renderer values, re-resolving only what changed.
+
+    Args:
+        renderer: The renderer whose values are merged
+
+    Attributes:
+        values: The merged renderer values, in the type
+            :meth:`.DmxRenderer.values` returns; updated in place
+        grandmaster: Grandmaster level, 0-255
+        resolved: Keys re-resolved since the engine was created, a measure
+            of the merge work done
+    """
+
+    def __init__(self, renderer: DmxRenderer) -> None:
+        self.renderer = renderer
+        self.values = renderer.values(Content([], 0, [], []))
+        self.grandmaster = 255
+        self.resolved = 0
+        self._channels = renderer.channels
+        self._sources: Dict[Hashable, _Source] = {}
+        # key -> the sources that set it
+        self._setters: Dict[int, List[_Source]] = {}
+        self._stamp = 0
+        self._independents: Dict[Hashable, _Independent] = {}
+        # DMX slot -> highest level of the active independents on it
+        self._slot_levels: Dict[int, int] = {}
+        self._slot_arrays: Optional[Tuple[Any, Any]] = None
+
+    # Sources
+
+    def add(self, name: Hashable, values: Any, level: float = 255) -> None:
+        """Add a source with renderer values ``values`` at ``level``, 0-255.
+
+        Sources added at a level above 0 act, for latest-takes-precedence,
+        in the order they are added.
+        """
+        if name in self._sources:
+            raise ValueError(f"source {name!r} already exists")
+        source = _Source(name, values, level=min(max(level, 0), 255))
+        if source.level > 0:
+            source.stamp = self._next_stamp()
+        self._sources[name] = source
+        keys = _set_keys(values)
+        self._update(source, keys, _pick(values, keys))
+        self._resolve(source.keys)
+
+    def remove(self, name: Hashable) -> None:
+        """Remove a source and its contribution."""
+        source = self._sources.pop(name)
+        keys = list(source.keys)
+        self._update(source, keys, [-1] * len(keys))
+        self._resolve(keys)
+
+    def __contains__(self, name: Hashable) -> bool:
+        return name in self._sources
+
+    def level(self, name: Hashable) -> float:
+        return self._sources[name].level
+
+    def set_values(self, name: Hashable, values: Any, retake: bool = False) -> None:
+        """Replace the renderer values of a source.
+
+        Only the keys whose value differs from the source's previous values
+        are re-resolved, so a fade frame costs what it changes.
+
+        Args:
+            name: The source
+            values: Its new renderer values
+            retake: Make the source act last, taking precedence on every
+                color and LTP key it sets, as the cue list does on GO
+        """
+        source = self._sources[name]
+        keys = _changed_keys(source.values, values)
+        source.values = values
+        self._update(source, keys, _pick(values, keys))
+        if retake and source.level > 0:
+            source.stamp = self._next_stamp()
+            keys = list(source.keys) + keys
+        self._resolve(keys)
+
+    def set_level(self, name: Hashable, level: float) -> None:
+        """Move the level of a source, e.g. a memory's master fader, 0-255."""
+        source = self._sources[name]
+        level = min(max(level, 0), 255)
+        if level == source.level:
+            return
+        was_active = source.level > 0
+        source.level = level
+        if was_active and level > 0:
+            channels = self._channels
+            self._resolve([key for key in source.keys if key < channels])
+            return
+        if level > 0:
+            source.stamp = self._next_stamp()
+        self._resolve(source.keys)
+
+    def set_grandmaster(self, level: int) -> None:
+        """Set the grandmaster, re-resolving every intensity key set."""
+        level = min(max(level, 0), 255)
+        if level == self.grandmaster:
+            return
+        self.grandmaster = level
+        channels = self._channels
+        self._resolve([key for key in self._setters if key < channels])
+
+    def _next_stamp(self) -> int:
+        self._stamp += 1
+        return self._stamp
+
+    def _update(
+        self, source: _Source, keys: Sequence[int], values: Sequence[int]
+    ) -> None:
+        """Store new values of ``source``'s keys, -1 for keys it stops setting."""
+        setters = self._setters
+        contributed = source.keys
+        for key, value in zip(keys, values):
+            if value < 0:
+                if contributed.pop(key, None) is not None:
+                    sources = setters[key]
+                    sources.remove(source)
+                    if not sources:
+                        del setters[key]
+            else:
+                if key not in contributed:
+                    setters.setdefault(key, []).append(source)
+                contributed[key] = value
+
+    def _resolve(self, keys: Iterable[int]) -> None:
+        """Recompute the merged value of ``keys`` from their sources."""
+        channels = self._channels
+        gm = self.grandmaster
+        setters = self._setters
+        resolved_keys = []
+        resolved = []
+        for key in keys:
+            value = -1
+            sources = setters.get(key, ())
+            if key < channels:
+                for source in sources:
+                    if source.level > 0:
+                        scaled = round(source.keys[key] * source.level / 255)
+                        if scaled > value:
+                            value = scaled
+                if value > 0 and gm < 255:
+                    value = round(value * gm / 255)
+            else:
+                stamp = -1
+                for source in sources:
+                    if source.level > 0 and source.stamp > stamp:
+                        stamp = source.stamp
+                        value = source.keys[key]
+            resolved_keys.append(key)
+            resolved.append(value)
+        self.resolved += len(resolved_keys)
+        if np is not None:
+            if resolved_keys:
+                self.values[np.array(resolved_keys, dtype=np.intp)] = resolved
+        else:
+            values = self.values
+            for key, value in zip(resolved_keys, resolved):
+                values[key] = value
+
+    # Independents
+
+    def add_independent(
+        self,
+        name: Hashable,
+        addresses: Sequence[int],
+        level: int,
+        active: bool,
+        universe: int = 1,
+    ) -> None:
+        """Add an independent on DMX ``addresses`` (1-512) of ``universe``.
+
+        If the renderer does not patch ``universe``, the independent can be
+        switched but outputs nothing.
+        """
+        if name in self._independents:
+            raise ValueError(f"independent {name!r} already exists")
+        slots: Tuple[int, ...] = ()
+        if universe in self.renderer.universes:
+            base = self.renderer.universes.index(universe) * UNIVERSE_SIZE
+            slots = tuple(base + a - 1 for a in addresses if 0 < a <= UNIVERSE_SIZE)
+        self._independents[name] = _Independent(slots, level, False)
+        self.set_independent(name, active)
+
+    def set_independent(self, name: Hashable, active: bool) -> None:
+        """Switch an independent on or off."""
+        independent = self._independents[name]
+        if independent.active == active:
+            return
+        independent.active = active
+        for slot in independent.slots:
+            level = max(
+                (
+                    i.level
+                    for i in self._independents.values()
+                    if i.active and slot in i.slots
+                ),
+                default=None,
+            )
+            if level is None:
+                self._slot_levels.pop(slot, None)
+            else:
+                self._slot_levels[slot] = level
+        self._slot_arrays = None
+
+    # Output
+
+    def render(self, out: Optional[Any] = None) -> Any:
+        """Render the merged values and independents into a frame.
+
+        Args:
+            out: Frame from :meth:`.DmxRenderer.blank` to overwrite
+
+        Returns:
+            The frame, ``out`` if given
+        """
+        frame = self.renderer.apply(self.values, out)
+        if not self._slot_levels:
+            return frame
+        if np is not None:
+            if self._slot_arrays is None:
+                self._slot_arrays = (
+                    np.array(list(self._slot_levels), dtype=np.intp),
+                    np.array(list(self._slot_levels.values()), dtype=np.uint8),
+                )
+            slots, levels = self._slot_arrays
+            flat = frame.reshape(-1)
+            flat[slots] = np.maximum(flat[slots], levels)
+        else:
+            for slot, level in self._slot_levels.items():
+                frame[slot] = max(frame[slot], level)
+        return frame
+
+
+def _set_keys(values: Any) -> List[int]:
+    if np is not None:
+        return np.flatnonzero(np.asarray(values) >= 0).tolist()
+    return [key for key, value in enumerate(values) if value >= 0]
+
+
+def _pick(values: Any, keys: List[int]) -> List[int]:
+    if np is not None:
+        return np.asarray(values)[keys].tolist()
+    return [values[key] for key in keys]
+
+
+def _changed_keys(old: Any, new: Any) -> List[int]:
+    if old is new:
+        return []
+    if np is not None:
+        return np.flatnonzero(np.asarray(old) != np.asarray(new)).tolist()
+    return [key for key, (a, b) in enumerate(zip(old, new)) if a != b]
@@ -0,0 +1,466 @@
+"""Real-time show playback on asyncio.
+
+:class:`ShowRuntime` plays a ``Play`` the way the console does: GO and BACK
+step through the cue list with the steps' fade times, memories play on
+their master faders, independents switch their DMX addresses on and off and
+the grandmaster scales every intensity. Each tick of a fixed-rate clock
+merges the sources and hands the frame to every sink:
+
+- intensities are highest-takes-precedence: the cue list, then every memory
+  scaled by its master level, whichever is highest
+- color and LTP values are latest-takes-precedence: they come from the cue
+  list after a GO or BACK, and from a memory after its master is raised
+  from 0, whichever happened last
+- the grandmaster scales the merged intensities; independents that are on
+  output their level on their DMX addresses of universe 1, and nothing if
+  the patch has no universe 1
+
+The merge is incremental, see :class:`.MergeEngine`: a tick re-resolves
+only the keys of the sources that changed since the previous one.
+
+Commands (:class:`Go`, :class:`Back`, :class:`SetMaster`, ...) are put on
+:attr:`ShowRuntime.commands` and take effect at the start of the next tick,
+so fades started by them line up with the frame clock. A command that
+fails, e.g. a GO to a cue number that does not exist, is counted in
+:attr:`ClockStats.errors` and passed to the ``on_error`` callback; the
+clock keeps running.
+
+The clock schedules tick ``n`` at ``start + n * period`` on the event loop's
+monotonic time, so a late tick does not delay the ones after it. When a
+tick is more than a period late the missed ticks are skipped rather than
+rendered in a burst; show time keeps following the wall clock.
+:class:`ClockStats` records how late every tick woke up. With ``speed`` the
+show runs faster than real time, as :func:`run_headless` does to check a
+whole show.
+"""
+
+import asyncio
+import inspect
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Union
+
+from ..dmx.render import DmxRenderer
+from ..formats.showfile import Content, Memory, Play
+from .fade import DEFAULT_RATE, TIME_UNIT, Fade, Playback
+from .merge import MergeEngine
+from .tracking import TrackingResolver
+
+
+# A sink receives the tick number and the frame, and may be a coroutine.
+Sink = Callable[[int, Any], Any]
+
+# Receives a command that failed and the exception it raised.
+ErrorHandler = Callable[["Command", Exception], Any]
+
+
+@dataclass(frozen=True)
+class Go:
+    """Fade to the next step, or to the step with cue number ``cue``."""
+
+    cue: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Back:
+    """Fade back to the previous step with its times."""
+
+
+@dataclass(frozen=True)
+class SetMaster:
+    """Move master fader ``master`` (``Memory.master``) to ``level``, 0-255.
+
+    With ``time`` the fader moves over that many seconds.
+    """
+
+    master: int
+    level: int
+    time: float = 0.0
+
+
+@dataclass(frozen=True)
+class SetGrandmaster:
+    """Set the grandmaster to ``level``, 0-255."""
+
+    level: int
+
+
+@dataclass(frozen=True)
+class ToggleIndependent:
+    """Switch independent ``index`` on or off, or to ``active`` if given."""
+
+    index: int
+    active: Optional[bool] = None
+
+
+@dataclass(frozen=True)
+class Stop:
+    """End :meth:`ShowRuntime.run` after the current tick."""
+
+
+Command = Union[Go, Back, SetMaster, SetGrandmaster, ToggleIndependent, Stop]
+
+
+@dataclass
+class ClockStats:
+    """How late the ticks of a :class:`ShowRuntime` woke up.
+
+    Attributes:
+        ticks: Ticks rendered
+        missed: Ticks skipped because the clock fell a period or more behind
+        errors: Commands that raised an exception and were skipped
+        lateness: Seconds between the deadline and the wake-up of each of
+            the last ``window`` ticks
+    """
+
+    window: int = 10000
+    ticks: int = 0
+    missed: int = 0
+    errors: int = 0
+    lateness: Deque[float] = field(default_factory=deque)
+
+    def record(self, late: float) -> None:
+        self.ticks += 1
+        self.lateness.append(late)
+        if len(self.lateness) > self.window:
+            self.lateness.popleft()
+
+    def percentile(self, q: float) -> float:
+        """The ``q``-th percentile (0-100) of the recent lateness."""
+        if not self.lateness:
+            return 0.0
+        ordered = sorted(self.lateness)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+    @property
+    def mean(self) -> float:
+        return sum(self.lateness) / len(self.lateness) if self.lateness else 0.0
+
+    @property
+    def jitter(self) -> float:
+        """Standard deviation of the recent lateness."""
+        if not self.lateness:
+            return 0.0
+        mean = self.mean
+        return (sum((x - mean) ** 2 for x in self.lateness) / len(self.lateness)) ** 0.5
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "errors": self.errors,
+            "latenessMean": self.mean,
+            "latenessP99": self.percentile(99),
+            "latenessMax": max(self.lateness, default=0.0),
+            "jitter": self.jitter,
+        }
+
+
+@dataclass
+class _Master:
+    """A memory on its master fader."""
+
+    memory: Memory
+    level: float = 0.0
+    # Fader move in progress: level at start_tick, target at end_tick
+    start_level: float = 0.0
+    target: float = 0.0
+    start_tick: int = 0
+    end_tick: int = 0
+
+    def update(self, tick: int) -> None:
+        if tick >= self.end_tick:
+            self.level = self.target
+        else:
+            progress = (tick - self.start_tick) / (self.end_tick - self.start_tick)
+            self.level = self.start_level + (self.target - self.start_level) * progress
+
+
+class ShowRuntime:
+    """Plays a show in real time on the running asyncio event loop.
+
+    Args:
+        play: The show
+        renderer: Renderer of ``play.patch``, created if omitted
+        rate: Frames per second of show time
+        speed: Show seconds per wall-clock second
+        sinks: Callables receiving ``(tick, frame)`` after every tick; a
+            sink may be a coroutine function. The frame buffer is reused.
+        tracking: Play the tracked state of every step rather than only the
+            levels it records
+        on_error: Called with a command from :attr:`commands` and the
+            exception it raised; the command is skipped either way
+
+    Attributes:
+        commands: Queue of commands to execute at the next tick
+        index: Index of the current step, -1 before the first GO
+        merge: The merge of the cue list, memories and independents
+        stats: Clock statistics of the current or last :meth:`run`
+    """
+
+    def __init__(
+        self,
+        play: Play,
+        renderer: Optional[DmxRenderer] = None,
+        rate: float = DEFAULT_RATE,
+        speed: float = 1.0,
+        sinks: Sequence[Sink] = (),
+        tracking: bool = True,
+        on_error: Optional[ErrorHandler] = None,
+    ) -> None:
+        self.play = play
+        self.renderer = renderer if renderer is not None else DmxRenderer(play.patch)
+        self.rate = rate
+        self.speed = speed
+        self.sinks = list(sinks)
+        self.on_error = on_error
+        self.commands: "asyncio.Queue[Command]" = asyncio.Queue()
+        self.stats = ClockStats()
+        self.index = -1
+        self.grandmaster = 255
+        self.independents = [i.active for i in play.independents]
+        self.masters: Dict[int, _Master] = {m.master: _Master(m) for m in play.memories}
+        self.tick = 0
+
+        self._cues = Playback(self.renderer, rate)
+        self._resolver = TrackingResolver(play.cue_list) if tracking else None
+        self._contents: Dict[int, Content] = {}
+        self._fade: Optional[Fade] = None
+        self._fade_tick = 0
+        self._follow_tick: Optional[int] = None
+        self._running = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tick_waiters: List["asyncio.Future[int]"] = []
+        # The exception the last run failed with
+        self._failure: Optional[BaseException] = None
+        self.frame = self.renderer.blank()
+
+        # Sources: the cue list under None, memories by master number
+        self.merge = MergeEngine(self.renderer)
+        self.merge.add(None, self._cues.state)
+        for number, master in self.masters.items():
+            self.merge.add(number, self._cues.cue_values(master.memory.content), 0)
+        for i, independent in enumerate(play.independents):
+            self.merge.add_independent(
+                i, independent.dmx, independent.level, independent.active
+            )
+        self._retake = False
+
+    # Cue list
+
+    def _content(self, index: int) -> Content:
+        if self._resolver is None:
+            return self.play.cue_list.steps[index].content
+        content = self._contents.get(index)
+        if content is None:
+            content = self._contents[index] = self._resolver.content(index)
+        return content
+
+    def _cue_values(self) -> Any:
+        if self._fade is None:
+            return self._cues.state
+        frame = self.tick - self._fade_tick
+        if frame >= self._fade.frames:
+            self._fade = None
+            return self._cues.state
+        return self._fade.values(frame)
+
+    def _goto(self, index: int, up: int, down: int) -> None:
+        if self._fade is not None:
+            self._cues.stop(self._fade, self.tick - self._fade_tick)
+        step = self.play.cue_list.steps[index]
+        self._fade = self._cues.go(
+            self._content(index), up * TIME_UNIT, down * TIME_UNIT
+        )
+        self._fade_tick = self.tick
+        self._retake = True
+        self.index = index
+        self._follow_tick = None
+        if step.wait_time > 0 and index + 1 < len(self.play.cue_list.steps):
+            wait = self._cues.frames_for(step.wait_time * TIME_UNIT)
+            self._follow_tick = self.tick + max(wait, 1)
+
+    def execute(self, command: Command) -> None:
+        """Execute ``command`` at the current tick."""
+        steps = self.play.cue_list.steps
+        if isinstance(command, Go):
+            if command.cue is not None:
+                index = next(
+                    (i for i, s in enumerate(steps) if s.cue == command.cue), None
+                )
+                if index is None:
+                    raise ValueError(f"no step with cue number {command.cue}")
+            else:
+                index = self.index + 1
+            if index < len(steps):
+                self._goto(index, steps[index].up_time, steps[index].down_time)
+        elif isinstance(command, Back):
+            if self.index > 0:
+                leaving = steps[self.index]
+                self._goto(self.index - 1, leaving.down_time, leaving.down_time)
+        elif isinstance(command, SetMaster):
+            master = self.masters.get(command.master)
+            if master is None:
+                raise KeyError(f"no memory on master {command.master}")
+            frames = self._cues.frames_for(command.time)
+            master.start_level = master.level
+            master.target = min(max(command.level, 0), 255)
+            master.start_tick = self.tick
+            master.end_tick = self.tick + frames
+            master.update(self.tick)
+        elif isinstance(command, SetGrandmaster):
+            self.grandmaster = min(max(command.level, 0), 255)
+            self.merge.set_grandmaster(self.grandmaster)
+        elif isinstance(command, ToggleIndependent):
+            active = command.active
+            if active is None:
+                active = not self.independents[command.index]
+            self.independents[command.index] = active
+            self.merge.set_independent(command.index, active)
+        elif isinstance(command, Stop):
+            self._running = False
+        else:
+            raise TypeError(f"unknown command {command!r}")
+
+    @property
+    def busy(self) -> bool:
+        """Whether a cue fade is running or a follow is pending."""
+        return self._fade is not None or self._follow_tick is not None
+
+    async def wait_idle(self) -> None:
+        """Wait until no cue fade is running and no follow is pending."""
+        await self._idle.wait()
+
+    async def next_tick(self) -> int:
+        """Wait until the next tick is rendered, and return its number.
+
+        Raises:
+            RuntimeError: If :meth:`run` stops first
+            Exception: The exception :meth:`run` failed with, if it failed
+                before the tick or already has
+        """
+        if self._failure is not None:
+            raise self._failure
+        waiter = asyncio.get_running_loop().create_future()
+        self._tick_waiters.append(waiter)
+        return await waiter
+
+    # Frames
+
+    def render(self) -> Any:
+        """Merge all sources at the current tick and render the frame."""
+        if self._follow_tick is not None and self.tick >= self._follow_tick:
+            self.execute(Go())
+        self.merge.set_values(None, self._cue_values(), self._retake)
+        self._retake = False
+        for number, master in self.masters.items():
+            master.update(self.tick)
+            self.merge.set_level(number, master.level)
+        frame = self.merge.render(self.frame)
+        if self.busy:
+            self._idle.clear()
+        else:
+            self._idle.set()
+        return frame
+
+    # Clock
+
+    async def _emit(self, frame: Any) -> None:
+        for sink in self.sinks:
+            result = sink(self.tick, frame)
+            if inspect.isawaitable(result):
+                await result
+
+    async def run(self, ticks: Optional[int] = None) -> ClockStats:
+        """Run the frame clock until :class:`Stop` or ``ticks`` ticks.
+
+        Returns:
+            The clock statistics of this run.
+        """
+        self.stats = ClockStats()
+        self._running = True
+        self._failure = None
+        failure: BaseException = RuntimeError("the show runtime stopped")
+        try:
+            await self._run(ticks)
+        except BaseException as e:
+            failure = self._failure = e
+            raise
+        finally:
+            self._running = False
+            waiters, self._tick_waiters = self._tick_waiters, []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(failure)
+        return self.stats
+
+    async def _run(self, ticks: Optional[int]) -> None:
+        loop = asyncio.get_running_loop()
+        period = 1.0 / (self.rate * self.speed)
+        start = loop.time()
+        first = self.tick
+        while self._running and (ticks is None or self.tick - first < ticks):
+            deadline = start + (self.tick - first) * period
+            now = loop.time()
+            if now < deadline:
+                await asyncio.sleep(deadline - now)
+                now = loop.time()
+            late = now - deadline
+            if late >= period:
+                missed = int(late / period)
+                self.stats.missed += missed
+                self.tick += missed
+                late -= missed * period
+            self.stats.record(late)
+            while not self.commands.empty():
+                command = self.commands.get_nowait()
+                try:
+                    self.execute(command)
+                except Exception as e:
+                    self.stats.errors += 1
+                    if self.on_error is not None:
+                        self.on_error(command, e)
+            await self._emit(self.render())
+            waiters, self._tick_waiters = self._tick_waiters, []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(self.tick)
+            self.tick += 1
+
+
+async def run_headless(
+    play: Play,
+    speed: float = 10.0,
+    hold: float = 0.0,
+    rate: float = DEFAULT_RATE,
+    sinks: Sequence[Sink] = (),
+) -> ShowRuntime:
+    """Play every step of the cue list through a :class:`ShowRuntime`.
+
+    A driver task sends GO whenever the previous fade and any follow are
+    complete, ``hold`` show seconds later, and stops the runtime after the
+    last step. Runs ``speed`` times faster than real time.
+
+    Returns:
+        The runtime; its ``stats`` describe the clock over the whole show.
+    """
+    runtime = ShowRuntime(play, rate=rate, speed=speed, sinks=sinks)
+    hold_wall = hold / speed
+
+    async def driver() -> None:
+        steps = len(play.cue_list.steps)
+        while True:
+            await runtime.commands.put(Go())
+            await runtime.next_tick()
+            await runtime.wait_idle()
+            if runtime.index >= steps - 1:
+                break
+            if hold_wall > 0:
+                await asyncio.sleep(hold_wall)
+        await runtime.commands.put(Stop())
+
+    task = asyncio.ensure_future(driver())
+    await runtime.run()
+    await task
+    return runtime
@@ -0,0 +1,140 @@
+"""Tracked state of the cue list at any cue.
+
+In a tracking cue list the look at step ``n`` is the result of every step up
+to and including ``n``: each ``Level`` replaces the level of its channel and
+each ``LtpParameter`` the value of its channel's parameter, and everything a
+step does not record carries over from the steps before it.
+
+:class:`TrackingResolver` keeps a snapshot of the tracked state every
+``interval`` steps. The state at any step is its nearest snapshot plus at
+most ``interval`` step deltas, and a snapshot is only recomputed once an edit
+before it has invalidated it.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from ..formats.showfile import Content, CueList, Level, LtpParameter
+
+
+DEFAULT_INTERVAL = 16
+
+_LtpKey = Tuple[int, int]
+_Delta = Tuple[Dict[int, Level], Dict[_LtpKey, LtpParameter]]
+
+
+@dataclass
+class TrackedState:
+    """Levels by channel and LTP parameters by ``(channel, parameter)``."""
+
+    levels: Dict[int, Level] = field(default_factory=dict)
+    ltp_parameters: Dict[_LtpKey, LtpParameter] = field(default_factory=dict)
+
+    def copy(self) -> "TrackedState":
+        return TrackedState(dict(self.levels), dict(self.ltp_parameters))
+
+    def apply(self, content: Content) -> None:
+        """Track ``content`` on top of this state."""
+        self.levels.update(_level_delta(content))
+        self.ltp_parameters.update(_ltp_delta(content))
+
+    def to_content(self) -> Content:
+        """The state as a ``Content``, e.g. for :class:`.DmxRenderer`."""
+        return Content(
+            [],
+            0,
+            [self.levels[c] for c in sorted(self.levels)],
+            [self.ltp_parameters[k] for k in sorted(self.ltp_parameters)],
+        )
+
+
+def _level_delta(content: Content) -> Dict[int, Level]:
+    return {level.channel: level for level in content.levels}
+
+
+def _ltp_delta(content: Content) -> Dict[_LtpKey, LtpParameter]:
+    return {(p.channel, p.parameter): p for p in content.ltp_parameters}
+
+
+class TrackingResolver:
+    """Tracked state of a cue list's steps, with periodic snapshots.
+
+    The resolver reads ``cue_list.steps`` when it is queried. After editing,
+    inserting or removing a step, call :meth:`invalidate` with its index.
+
+    Args:
+        cue_list: The cue list to resolve
+        interval: Steps between snapshots. Getting the state of a step
+            replays at most this many steps.
+    """
+
+    def __init__(self, cue_list: CueList, interval: int = DEFAULT_INTERVAL) -> None:
+        if interval < 1:
+            raise ValueError("interval must be at least 1")
+        self.cue_list = cue_list
+        self.interval = interval
+        # _snapshots[j] is the state before step j * interval.
+        self._snapshots: List[TrackedState] = [TrackedState()]
+        self._deltas: Dict[int, _Delta] = {}
+
+    def __len__(self) -> int:
+        return len(self.cue_list.steps)
+
+    def _delta(self, index: int) -> _Delta:
+        delta = self._deltas.get(index)
+        if delta is None:
+            content = self.cue_list.steps[index].content
+            delta = (_level_delta(content), _ltp_delta(content))
+            self._deltas[index] = delta
+        return delta
+
+    def _replay(self, state: TrackedState, start: int, stop: int) -> None:
+        for index in range(start, stop):
+            levels, ltp_parameters = self._delta(index)
+            state.levels.update(levels)
+            state.ltp_parameters.update(ltp_parameters)
+
+    def state(self, index: int) -> TrackedState:
+        """The tracked state after step ``index``.
+
+        Raises:
+            IndexError: If there is no such step
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("step index out of range")
+        wanted = index // self.interval
+        while len(self._snapshots) <= wanted:
+            j = len(self._snapshots)
+            snapshot = self._snapshots[-1].copy()
+            self._replay(snapshot, (j - 1) * self.interval, j * self.interval)
+            self._snapshots.append(snapshot)
+        state = self._snapshots[wanted].copy()
+        self._replay(state, wanted * self.interval, index + 1)
+        return state
+
+    def content(self, index: int) -> Content:
+        """The tracked state after step ``index`` as a ``Content``."""
+        return self.state(index).to_content()
+
+    def index_of(self, cue: int) -> int:
+        """The index of the step with cue number ``cue``.
+
+        Raises:
+            ValueError: If no step has that cue number
+        """
+        for index, step in enumerate(self.cue_list.steps):
+            if step.cue == cue:
+                return index
+        raise ValueError(f"no step with cue number {cue}")
+
+    def invalidate(self, index: int = 0) -> None:
+        """Forget everything derived from step ``index`` and the steps after it.
+
+        Snapshots before ``index`` are kept.
+        """
+        index = max(index, 0)
+        del self._snapshots[index // self.interval + 1 :]
+        for stale in [i for i in self._deltas if i >= index]:
+            del self._deltas[stale]
@@ -0,0 +1,10 @@
+__all__ = [
+    "StageMap",
+    "cue_colors",
+    "encode_png",
+    "render_cues",
+    "write_png",
+]
+
+from .map import StageMap, cue_colors, render_cues
+from .png import encode_png, write_png
@@ -0,0 +1,171 @@
+"""Stage map images of cues.
+
+The console shows the patch as a grid of cells, one per ``Topo`` entry at
+its ``row`` and ``column``; entries with a ``device_id`` of -1 are empty
+grid positions. A ``View`` pans and zooms that grid: ``x`` and ``y`` are the
+pixel offset of the visible area, ``scale`` the zoom factor and ``height``
+the height of the visible area in pixels.
+
+:class:`StageMap` lays out the cells of one patch and view once, as the byte
+ranges each cell covers in a raw RGB image (see :mod:`.png`) and a
+background image with every patched cell drawn empty. Rendering a cue then
+copies the background and fills the cell ranges of the channels the cue
+sets, so every cue of a show is drawn into the same buffer.
+
+A cell shows the displayed color of its channel, ``Level.r/g/b``, scaled by
+``Level.level``. Channels without a level in the cue keep the empty color.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from ..formats.showfile import Content, Patch, Play, View
+from ..playback.tracking import TrackingResolver
+from .png import write_png
+
+
+# Pixels per cell side at scale 1, and between neighbouring cells
+CELL = 24
+GAP = 2
+
+BACKGROUND = (16, 16, 16)
+EMPTY = (48, 48, 48)
+
+_RGB = Tuple[int, int, int]
+
+
+def cue_colors(content: Content) -> Dict[int, _RGB]:
+    """The displayed color of every channel set by ``content``."""
+    return {
+        lv.channel: (
+            lv.r * lv.level // 255,
+            lv.g * lv.level // 255,
+            lv.b * lv.level // 255,
+        )
+        for lv in content.levels
+    }
+
+
+class StageMap:
+    """Renders cues of one patch as stage map images.
+
+    Args:
+        patch: The patch whose ``topo`` is drawn
+        view: Pan and zoom of the map; by default the whole grid at scale 1
+        cell: Cell side in pixels at scale 1
+        gap: Pixels between cells at scale 1
+        width: Image width in pixels, by default the width of the grid
+
+    Attributes:
+        width: Image width in pixels
+        height: Image height in pixels
+    """
+
+    def __init__(
+        self,
+        patch: Patch,
+        view: Optional[View] = None,
+        cell: int = CELL,
+        gap: int = GAP,
+        width: Optional[int] = None,
+    ) -> None:
+        scale = max(view.scale, 1) if view is not None else 1
+        x, y = (view.x, view.y) if view is not None else (0, 0)
+        topo = [t for t in patch.topo if t.device_id >= 0 and t.channel >= 0]
+        rows = max((t.row for t in patch.topo), default=-1) + 1
+        columns = max((t.column for t in patch.topo), default=-1) + 1
+        pitch = (cell + gap) * scale
+        size = cell * scale
+        self.width = width if width is not None else columns * pitch + gap * scale
+        if view is not None and view.height > 0:
+            self.height = view.height
+        else:
+            self.height = rows * pitch + gap * scale
+        self.stride = 1 + 3 * self.width
+
+        # (channel, pixels per row, byte offset of each row) of every cell
+        self._cells: List[Tuple[int, int, List[int]]] = []
+        for t in topo:
+            left = max(t.column * pitch + gap * scale - x, 0)
+            top = max(t.row * pitch + gap * scale - y, 0)
+            right = min(t.column * pitch + gap * scale + size - x, self.width)
+            bottom = min(t.row * pitch + gap * scale + size - y, self.height)
+            if left < right and top < bottom:
+                offsets = [r * self.stride + 1 + 3 * left for r in range(top, bottom)]
+                self._cells.append((t.channel, right - left, offsets))
+
+        self.background = bytearray(bytes(BACKGROUND) * self.width)
+        self.background[0:0] = b"\x00"
+        self.background *= self.height
+        for _, pixels, offsets in self._cells:
+            empty = bytes(EMPTY) * pixels
+            for start in offsets:
+                self.background[start : start + len(empty)] = empty
+
+    @property
+    def channels(self) -> List[int]:
+        """The channels drawn on the map."""
+        return sorted({channel for channel, _, _ in self._cells})
+
+    def blank(self) -> bytearray:
+        """A copy of the background image."""
+        return bytearray(self.background)
+
+    def render(self, content: Content, out: Optional[bytearray] = None) -> bytearray:
+        """Draw ``content`` as raw RGB scanlines, into ``out`` if given."""
+        if out is None:
+            out = self.blank()
+        else:
+            out[:] = self.background
+        colors = cue_colors(content)
+        for channel, pixels, offsets in self._cells:
+            color = colors.get(channel)
+            if color is None:
+                continue
+            run = bytes(color) * pixels
+            for start in offsets:
+                out[start : start + len(run)] = run
+        return out
+
+    def write(
+        self, content: Content, file: Union[str, Path], out: Optional[bytearray] = None
+    ) -> None:
+        """Draw ``content`` and write it to ``file`` as a PNG image."""
+        write_png(file, self.width, self.height, self.render(content, out))
+
+
+def render_cues(
+    play: Play,
+    directory: Union[str, Path],
+    view: Optional[View] = None,
+    name: str = "{index:03d}-cue{cue}.png",
+    tracking: bool = True,
+) -> Iterator[Path]:
+    """Write a stage map image of every step of the cue list.
+
+    The layout is computed once and every image is rendered into the same
+    buffer and written before the next, so memory use does not grow with
+    the number of cues.
+
+    Args:
+        play: The show to draw
+        directory: Where to write the images; created if missing
+        view: Pan and zoom, see :class:`StageMap`
+        name: File name pattern with the fields ``index`` (step index) and
+            ``cue`` (``Step.cue``)
+        tracking: Draw the tracked state of every step rather than only the
+            levels it records
+
+    Yields:
+        The path of each image once it is written.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stage = StageMap(play.patch, view)
+    resolver = TrackingResolver(play.cue_list)
+    out = stage.blank()
+    for index, step in enumerate(play.cue_list.steps):
+        content = resolver.content(index) if tracking else step.content
+        path = directory / name.format(index=index, cue=step.cue)
+        stage.write(content, path, out)
+        yield path
@@ -0,0 +1,63 @@
+"""Minimal PNG encoding with the standard library.
+
+Images are 8-bit RGB and passed as raw scanlines: every row starts with a
+filter type byte (0, none) followed by ``3 * width`` bytes of pixels, which
+is the layout :class:`.StageMap` renders into. The scanlines are compressed
+with :mod:`zlib` as they are, without per-row filtering.
+"""
+
+import struct
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Union
+
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)))
+    )
+
+
+def encode_png(width: int, height: int, raw: bytes, level: int = 6) -> bytes:
+    """Encode raw RGB scanlines as a PNG image.
+
+    Args:
+        width: Width in pixels
+        height: Height in pixels
+        raw: ``height`` rows of a 0 filter byte and ``3 * width`` pixel bytes
+        level: zlib compression level, 0-9
+
+    Raises:
+        ValueError: If ``raw`` does not have the size of the image
+    """
+    if len(raw) != height * (1 + 3 * width):
+        raise ValueError(f"expected {height * (1 + 3 * width)} bytes, got {len(raw)}")
+    # 8 bits per channel, color type 2 (RGB), default compression and filter,
+    # no interlace
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        SIGNATURE
+        + _chunk(b"IHDR", header)
+        + _chunk(b"IDAT", zlib.compress(raw, level))
+        + _chunk(b"IEND", b"")
+    )
+
+
+def write_png(
+    file: Union[str, Path, BinaryIO],
+    width: int,
+    height: int,
+    raw: bytes,
+    level: int = 6,
+) -> None:
+    """Encode raw RGB scanlines as a PNG image into a path or binary file."""
+    data = encode_png(width, height, raw, level)
+    if isinstance(file, (str, Path)):
+        Path(file).write_bytes(data)
+    else:
+        file.write(data)